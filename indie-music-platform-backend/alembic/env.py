@@ -20,6 +20,9 @@ from app.models.user import User
 from app.models.track import Track
 from app.models.purchase import Purchase
 from app.models.play_history import PlayHistory
+from app.models.play_counter import TrackPlayCounter
+from app.models.play_daily import PlayDaily
+from app.models.track_listing import TrackListing
 
 # alembicの設定
 config = context.config
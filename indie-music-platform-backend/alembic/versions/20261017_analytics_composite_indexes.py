@@ -0,0 +1,45 @@
+"""売上・再生の期間集計用の複合インデックス
+
+Revision ID: 20261017_analytics_composite_indexes
+Revises: 20261017_partition_play_history
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '20261017_analytics_composite_indexes'
+down_revision = '20261017_partition_play_history'
+branch_labels = None
+depends_on = None
+
+
+# (インデックス名, テーブル, 列)
+INDEXES = [
+    ('ix_purchase_track_status_date', 'purchase', ['track_id', 'status', 'purchase_date']),
+]
+
+# 上記の複合インデックスの先頭列で代替される単一列インデックス
+SUPERSEDED = [
+    ('ix_purchase_track_id', 'purchase', ['track_id']),
+]
+
+
+def upgrade():
+    # 複合インデックスを作成してから単一列インデックスを削除し、移行中も track_id での絞り込みに
+    # 使えるインデックスが常に残るようにする（CONCURRENTLY のためトランザクション外で実行）。
+    # (track_id, played_at) は再生履歴のパーティション化（20261017_partition_play_history）で作成済み
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+        for name, table, _ in SUPERSEDED:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns in SUPERSEDED:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+        for name, table, _ in INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
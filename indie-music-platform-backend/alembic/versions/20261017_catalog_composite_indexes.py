@@ -0,0 +1,54 @@
+"""楽曲一覧のクエリ形状に合わせた複合インデックスの追加
+
+Revision ID: 20261017_catalog_composite_indexes
+Revises: 20261017_track_listing_projection
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '20261017_catalog_composite_indexes'
+down_revision = '20261017_track_listing_projection'
+branch_labels = None
+depends_on = None
+
+
+# (インデックス名, テーブル, 列)
+INDEXES = [
+    ('ix_track_listing_public_created', 'track_listing', ['is_public', 'created_at', 'track_id']),
+    ('ix_track_listing_public_play_count', 'track_listing', ['is_public', 'play_count', 'track_id']),
+    ('ix_track_listing_public_release', 'track_listing', ['is_public', 'release_date', 'track_id']),
+    ('ix_track_listing_public_title', 'track_listing', ['is_public', 'title', 'track_id']),
+    ('ix_track_listing_genre_created', 'track_listing', ['genre', 'is_public', 'created_at', 'track_id']),
+    ('ix_track_listing_genre_play_count', 'track_listing', ['genre', 'is_public', 'play_count', 'track_id']),
+    ('ix_track_listing_genre_release', 'track_listing', ['genre', 'is_public', 'release_date', 'track_id']),
+    ('ix_track_listing_artist_release', 'track_listing', ['artist_id', 'is_public', 'release_date', 'track_id']),
+    ('ix_track_artist_public_release', 'track', ['artist_id', 'is_public', 'release_date']),
+]
+
+# 上記の複合インデックスの先頭列で代替される単一列インデックス
+SUPERSEDED = [
+    ('ix_track_listing_public_created', 'track_listing', ['is_public', 'created_at']),
+    ('ix_track_listing_genre', 'track_listing', ['genre']),
+    ('ix_track_listing_artist_id', 'track_listing', ['artist_id']),
+    ('ix_track_artist_id', 'track', ['artist_id']),
+]
+
+
+def upgrade():
+    # PostgreSQL では書き込みを止めないよう CONCURRENTLY で作成する（トランザクション外で実行）
+    with op.get_context().autocommit_block():
+        for name, table, _ in SUPERSEDED:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
+        for name, table, columns in SUPERSEDED:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
@@ -0,0 +1,138 @@
+"""再生履歴（playhistory）の月別パーティション化と複合インデックス
+
+Revision ID: 20261017_partition_play_history
+Revises: 20261017_play_daily_rollup
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261017_partition_play_history'
+down_revision = '20261017_play_daily_rollup'
+branch_labels = None
+depends_on = None
+
+# 作成時点で先に用意しておくパーティションの月数
+PARTITIONS_AHEAD = 2
+
+
+def _add_months(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_partitioned_table():
+    op.execute(
+        'CREATE TABLE playhistory ('
+        'id VARCHAR NOT NULL, '
+        'user_id VARCHAR REFERENCES "user" (id), '
+        'track_id VARCHAR NOT NULL REFERENCES track (id), '
+        'played_at TIMESTAMP WITHOUT TIME ZONE NOT NULL, '
+        'play_duration INTEGER, '
+        'created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(), '
+        'updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(), '
+        'PRIMARY KEY (id, played_at)'
+        ') PARTITION BY RANGE (played_at)'
+    )
+    op.create_index('ix_playhistory_track_played', 'playhistory', ['track_id', 'played_at'], unique=False)
+    op.create_index('ix_playhistory_user_played', 'playhistory', ['user_id', 'played_at'], unique=False)
+    op.execute('CREATE TABLE playhistory_default PARTITION OF playhistory DEFAULT')
+
+
+def _create_month_partitions(first_month):
+    today = date.today()
+    month = date(first_month.year, first_month.month, 1)
+    last = _add_months(date(today.year, today.month, 1), PARTITIONS_AHEAD)
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE playhistory_{month:%Y%m} PARTITION OF playhistory "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+        )
+        month = _add_months(month, 1)
+
+
+def _existing_history_table(bind):
+    """
+    既存の再生履歴テーブル名（なければ None）
+    初期マイグレーションの play_history は 20261017_play_daily_rollup で playhistory に変更するが、
+    変更前の名前のまま残っているデータベースも移し替えの対象にする
+    """
+    inspector = sa.inspect(bind)
+    return next((name for name in ('playhistory', 'play_history') if inspector.has_table(name)), None)
+
+
+def upgrade():
+    bind = op.get_bind()
+    source = _existing_history_table(bind)
+
+    if bind.dialect.name != 'postgresql':
+        # SQLite などはパーティションの代わりに古い月を別テーブルへ移す（アプリ側で実施）
+        if source:
+            if source != 'playhistory':
+                op.rename_table(source, 'playhistory')
+            single_column = [
+                index['name'] for index in sa.inspect(bind).get_indexes('playhistory')
+                if index['column_names'] in (['track_id'], ['user_id'])
+            ]
+            with op.batch_alter_table('playhistory') as batch_op:
+                for name in single_column:
+                    batch_op.drop_index(name)
+                batch_op.create_index('ix_playhistory_track_played', ['track_id', 'played_at'], unique=False)
+                batch_op.create_index('ix_playhistory_user_played', ['user_id', 'played_at'], unique=False)
+        return
+
+    if source is None:
+        _create_partitioned_table()
+        _create_month_partitions(date.today())
+        return
+
+    # 既存のテーブルを退避し、パーティション化したテーブルへ移し替える
+    primary_key = sa.inspect(bind).get_pk_constraint(source)['name']
+    op.rename_table(source, 'playhistory_unpartitioned')
+    if primary_key:
+        op.execute(f'ALTER TABLE playhistory_unpartitioned RENAME CONSTRAINT {primary_key} TO playhistory_unpartitioned_pkey')
+    _create_partitioned_table()
+    first_played = bind.execute(sa.text('SELECT min(played_at) FROM playhistory_unpartitioned')).scalar()
+    _create_month_partitions(first_played or date.today())
+    op.execute(
+        'INSERT INTO playhistory (id, user_id, track_id, played_at, play_duration, created_at, updated_at) '
+        'SELECT id, user_id, track_id, played_at, play_duration, created_at, updated_at '
+        'FROM playhistory_unpartitioned'
+    )
+    op.drop_table('playhistory_unpartitioned')
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        with op.batch_alter_table('playhistory') as batch_op:
+            batch_op.drop_index('ix_playhistory_user_played')
+            batch_op.drop_index('ix_playhistory_track_played')
+            batch_op.create_index('ix_playhistory_track_id', ['track_id'], unique=False)
+            batch_op.create_index('ix_playhistory_user_id', ['user_id'], unique=False)
+        return
+
+    op.rename_table('playhistory', 'playhistory_partitioned')
+    op.execute('ALTER INDEX ix_playhistory_track_played RENAME TO ix_playhistory_partitioned_track_played')
+    op.execute('ALTER INDEX ix_playhistory_user_played RENAME TO ix_playhistory_partitioned_user_played')
+    op.create_table(
+        'playhistory',
+        sa.Column('id', sa.String(), primary_key=True),
+        sa.Column('user_id', sa.String(), sa.ForeignKey('user.id'), nullable=True, index=True),
+        sa.Column('track_id', sa.String(), sa.ForeignKey('track.id'), nullable=False, index=True),
+        sa.Column('played_at', sa.DateTime(), nullable=False),
+        sa.Column('play_duration', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), onupdate=sa.func.now(), nullable=False)
+    )
+    op.execute(
+        'INSERT INTO playhistory (id, user_id, track_id, played_at, play_duration, created_at, updated_at) '
+        'SELECT id, user_id, track_id, played_at, play_duration, created_at, updated_at '
+        'FROM playhistory_partitioned'
+    )
+    op.execute('DROP TABLE playhistory_partitioned CASCADE')
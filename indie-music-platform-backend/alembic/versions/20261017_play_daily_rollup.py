@@ -0,0 +1,77 @@
+"""日ごとの再生集計（play_daily）の追加
+
+Revision ID: 20261017_play_daily_rollup
+Revises: 20261017_track_play_counter
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261017_play_daily_rollup'
+down_revision = '20261017_track_play_counter'
+branch_labels = None
+depends_on = None
+
+
+def _rename_history_table(source, target):
+    """
+    再生履歴のテーブル名を変更（インデックス・制約の名前も合わせる）
+    初期マイグレーションは play_history を作成するが、モデル（PlayHistory）は playhistory を参照する
+    """
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table(source) or inspector.has_table(target):
+        return
+
+    indexes = inspector.get_indexes(source)
+    constraints = [inspector.get_pk_constraint(source)['name']] + [fk['name'] for fk in inspector.get_foreign_keys(source)]
+    op.rename_table(source, target)
+
+    def renamed(name):
+        return name.replace(f'ix_{source}_', f'ix_{target}_', 1).replace(f'{source}_', f'{target}_', 1)
+
+    if bind.dialect.name == 'postgresql':
+        for index in indexes:
+            op.execute(f'ALTER INDEX {index["name"]} RENAME TO {renamed(index["name"])}')
+        for name in constraints:
+            if name and name.startswith(f'{source}_'):
+                op.execute(f'ALTER TABLE {target} RENAME CONSTRAINT {name} TO {renamed(name)}')
+        return
+
+    # SQLite などはインデックス名を変更できないため作り直す
+    for index in indexes:
+        op.drop_index(index['name'], table_name=target)
+        op.create_index(renamed(index['name']), target, index['column_names'], unique=bool(index['unique']))
+
+
+def upgrade():
+    _rename_history_table('play_history', 'playhistory')
+
+    op.create_table(
+        'play_daily',
+        sa.Column('track_id', sa.String(), sa.ForeignKey('track.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('plays', sa.Integer(), default=0, nullable=False),
+        sa.Column('total_duration', sa.BigInteger(), default=0, nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), onupdate=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('track_id', 'day')
+    )
+    op.create_index('ix_play_daily_day_track', 'play_daily', ['day', 'track_id'], unique=False)
+
+    # 既存の再生履歴から集計をバックフィル
+    day = "date(played_at)" if op.get_bind().dialect.name == 'sqlite' else "CAST(played_at AS DATE)"
+    op.execute(
+        "INSERT INTO play_daily (track_id, day, plays, total_duration) "
+        f"SELECT track_id, {day}, COUNT(*), COALESCE(SUM(play_duration), 0) "
+        f"FROM playhistory GROUP BY track_id, {day}"
+    )
+
+
+def downgrade():
+    op.drop_index('ix_play_daily_day_track', table_name='play_daily')
+    op.drop_table('play_daily')
+    _rename_history_table('playhistory', 'play_history')
@@ -0,0 +1,53 @@
+"""楽曲一覧用の非正規化テーブル（track_listing）の追加
+
+Revision ID: 20261017_track_listing_projection
+Revises: 20261017_track_search_index
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261017_track_listing_projection'
+down_revision = '20261017_track_search_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'track_listing',
+        sa.Column('track_id', sa.String(), sa.ForeignKey('track.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('title', sa.String(), nullable=False),
+        sa.Column('artist_id', sa.String(), nullable=False),
+        sa.Column('artist_name', sa.String(), nullable=False),
+        sa.Column('cover_art_url', sa.String(), nullable=True),
+        sa.Column('duration', sa.Integer(), nullable=False),
+        sa.Column('price', sa.Numeric(10, 2), nullable=False),
+        sa.Column('genre', sa.String(), nullable=True),
+        sa.Column('release_date', sa.Date(), nullable=False),
+        sa.Column('play_count', sa.Integer(), default=0, nullable=False),
+        sa.Column('is_public', sa.Boolean(), default=True, nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), onupdate=sa.func.now(), nullable=False)
+    )
+
+    # インデックスの作成
+    op.create_index(op.f('ix_track_listing_artist_id'), 'track_listing', ['artist_id'], unique=False)
+    op.create_index('ix_track_listing_genre', 'track_listing', ['genre'], unique=False)
+    op.create_index('ix_track_listing_public_created', 'track_listing', ['is_public', 'created_at'], unique=False)
+
+    # 既存楽曲のバックフィル
+    op.execute(
+        "INSERT INTO track_listing (track_id, title, artist_id, artist_name, cover_art_url, duration, "
+        "price, genre, release_date, play_count, is_public, created_at) "
+        "SELECT t.id, t.title, t.artist_id, u.display_name, t.cover_art_url, t.duration, "
+        "t.price, t.genre, t.release_date, t.play_count, t.is_public, t.created_at "
+        "FROM track t JOIN \"user\" u ON u.id = t.artist_id"
+    )
+
+
+def downgrade():
+    op.drop_table('track_listing')
@@ -0,0 +1,32 @@
+"""再生回数の分散カウンター（track_play_counter）の追加
+
+Revision ID: 20261017_track_play_counter
+Revises: 20261017_catalog_composite_indexes
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261017_track_play_counter'
+down_revision = '20261017_catalog_composite_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'track_play_counter',
+        sa.Column('track_id', sa.String(), sa.ForeignKey('track.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('slot', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('plays', sa.Integer(), default=0, nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), onupdate=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('track_id', 'slot')
+    )
+
+
+def downgrade():
+    op.drop_table('track_play_counter')
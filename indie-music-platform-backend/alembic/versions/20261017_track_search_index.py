@@ -0,0 +1,40 @@
+"""全文検索インデックス（track_search）の追加
+
+Revision ID: 20261017_track_search_index
+Revises: 20250302_initial_migration
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '20261017_track_search_index'
+down_revision = '20250302_initial_migration'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # tsvector は PostgreSQL のみ（SQLite の FTS5 はアプリ起動時に作成される）
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute(
+        "CREATE TABLE IF NOT EXISTS track_search ("
+        "track_id VARCHAR PRIMARY KEY REFERENCES track(id) ON DELETE CASCADE, "
+        "document TSVECTOR NOT NULL)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_track_search_document ON track_search USING GIN (document)"
+    )
+
+    # 既存楽曲の登録は、トークン化（app.utils.search_tokenizer）が必要なため
+    # アプリ起動時の search_service.sync_index で行う
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("DROP TABLE IF EXISTS track_search")
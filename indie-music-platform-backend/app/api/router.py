@@ -113,7 +113,7 @@ async def get_music_by_id_compatibility(track_id: str):
 try:
     # v1 APIモジュールをインポート
     logger.info("APIモジュールをインポートしています...")
-    from app.api.v1 import auth, tracks, users, artists, purchases, stream, features
+    from app.api.v1 import auth, tracks, users, artists, purchases, stream, media, features
     from app.core.feature_flags import is_payment_enabled
     
     # 各モジュールのルーターをv1ルーターに登録
@@ -123,6 +123,7 @@ try:
     v1_router.include_router(users.router, prefix="/users", tags=["users"])
     v1_router.include_router(artists.router, prefix="/artists", tags=["artists"])
     v1_router.include_router(stream.router, prefix="/stream", tags=["stream"])
+    v1_router.include_router(media.router, prefix="/media", tags=["media"])
     v1_router.include_router(features.router, prefix="/features", tags=["features"])
     
     # 決済機能が有効な場合のみ購入エンドポイントを登録
@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.schemas.user import UserProfile
-from app.services import artist_service
+from app.services import dashboard_service, export_service, listener_analytics
 from app.core.security import get_current_artist
 from app.models.user import User
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from datetime import date
 
 router = APIRouter()
@@ -19,9 +20,9 @@ async def get_artist_revenue(
     db: Session = Depends(get_db)
 ) -> Any:
     """
-    アーティスト収益情報を取得
+    アーティスト収益情報を取得（期間の指定がない・今月・直近30日はスナップショットから返す）
     """
-    return artist_service.get_artist_revenue(
+    return dashboard_service.get_artist_revenue(
         db=db,
         artist_id=current_user.id,
         start_date=start_date,
@@ -37,9 +38,9 @@ async def get_artist_stats(
     db: Session = Depends(get_db)
 ) -> Any:
     """
-    アーティスト統計情報を取得
+    アーティスト統計情報を取得（期間の指定がない・今月・直近30日はスナップショットから返す）
     """
-    return artist_service.get_artist_stats(
+    return dashboard_service.get_artist_stats(
         db=db,
         artist_id=current_user.id,
         start_date=start_date,
@@ -47,3 +48,73 @@ async def get_artist_stats(
     )
 
 
+
+
+@router.get("/stats/retention", response_model=Dict[str, Any])
+async def get_artist_retention(
+    track_id: Optional[str] = None,
+    start_date: date = None,
+    end_date: date = None,
+    current_user: User = Depends(get_current_artist),
+    db: Session = Depends(get_db)
+) -> Any:
+    """
+    楽曲ごとの完走率とリテンション曲線を取得（track_id 指定時は1秒ごとの曲線も返す）
+    """
+    return listener_analytics.get_listener_retention(
+        db=db,
+        artist_id=current_user.id,
+        track_id=track_id,
+        start_date=start_date,
+        end_date=end_date
+    )
+
+
+@router.get("/exports/sales")
+async def export_artist_sales(
+    format: str = "csv",
+    start_date: date = None,
+    end_date: date = None,
+    current_user: User = Depends(get_current_artist),
+    db: Session = Depends(get_db)
+) -> Any:
+    """
+    アーティストの楽曲の売上を CSV または Parquet でダウンロード（行を逐次書き出す）
+    """
+    media_type, content = export_service.export_sales(
+        db=db,
+        artist_id=current_user.id,
+        export_format=format,
+        start_date=start_date,
+        end_date=end_date
+    )
+    return _download(content, media_type, export_service.export_filename("sales", format.lower(), start_date, end_date))
+
+
+@router.get("/exports/plays")
+async def export_artist_plays(
+    format: str = "csv",
+    start_date: date = None,
+    end_date: date = None,
+    current_user: User = Depends(get_current_artist),
+    db: Session = Depends(get_db)
+) -> Any:
+    """
+    アーティストの楽曲の再生履歴を CSV または Parquet でダウンロード（行を逐次書き出す）
+    """
+    media_type, content = export_service.export_plays(
+        db=db,
+        artist_id=current_user.id,
+        export_format=format,
+        start_date=start_date,
+        end_date=end_date
+    )
+    return _download(content, media_type, export_service.export_filename("plays", format.lower(), start_date, end_date))
+
+
+def _download(content, media_type: str, filename: str) -> StreamingResponse:
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
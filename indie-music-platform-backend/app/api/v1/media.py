@@ -0,0 +1,39 @@
+from fastapi import APIRouter, HTTPException, Request, Response
+from starlette.status import HTTP_403_FORBIDDEN, HTTP_404_NOT_FOUND
+from app.core.config import settings
+from app.utils import media_token
+from app.utils.range_file import range_file_response
+import os
+
+router = APIRouter()
+
+
+def _local_media_path(object_key: str) -> str:
+    """オブジェクトキーをローカルストレージ上のパスに変換（ルート外への参照は拒否）"""
+    root = os.path.realpath(settings.MEDIA_ROOT)
+    path = os.path.realpath(os.path.join(root, object_key))
+    if not path.startswith(root + os.sep) or not os.path.isfile(path):
+        raise HTTPException(
+            status_code=HTTP_404_NOT_FOUND,
+            detail="ファイルが見つかりません"
+        )
+    return path
+
+
+@router.api_route("/{object_key:path}", methods=["GET", "HEAD"])
+async def get_media(
+    object_key: str,
+    expires: int,
+    sig: str,
+    request: Request
+) -> Response:
+    """
+    HMAC署名付きURLで指定されたメディアファイルを配信
+    Range / If-Range に対応し、シーク時は要求された範囲のみを 206 で返す
+    """
+    if settings.MEDIA_URL_SIGNER != "hmac" or not media_token.verify(object_key, expires, sig):
+        raise HTTPException(
+            status_code=HTTP_403_FORBIDDEN,
+            detail="URLが無効か、有効期限が切れています"
+        )
+    return range_file_response(request, _local_media_path(object_key))
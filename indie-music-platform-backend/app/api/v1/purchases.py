@@ -89,9 +89,10 @@ async def download_purchased_track(
             )
         
         # 無料ダウンロード用のURL生成
-        from app.services.storage import generate_presigned_url
-        object_key = track.audio_file_url.split("/")[-1]  # ファイル名を抽出
-        signed_url = generate_presigned_url(object_key, expiration=86400)
+        import time
+        from app.services.storage import object_key_from_url, sign_media_url
+        object_key = object_key_from_url(track.audio_file_url)
+        signed_url = sign_media_url(object_key, int(time.time()) + 86400)
         return {
             "download_url": signed_url,
             "free_download": True,
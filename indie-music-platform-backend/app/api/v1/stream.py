@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi import APIRouter, Depends, HTTPException, Body, Request
+from slowapi.util import get_remote_address
 from sqlalchemy.orm import Session
 from app.db.session import get_db
-from app.schemas.stream import StreamRequest, StreamResponse, PlayEvent
+from app.schemas.stream import StreamRequest, StreamResponse, PlayEvent, PlayEventBatch, PlayEventBatchResult
 from app.services import stream_service
 from app.core.security import get_current_user
 from app.models.user import User
@@ -10,6 +11,26 @@ from typing import Dict, Any, Optional
 router = APIRouter()
 
 
+@router.post("/plays/batch", response_model=PlayEventBatchResult)
+async def record_plays_batch(
+    request: Request,
+    batch: PlayEventBatch,
+    current_user: Optional[User] = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> Any:
+    """
+    再生イベントを一括記録（オフライン再生の後送り用）
+    イベントごとに受付・拒否の結果を返す
+    """
+    user_id = current_user.id if current_user else None
+    return stream_service.record_plays_batch(
+        db=db,
+        events=batch.events,
+        user_id=user_id,
+        client_id=get_remote_address(request)
+    )
+
+
 @router.post("/{track_id}", response_model=StreamResponse)
 async def get_stream_url(
     track_id: str,
@@ -29,6 +50,7 @@ async def get_stream_url(
 
 @router.post("/{track_id}/play")
 async def record_play(
+    request: Request,
     track_id: str,
     play_data: PlayEvent,
     current_user: Optional[User] = Depends(get_current_user),
@@ -42,7 +64,8 @@ async def record_play(
         db=db,
         track_id=track_id,
         user_id=user_id,
-        duration=play_data.duration
+        duration=play_data.duration,
+        client_id=get_remote_address(request)
     )
     return {"status": "success"}
 
@@ -1,39 +1,145 @@
-from fastapi import APIRouter, Depends, HTTPException, Body, UploadFile, File, Form, Query
+from fastapi import APIRouter, Depends, HTTPException, Body, UploadFile, File, Form, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app.db.session import get_db
-from app.schemas.track import TrackCreate, Track as TrackSchema, TrackUpdate, TrackWithArtist, TrackListItem
+from app.schemas.track import TrackCreate, Track as TrackSchema, TrackUpdate, TrackWithArtist, TrackListItem, TrackSuggestion, TrackBatch, TrendingTrack
 from app.services import track_service
+from app.services.suggest_service import suggest_index, MAX_SUGGESTIONS
+from app.core.config import settings
 from app.core.security import get_current_user, get_current_artist
 from app.api.dependencies.auth import validate_track_ownership
+from app.utils.etag import ETAG_HEADER, conditional_response
+from app.utils.json_stream import iter_json_array
 from app.models.user import User
 from typing import Dict, Any, List, Optional
 from datetime import date
 
 router = APIRouter()
 
+# 次ページ取得用カーソルを返すレスポンスヘッダー
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _set_next_cursor(response: Response, cursor: Optional[str]) -> None:
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
+
 
 @router.get("/", response_model=List[TrackListItem])
 async def list_tracks(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     genre: Optional[str] = None,
     search: Optional[str] = None,
     sort_by: Optional[str] = "created_at",
     sort_desc: bool = True,
+    cursor: Optional[str] = None,
+    stream: bool = False,
     db: Session = Depends(get_db)
 ) -> Any:
     """
     楽曲一覧を取得
+    cursor指定時はskipを無視し、X-Next-Cursorヘッダーの値で続きを取得する
+    If-None-Match がカタログのETagに一致する場合は 304 を返す
+    stream=true の場合は行を逐次シリアライズして返す（大きな limit 向け、X-Next-Cursor は返さない）
     """
-    return track_service.get_tracks(
+    etag = track_service.get_catalog_etag(db)
+    not_modified = conditional_response(request, response, etag)
+    if not_modified:
+        return not_modified
+
+    if stream:
+        rows = track_service.iter_tracks(
+            db=db,
+            skip=skip,
+            limit=limit,
+            genre=genre,
+            search=search,
+            sort_by=sort_by,
+            sort_desc=sort_desc,
+            cursor=cursor
+        )
+        return StreamingResponse(
+            iter_json_array(rows), media_type="application/json", headers={ETAG_HEADER: etag}
+        )
+
+    tracks, next_cursor = track_service.get_tracks_page(
         db=db,
         skip=skip,
         limit=limit,
         genre=genre,
         search=search,
         sort_by=sort_by,
-        sort_desc=sort_desc
+        sort_desc=sort_desc,
+        cursor=cursor
+    )
+    _set_next_cursor(response, next_cursor)
+    return tracks
+
+
+@router.get("/search", response_model=List[TrackListItem])
+async def search_tracks(
+    query: str,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+) -> Any:
+    """
+    楽曲を検索
+    """
+    tracks, next_cursor = track_service.search_tracks_page(
+        db=db,
+        query=query,
+        skip=skip,
+        limit=limit,
+        cursor=cursor
     )
+    _set_next_cursor(response, next_cursor)
+    return tracks
+
+
+@router.get("/suggest", response_model=List[TrackSuggestion])
+async def suggest_tracks(
+    q: str,
+    limit: int = Query(MAX_SUGGESTIONS, ge=1, le=MAX_SUGGESTIONS),
+    db: Session = Depends(get_db)
+) -> Any:
+    """
+    検索ボックスの入力補完候補（楽曲タイトル・アーティスト名）を取得
+    インデックス構築後はデータベースにアクセスしない
+    """
+    suggest_index.ensure_loaded(db)
+    return suggest_index.suggest(q, limit=limit)
+
+
+@router.get("/trending", response_model=List[TrendingTrack])
+async def get_trending_tracks(
+    genre: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=settings.TRENDING_TOP_K),
+    db: Session = Depends(get_db)
+) -> Any:
+    """
+    急上昇楽曲（再生数の時間減衰スコアの高い順）を取得
+    genre 指定時はそのジャンル内の順位
+    """
+    return track_service.get_trending_tracks(db=db, genre=genre, limit=limit)
+
+
+@router.get("/batch", response_model=TrackBatch)
+async def get_tracks_batch(
+    ids: List[str] = Query(...),
+    db: Session = Depends(get_db)
+) -> Any:
+    """
+    複数の楽曲詳細を指定順で一括取得
+    ids はカンマ区切り・繰り返し指定のどちらも可。存在しないIDは missing_ids に含める
+    """
+    track_ids = [track_id.strip() for value in ids for track_id in value.split(",")]
+    return track_service.get_tracks_batch(db=db, track_ids=track_ids)
 
 
 @router.post("/", response_model=TrackSchema)
@@ -55,12 +161,18 @@ async def create_track(
 @router.get("/{track_id}", response_model=TrackWithArtist)
 async def get_track(
     track_id: str,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db)
 ) -> Any:
     """
     楽曲詳細を取得
     """
-    return track_service.get_track(db=db, track_id=track_id)
+    not_modified = conditional_response(request, response, track_service.get_track_etag(db, track_id))
+    if not_modified:
+        return not_modified
+
+    return track_service.get_track_detail(db=db, track_id=track_id)
 
 
 @router.put("/{track_id}", response_model=TrackSchema)
@@ -120,36 +232,29 @@ async def upload_audio_file(
 @router.get("/artist/{artist_id}", response_model=List[TrackListItem])
 async def get_artist_tracks(
     artist_id: str,
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ) -> Any:
     """
     アーティストの楽曲一覧を取得
     """
-    return track_service.get_artist_tracks(
-        db=db,
-        artist_id=artist_id,
-        skip=skip,
-        limit=limit
+    not_modified = conditional_response(
+        request, response, track_service.get_artist_tracks_etag(db, artist_id)
     )
+    if not_modified:
+        return not_modified
 
-
-@router.get("/search", response_model=List[TrackListItem])
-async def search_tracks(
-    query: str,
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
-) -> Any:
-    """
-    楽曲を検索
-    """
-    return track_service.search_tracks(
+    tracks, next_cursor = track_service.get_artist_tracks_page(
         db=db,
-        query=query,
+        artist_id=artist_id,
         skip=skip,
-        limit=limit
+        limit=limit,
+        cursor=cursor
     )
-
+    _set_next_cursor(response, next_cursor)
+    return tracks
 
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, Body, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Body, UploadFile, File, Request, Response
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.schemas.user import UserProfile
 from app.schemas.track import TrackListItem
 from app.services import user_service, track_service
 from app.core.security import get_current_user
+from app.utils.etag import conditional_response
 from typing import Dict, Any, List
 from app.models.user import User
 
@@ -14,11 +15,17 @@ router = APIRouter()
 @router.get("/{user_id}/profile", response_model=UserProfile)
 async def get_user_profile(
     user_id: str,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db)
 ) -> Any:
     """
     ユーザープロフィールを取得
     """
+    not_modified = conditional_response(request, response, user_service.get_user_profile_etag(db, user_id))
+    if not_modified:
+        return not_modified
+
     return user_service.get_user_profile(db=db, user_id=user_id)
 
 
@@ -0,0 +1,114 @@
+"""
+プロセス内の読み取りキャッシュ
+
+TTL + LRU で保持し、エントリごとに依存するバージョンカウンターを記録する。
+書き込み側が該当カウンターを進める（bump）と、そのカウンターに依存する
+エントリは次回参照時に無効として扱われる（書き込み時の一括削除は不要）。
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Tuple
+
+from app.core.config import settings
+
+# キャッシュに存在しないことを表す値（Noneもキャッシュ可能にするため）
+MISS = object()
+
+
+class VersionedCache:
+    """バージョンカウンターで無効化できる TTL + LRU キャッシュ"""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[float, Tuple[Tuple[str, int], ...], Any]]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def version(self, name: str) -> int:
+        return self._versions.get(name, 0)
+
+    def bump(self, *names: str) -> None:
+        """カウンターを進め、依存するエントリを無効化する"""
+        with self._lock:
+            for name in names:
+                self._versions[name] = self._versions.get(name, 0) + 1
+
+    def get(self, key: Hashable) -> Any:
+        """有効なエントリの値、なければ MISS を返す"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, deps, value = entry
+                if expires_at > now and all(self._versions.get(n, 0) == v for n, v in deps):
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return value
+                del self._entries[key]
+                self._invalidations += 1
+            self._misses += 1
+            return MISS
+
+    def snapshot(self, depends_on: Iterable[str]) -> Tuple[Tuple[str, int], ...]:
+        """依存カウンターの現在値（値の読み込み前に取得しておく）"""
+        with self._lock:
+            return tuple((name, self._versions.get(name, 0)) for name in depends_on)
+
+    def set(self, key: Hashable, value: Any, deps: Tuple[Tuple[str, int], ...] = ()) -> None:
+        """snapshot() 時点のカウンターに依存する値として登録"""
+        if self.max_entries <= 0 or self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, deps, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def get_or_load(self, key: Hashable, depends_on: Iterable[str], loader: Callable[[], Any]) -> Any:
+        """
+        キャッシュから取得し、なければ loader の結果を登録して返す
+        読み込み中に書き込みが挟まっても古い値が有効にならないよう、
+        カウンターは読み込み前に記録する
+        """
+        value = self.get(key)
+        if value is not MISS:
+            return value
+        deps = self.snapshot(depends_on)
+        value = loader()
+        self.set(key, value, deps)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self._hits = self._misses = self._evictions = self._invalidations = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+            }
+
+
+# 楽曲カタログ（一覧・詳細）の読み取りキャッシュ
+catalog_cache = VersionedCache(
+    max_entries=settings.CATALOG_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.CATALOG_CACHE_TTL_SECONDS
+)
@@ -59,6 +59,52 @@ class Settings(BaseSettings):
     PAYMENT_METHODS_ENABLED: bool = os.environ.get("PAYMENT_METHODS_ENABLED", "true").lower() in ("true", "1", "yes", "on")
     PURCHASE_DOWNLOADS_ENABLED: bool = os.environ.get("PURCHASE_DOWNLOADS_ENABLED", "true").lower() in ("true", "1", "yes", "on")
     
+    # カタログ読み取りキャッシュ（TTLまたは最大件数を0にすると無効）
+    CATALOG_CACHE_TTL_SECONDS: float = float(os.environ.get("CATALOG_CACHE_TTL_SECONDS", "30"))
+    CATALOG_CACHE_MAX_ENTRIES: int = int(os.environ.get("CATALOG_CACHE_MAX_ENTRIES", "1024"))
+    
+    # ストリーミングURL（署名付きURLは有効期限の区切りごとに再利用される）
+    STREAM_URL_TTL_SECONDS: int = int(os.environ.get("STREAM_URL_TTL_SECONDS", "3600"))
+    STREAM_URL_BUCKET_SECONDS: int = int(os.environ.get("STREAM_URL_BUCKET_SECONDS", "600"))
+    STREAM_URL_CACHE_MAX_ENTRIES: int = int(os.environ.get("STREAM_URL_CACHE_MAX_ENTRIES", "4096"))
+    
+    # 再生イベントの取り込みバッファ（間隔を0にするとリクエストごとに書き込む）
+    PLAY_BUFFER_MAX_EVENTS: int = int(os.environ.get("PLAY_BUFFER_MAX_EVENTS", "500"))
+    PLAY_BUFFER_FLUSH_INTERVAL_MS: int = int(os.environ.get("PLAY_BUFFER_FLUSH_INTERVAL_MS", "1000"))
+    
+    # 急上昇楽曲（スコアの半減期と、ジャンルごとに保持する上位件数）
+    TRENDING_HALF_LIFE_HOURS: float = float(os.environ.get("TRENDING_HALF_LIFE_HOURS", "24"))
+    TRENDING_TOP_K: int = int(os.environ.get("TRENDING_TOP_K", "100"))
+    
+    # 同じ再生者・楽曲の再生をこの秒数内は重複として拒否（0で無効）
+    PLAY_DEDUP_WINDOW_SECONDS: float = float(os.environ.get("PLAY_DEDUP_WINDOW_SECONDS", "30"))
+    # 重複判定の1区間あたりの想定キー数と誤判定率（メモリ使用量はこの2つで決まる）
+    PLAY_DEDUP_CAPACITY: int = int(os.environ.get("PLAY_DEDUP_CAPACITY", "200000"))
+    PLAY_DEDUP_ERROR_RATE: float = float(os.environ.get("PLAY_DEDUP_ERROR_RATE", "0.001"))
+    
+    # 再生回数の分散カウンター（1楽曲あたりの slot 数と Track への畳み込み間隔）
+    PLAY_COUNTER_SHARDS: int = int(os.environ.get("PLAY_COUNTER_SHARDS", "16"))
+    PLAY_COUNTER_FOLD_INTERVAL_SECONDS: float = float(os.environ.get("PLAY_COUNTER_FOLD_INTERVAL_SECONDS", "60"))
+    
+    # 再生履歴の月別パーティションと保存期間（保存期間を0にするとアーカイブしない）
+    PLAY_HISTORY_PARTITIONS_AHEAD: int = int(os.environ.get("PLAY_HISTORY_PARTITIONS_AHEAD", "2"))
+    PLAY_HISTORY_HOT_MONTHS: int = int(os.environ.get("PLAY_HISTORY_HOT_MONTHS", "2"))
+    PLAY_HISTORY_RETENTION_MONTHS: int = int(os.environ.get("PLAY_HISTORY_RETENTION_MONTHS", "13"))
+    PLAY_HISTORY_MAINTENANCE_INTERVAL_SECONDS: float = float(os.environ.get("PLAY_HISTORY_MAINTENANCE_INTERVAL_SECONDS", "3600"))
+    PLAY_ARCHIVE_DIR: str = os.environ.get("PLAY_ARCHIVE_DIR", "./archive/play_history")
+    
+    # アーティストダッシュボードのスナップショット（更新間隔と、更新を続ける閲覧からの経過秒数）
+    DASHBOARD_SNAPSHOT_REFRESH_SECONDS: float = float(os.environ.get("DASHBOARD_SNAPSHOT_REFRESH_SECONDS", "60"))
+    DASHBOARD_SNAPSHOT_IDLE_SECONDS: float = float(os.environ.get("DASHBOARD_SNAPSHOT_IDLE_SECONDS", "86400"))
+    
+    # メディアURLの署名方式（"s3": boto3 の署名付きURL / "hmac": 自前のHMAC署名トークン）
+    MEDIA_URL_SIGNER: str = os.environ.get("MEDIA_URL_SIGNER", "s3")
+    MEDIA_URL_SIGNING_KEY: str = os.environ.get("MEDIA_URL_SIGNING_KEY", "")
+    # HMAC署名URLの配信元（署名を検証するCDNまたは /api/v1/media）
+    MEDIA_BASE_URL: str = os.environ.get("MEDIA_BASE_URL", "/api/v1/media")
+    # /api/v1/media が配信するローカルストレージのルート
+    MEDIA_ROOT: str = os.environ.get("MEDIA_ROOT", "./media")
+    
     # 決済機能設定
     PAYMENT_COMING_SOON_MESSAGE: str = os.environ.get(
         "PAYMENT_COMING_SOON_MESSAGE", 
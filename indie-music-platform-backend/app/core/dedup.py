@@ -0,0 +1,125 @@
+"""
+スライディングウィンドウの重複判定（世代を入れ替える Bloom フィルター）
+
+ウィンドウを slices 個の区間に分け、区間ごとに Bloom フィルター（世代）を作る。
+判定は保持しているすべての世代を調べ、区間が進むと最も古い世代を捨てる。
+メモリ使用量は世代数 × ビット配列の大きさで固定され、キーの種類数に依存しない
+（容量を超えて追加すると誤判定率が上がるだけで、メモリは増えない）。
+"""
+
+import hashlib
+import math
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Hashable, List, Tuple
+
+
+class BloomFilter:
+    """固定サイズのビット配列による Bloom フィルター"""
+
+    def __init__(self, num_bits: int, num_hashes: int):
+        self.num_bits = max(num_bits, 8)
+        self.num_hashes = max(num_hashes, 1)
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, capacity: int, error_rate: float) -> "BloomFilter":
+        """想定件数と誤判定率からビット数とハッシュ数を決める"""
+        capacity = max(capacity, 1)
+        num_bits = math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        num_hashes = round(num_bits / capacity * math.log(2))
+        return cls(num_bits, num_hashes)
+
+    def _positions(self, digest: bytes) -> List[int]:
+        # 2つの64bitハッシュから k 個の位置を作る（ダブルハッシュ法）
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:16], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def contains(self, digest: bytes) -> bool:
+        return all(self._bits[p >> 3] & (1 << (p & 7)) for p in self._positions(digest))
+
+    def add(self, digest: bytes) -> None:
+        for p in self._positions(digest):
+            self._bits[p >> 3] |= 1 << (p & 7)
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self._bits)
+
+
+def _digest(key: Hashable) -> bytes:
+    return hashlib.blake2b(repr(key).encode("utf-8"), digest_size=16).digest()
+
+
+class SlidingWindowFilter:
+    """直近 window_seconds 秒以内に見たキーかを判定するフィルター"""
+
+    def __init__(
+        self,
+        window_seconds: float,
+        capacity: int = 100_000,
+        error_rate: float = 0.001,
+        slices: int = 4,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.window_seconds = window_seconds
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.slices = max(slices, 1)
+        self._clock = clock
+        self._lock = threading.Lock()
+        # (区間の番号, フィルター) を新しい順に保持（現在の区間 + 直前の slices 区間）
+        self._generations: Deque[Tuple[int, BloomFilter]] = deque()
+        self._seen = 0
+        self._rejected = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.window_seconds > 0
+
+    def _slice_index(self) -> int:
+        return int(self._clock() // (self.window_seconds / self.slices))
+
+    def _current(self) -> BloomFilter:
+        index = self._slice_index()
+        if not self._generations or self._generations[0][0] != index:
+            self._generations.appendleft((index, BloomFilter.for_capacity(self.capacity, self.error_rate)))
+        # ウィンドウより古い区間の世代を捨てる
+        while self._generations and self._generations[-1][0] < index - self.slices:
+            self._generations.pop()
+        return self._generations[0][1]
+
+    def check_and_add(self, key: Hashable) -> bool:
+        """
+        ウィンドウ内に同じキーがあれば True（重複）を返す
+        なければキーを記録して False を返す
+        """
+        if not self.enabled:
+            return False
+        digest = _digest(key)
+        with self._lock:
+            current = self._current()
+            self._seen += 1
+            if any(bloom.contains(digest) for _, bloom in self._generations):
+                self._rejected += 1
+                return True
+            current.add(digest)
+            return False
+
+    def reset(self) -> None:
+        with self._lock:
+            self._generations.clear()
+            self._seen = 0
+            self._rejected = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "window_seconds": self.window_seconds,
+                "generations": len(self._generations),
+                "memory_bytes": sum(bloom.size_bytes for _, bloom in self._generations),
+                "seen": self._seen,
+                "rejected": self._rejected,
+            }
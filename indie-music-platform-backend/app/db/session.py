@@ -1,5 +1,5 @@
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from app.core.config import settings
 import logging
 
@@ -25,8 +25,23 @@ def create_tables():
         from app.models.track import Track
         from app.models.purchase import Purchase
         from app.models.play_history import PlayHistory
+        from app.models.play_counter import TrackPlayCounter
+        from app.models.play_daily import PlayDaily
+        from app.models.track_listing import TrackListing, sync_listings
+        # 全文検索インデックスのDDLをメタデータに登録
+        from app.services import play_partitions, play_rollup, search_service
         
         Base.metadata.create_all(bind=engine)
+        with engine.begin() as connection:
+            sync_listings(connection)
+        # 再生履歴の当月以降のパーティションを作成（PostgreSQL）し、
+        # 集計のない既存の再生履歴を日ごとの集計へ補完
+        with Session(bind=engine) as db:
+            play_partitions.ensure_partitions(db)
+            rolled_up = play_rollup.sync_rollups(db)
+            if rolled_up:
+                logger.info(f"日ごとの再生集計を{rolled_up}件補完しました")
+        search_service.sync_index(engine)
         logger.info("データベーステーブルが正常に作成されました")
     except Exception as e:
         logger.error(f"データベーステーブルの作成に失敗しました: {str(e)}")
@@ -0,0 +1,50 @@
+"""
+集計テーブルへの加算 UPSERT
+"""
+
+from typing import Any, Dict, List, Sequence
+
+from sqlalchemy import Table, insert, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+
+def _dialect_insert(dialect_name: str):
+    if dialect_name == "postgresql":
+        return postgresql.insert
+    if dialect_name == "sqlite":
+        return sqlite.insert
+    return None
+
+
+def upsert_increment(
+    db: Session,
+    table: Table,
+    rows: List[Dict[str, Any]],
+    key_columns: Sequence[str],
+    increment_columns: Sequence[str]
+) -> None:
+    """
+    キーが一致する行があれば increment_columns を加算し、なければ INSERT（コミットは呼び出し側）
+    """
+    if not rows:
+        return
+
+    dialect_insert = _dialect_insert(db.get_bind().dialect.name)
+    if dialect_insert is not None:
+        stmt = dialect_insert(table).values(rows)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[table.c[name] for name in key_columns],
+            set_={name: table.c[name] + stmt.excluded[name] for name in increment_columns}
+        ))
+        return
+
+    # ON CONFLICT 非対応のDBでは UPDATE して該当行がなければ INSERT
+    for row in rows:
+        result = db.execute(
+            update(table)
+            .where(*[table.c[name] == row[name] for name in key_columns])
+            .values({name: table.c[name] + row[name] for name in increment_columns})
+        )
+        if result.rowcount == 0:
+            db.execute(insert(table).values(**row))
@@ -110,6 +110,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 # APIルーターのマウント
@@ -171,6 +172,18 @@ async def debug_db_status(request: Request):
             "error_type": type(e).__name__
         }
 
+# キャッシュ統計エンドポイント
+@app.get("/debug/cache-stats")
+@limiter.limit("30/minute")
+async def debug_cache_stats(request: Request):
+    from app.core.cache import catalog_cache
+    from app.services.stream_service import play_dedup_filter, stream_url_cache
+    return {
+        "catalog": catalog_cache.stats(),
+        "stream_urls": stream_url_cache.stats(),
+        "play_dedup": play_dedup_filter.stats()
+    }
+
 # 本番環境用Seedデータ作成エンドポイント
 @app.post("/debug/create-seed")
 @limiter.limit("1/hour")  # 厳格に制限
@@ -337,6 +350,31 @@ async def startup_event():
         else:
             raise
     
+    # サジェスト・急上昇インデックスを事前構築（失敗時は初回リクエストで遅延構築）
+    try:
+        from app.db.session import SessionLocal
+        from app.services.suggest_service import suggest_index
+        from app.services.trending_service import trending_index
+        db = SessionLocal()
+        try:
+            suggest_index.load(db)
+            trending_index.load(db)
+        finally:
+            db.close()
+    except Exception as e:
+        logger.warning(f"サジェスト・急上昇インデックスの構築に失敗しました: {str(e)}")
+    
+    # 再生イベントの定期書き込み、再生回数の畳み込み、再生履歴のパーティション管理、
+    # ダッシュボードのスナップショット更新を開始
+    from app.services.play_buffer import play_buffer
+    from app.services.play_counter import fold_task
+    from app.services.play_partitions import maintenance_task
+    from app.services.dashboard_service import snapshot_task
+    play_buffer.start()
+    fold_task.start()
+    maintenance_task.start()
+    snapshot_task.start()
+    
     logger.info("アプリケーションが正常に起動しました")
 
 # アプリケーション終了時のイベント
@@ -350,6 +388,20 @@ async def shutdown_event():
         }
     )
     logger.info("アプリケーションを終了しています...")
+    
+    # 溜まっている再生イベントを書き込んでから終了
+    try:
+        from app.services.play_buffer import play_buffer
+        from app.services.play_counter import fold_task
+        from app.services.play_partitions import maintenance_task
+        from app.services.dashboard_service import snapshot_task
+        snapshot_task.stop()
+        maintenance_task.stop()
+        written = play_buffer.stop()
+        logger.info(f"再生イベントを{written}件書き込みました")
+        fold_task.stop()
+    except Exception as e:
+        logger.error(f"再生イベントの書き込みに失敗しました: {str(e)}", exc_info=True)
 
 # ヘルスチェックエンドポイント（レート制限緩め）
 @app.get("/health")
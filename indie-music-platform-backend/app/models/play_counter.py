@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, Integer, ForeignKey
+from app.models.base import Base
+
+
+class TrackPlayCounter(Base):
+    """
+    楽曲ごとの再生回数の分散カウンター
+    1楽曲あたり最大 PLAY_COUNTER_SHARDS 行（slot）に分けて加算し、同じ行への書き込みの競合を避ける
+    合計は Track.play_count に定期的に畳み込まれ、読み取り時は Track.play_count + 未畳み込み分となる
+    """
+    __tablename__ = "track_play_counter"
+
+    track_id = Column(String, ForeignKey("track.id", ondelete="CASCADE"), primary_key=True)
+    slot = Column(Integer, primary_key=True, autoincrement=False)
+    plays = Column(Integer, default=0, nullable=False)
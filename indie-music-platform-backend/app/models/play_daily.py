@@ -0,0 +1,21 @@
+from sqlalchemy import Column, String, Integer, BigInteger, Date, ForeignKey, Index
+from app.models.base import Base
+
+
+class PlayDaily(Base):
+    """
+    楽曲ごと・日ごとの再生集計（PlayHistory の書き込み時に増分更新）
+    日付は PlayHistory.played_at（UTC）の日付
+    """
+    __tablename__ = "play_daily"
+
+    track_id = Column(String, ForeignKey("track.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    plays = Column(Integer, default=0, nullable=False)
+    # 再生秒数の合計（秒数が記録されていない再生は0として扱う）
+    total_duration = Column(BigInteger, default=0, nullable=False)
+
+    __table_args__ = (
+        # 期間指定の集計（日付範囲 → 楽曲）用
+        Index("ix_play_daily_day_track", "day", "track_id"),
+    )
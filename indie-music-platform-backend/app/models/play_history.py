@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, ForeignKey, DateTime, Integer
+from sqlalchemy import Column, String, ForeignKey, DateTime, Integer, Index
 from sqlalchemy.orm import relationship
 from app.models.base import Base
 import uuid
@@ -6,12 +6,26 @@ from datetime import datetime
 
 
 class PlayHistory(Base):
+    """
+    再生履歴
+    PostgreSQL では played_at の月単位でレンジパーティション化し（play_partitions）、
+    SQLite では古い月の行を月別テーブルへ移す。いずれも直近の期間を played_at で
+    絞り込むクエリは直近のパーティション（テーブル）だけを読む。
+    """
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = Column(String, ForeignKey("user.id"), nullable=True, index=True)  # 匿名再生もあり得る
-    track_id = Column(String, ForeignKey("track.id"), nullable=False, index=True)
-    played_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    user_id = Column(String, ForeignKey("user.id"), nullable=True)  # 匿名再生もあり得る
+    track_id = Column(String, ForeignKey("track.id"), nullable=False)
+    # パーティションキーは主キーに含める必要がある
+    played_at = Column(DateTime, default=datetime.utcnow, primary_key=True)
     play_duration = Column(Integer, nullable=True)  # 実際に再生された秒数（途中終了の場合）
-    
+
     # リレーションシップ
     track = relationship("Track")
     user = relationship("User")
+
+    __table_args__ = (
+        # 楽曲・ユーザーごとの期間指定の読み取り用
+        Index("ix_playhistory_track_played", "track_id", "played_at"),
+        Index("ix_playhistory_user_played", "user_id", "played_at"),
+        {"postgresql_partition_by": "RANGE (played_at)"},
+    )
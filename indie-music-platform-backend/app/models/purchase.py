@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Float, ForeignKey, DateTime, Enum
+from sqlalchemy import Column, String, Float, ForeignKey, DateTime, Enum, Index
 from sqlalchemy.orm import relationship
 from app.models.base import Base
 import uuid
@@ -23,7 +23,7 @@ class PurchaseStatus(PyEnum):
 class Purchase(Base):
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String, ForeignKey("user.id"), nullable=False, index=True)
-    track_id = Column(String, ForeignKey("track.id"), nullable=False, index=True)
+    track_id = Column(String, ForeignKey("track.id"), nullable=False)
     amount = Column(Float, nullable=False)
     purchase_date = Column(DateTime, default=datetime.utcnow, nullable=False)
     payment_method = Column(Enum(PaymentMethod), nullable=False)
@@ -34,4 +34,9 @@ class Purchase(Base):
     user = relationship("User", back_populates="purchases")
     track = relationship("Track", back_populates="purchases")
 
+    __table_args__ = (
+        # 楽曲ごとの売上集計（状態 + 購入日時の範囲）用
+        Index("ix_purchase_track_status_date", "track_id", "status", "purchase_date"),
+    )
+
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Float, Integer, Boolean, ForeignKey, Date, Text, Numeric
+from sqlalchemy import Column, String, Float, Integer, Boolean, ForeignKey, Date, Text, Numeric, Index
 from sqlalchemy.orm import relationship
 from app.models.base import Base
 import uuid
@@ -22,4 +22,9 @@ class Track(Base):
     artist = relationship("User", back_populates="tracks")
     purchases = relationship("Purchase", back_populates="track")
 
+    # アーティスト単位の楽曲参照（ダッシュボード・所有確認）用
+    __table_args__ = (
+        Index("ix_track_artist_public_release", "artist_id", "is_public", "release_date"),
+    )
+
 
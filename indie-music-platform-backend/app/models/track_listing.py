@@ -0,0 +1,105 @@
+from sqlalchemy import Column, String, Integer, Boolean, Date, DateTime, Numeric, ForeignKey, Index
+from sqlalchemy import delete, event, insert, inspect, select, update
+from app.models.base import Base
+from app.models.track import Track
+from app.models.user import User
+
+
+class TrackListing(Base):
+    """
+    楽曲一覧用の非正規化テーブル（Track ⨝ User の読み取りモデル）
+    TrackListItem の列とソートキーのみを保持し、一覧・検索を単一テーブルで処理する
+    Track / User の変更はマッパーイベントで同一トランザクション内に反映される
+    """
+    __tablename__ = "track_listing"
+
+    track_id = Column(String, ForeignKey("track.id", ondelete="CASCADE"), primary_key=True)
+    title = Column(String, nullable=False)
+    artist_id = Column(String, nullable=False)
+    artist_name = Column(String, nullable=False)
+    cover_art_url = Column(String, nullable=True)
+    duration = Column(Integer, nullable=False)
+    price = Column(Numeric(10, 2), nullable=False)
+    genre = Column(String, nullable=True)
+    release_date = Column(Date, nullable=False)
+    play_count = Column(Integer, default=0, nullable=False)
+    is_public = Column(Boolean, default=True, nullable=False)
+    # ソートキーとして楽曲の作成日時をそのまま保持
+    created_at = Column(DateTime(timezone=True), nullable=False)
+
+    # 一覧の絞り込み（公開 + 任意のジャンル / アーティスト）とソート順に合わせた複合インデックス
+    # 末尾の track_id はカーソルの同値判定用で、ソート・キーセット条件をインデックスだけで処理できる
+    __table_args__ = (
+        Index("ix_track_listing_public_created", "is_public", "created_at", "track_id"),
+        Index("ix_track_listing_public_play_count", "is_public", "play_count", "track_id"),
+        Index("ix_track_listing_public_release", "is_public", "release_date", "track_id"),
+        Index("ix_track_listing_public_title", "is_public", "title", "track_id"),
+        Index("ix_track_listing_genre_created", "genre", "is_public", "created_at", "track_id"),
+        Index("ix_track_listing_genre_play_count", "genre", "is_public", "play_count", "track_id"),
+        Index("ix_track_listing_genre_release", "genre", "is_public", "release_date", "track_id"),
+        Index("ix_track_listing_artist_release", "artist_id", "is_public", "release_date", "track_id"),
+    )
+
+
+# 射影する列（TrackListing の列 → 元テーブルの列）
+_PROJECTION = [
+    (TrackListing.track_id, Track.id),
+    (TrackListing.title, Track.title),
+    (TrackListing.artist_id, Track.artist_id),
+    (TrackListing.artist_name, User.display_name),
+    (TrackListing.cover_art_url, Track.cover_art_url),
+    (TrackListing.duration, Track.duration),
+    (TrackListing.price, Track.price),
+    (TrackListing.genre, Track.genre),
+    (TrackListing.release_date, Track.release_date),
+    (TrackListing.play_count, Track.play_count),
+    (TrackListing.is_public, Track.is_public),
+    (TrackListing.created_at, Track.created_at),
+]
+
+
+def _projection_select():
+    return select(*[source for _, source in _PROJECTION])\
+        .join(User, Track.artist_id == User.id)
+
+
+def projection_insert(track_filter):
+    """条件に一致する楽曲の射影行を INSERT ... SELECT で作成する文"""
+    return insert(TrackListing.__table__).from_select(
+        [target.key for target, _ in _PROJECTION],
+        _projection_select().where(track_filter)
+    )
+
+
+def refresh_listing(connection, track_id: str) -> None:
+    """楽曲1件の射影行を作り直す"""
+    connection.execute(delete(TrackListing.__table__).where(TrackListing.track_id == track_id))
+    connection.execute(projection_insert(Track.id == track_id))
+
+
+def sync_listings(connection) -> int:
+    """射影行が存在しない楽曲を補完する（既存DBのバックフィル用）"""
+    missing = ~Track.id.in_(select(TrackListing.track_id))
+    return connection.execute(projection_insert(missing)).rowcount or 0
+
+
+@event.listens_for(Track, "after_insert")
+@event.listens_for(Track, "after_update")
+def _track_written(mapper, connection, target):
+    refresh_listing(connection, target.id)
+
+
+@event.listens_for(Track, "after_delete")
+def _track_deleted(mapper, connection, target):
+    connection.execute(delete(TrackListing.__table__).where(TrackListing.track_id == target.id))
+
+
+@event.listens_for(User, "after_update")
+def _user_updated(mapper, connection, target):
+    # アーティスト名の変更を一覧に反映
+    if inspect(target).attrs.display_name.history.has_changes():
+        connection.execute(
+            update(TrackListing.__table__)
+            .where(TrackListing.artist_id == target.id)
+            .values(artist_name=target.display_name)
+        )
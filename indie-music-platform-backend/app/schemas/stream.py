@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
+from typing import List, Optional
 from app.schemas.base import BaseSchema
 
 
@@ -15,3 +16,22 @@ class StreamResponse(BaseSchema):
 class PlayEvent(BaseSchema):
     track_id: str
     duration: int  # 実際に再生された秒数
+    played_at: Optional[datetime] = None  # クライアント側の再生日時（一括送信用）
+
+
+class PlayEventBatch(BaseSchema):
+    events: List[PlayEvent]
+
+
+class PlayEventResult(BaseSchema):
+    index: int
+    track_id: str
+    accepted: bool
+    # 拒否理由: track_not_found / forbidden / invalid_duration / future_timestamp / too_old / duplicate
+    reason: Optional[str] = None
+
+
+class PlayEventBatchResult(BaseSchema):
+    accepted: int
+    rejected: int
+    results: List[PlayEventResult]
@@ -60,3 +60,19 @@ class TrackListItem(BaseSchema):
     play_count: int
 
 
+class TrendingTrack(TrackListItem):
+    trending_score: float  # 半減期ごとに半分になる再生数の合計
+
+
+class TrackBatch(BaseSchema):
+    tracks: List[TrackWithArtist]  # 指定順（重複は除く）
+    missing_ids: List[str]
+
+
+
+
+class TrackSuggestion(BaseSchema):
+    type: str  # "track" または "artist"
+    id: str
+    text: str
+    play_count: int
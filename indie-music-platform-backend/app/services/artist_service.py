@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Session
-from sqlalchemy.sql import func, desc
+from sqlalchemy.sql import func, desc, literal, null, select, union_all
 from fastapi import HTTPException
 from datetime import datetime, date, timedelta
 from typing import Dict, Any, List, Optional
@@ -7,7 +7,9 @@ from typing import Dict, Any, List, Optional
 from app.models.user import User, UserRole
 from app.models.track import Track
 from app.models.purchase import Purchase, PurchaseStatus
-from app.models.play_history import PlayHistory
+from app.models.play_counter import TrackPlayCounter
+from app.models.play_daily import PlayDaily
+from app.utils.date_range import within_days
 from starlette.status import HTTP_404_NOT_FOUND
 
 
@@ -47,52 +49,43 @@ def get_artist_revenue(
     if not end_date:
         end_date = datetime.now().date()
     
-    # 期間中の購入データの取得
-    purchases = db.query(
-        Purchase.purchase_date,
-        Purchase.amount,
-        Track.title
-    ).join(
-        Track, Purchase.track_id == Track.id
-    ).filter(
-        Track.artist_id == artist_id,
-        Purchase.status == PurchaseStatus.COMPLETED,
-        func.date(Purchase.purchase_date) >= start_date,
-        func.date(Purchase.purchase_date) <= end_date
-    ).all()
-    
-    # 日ごとの収益集計
-    daily_revenue = {}
-    total_revenue = 0
-    
-    for purchase in purchases:
-        purchase_date = purchase.purchase_date.date().isoformat()
-        amount = purchase.amount
-        
-        if purchase_date not in daily_revenue:
-            daily_revenue[purchase_date] = 0
-        
-        daily_revenue[purchase_date] += amount
-        total_revenue += amount
-    
-    # 楽曲ごとの収益集計
-    track_revenue = db.query(
-        Track.id,
-        Track.title,
-        func.count(Purchase.id).label("sales_count"),
-        func.sum(Purchase.amount).label("total_amount")
-    ).join(
-        Purchase, Track.id == Purchase.track_id
-    ).filter(
-        Track.artist_id == artist_id,
-        Purchase.status == PurchaseStatus.COMPLETED,
-        func.date(Purchase.purchase_date) >= start_date,
-        func.date(Purchase.purchase_date) <= end_date
-    ).group_by(
-        Track.id, Track.title
-    ).order_by(
-        desc("total_amount")
-    ).all()
+    # 日ごと・楽曲ごと・期間全体の集計を1回の UNION ALL クエリで取得
+    # （返る行数は日数 + 楽曲数 + 1 で、販売件数には比例しない）
+    purchase_day = func.date(Purchase.purchase_date)
+
+    def grouped(kind, day, track_id, title, *group_by):
+        query = select(
+            literal(kind).label("kind"),
+            day.label("day"),
+            track_id.label("track_id"),
+            title.label("title"),
+            func.count(Purchase.id).label("sales_count"),
+            func.sum(Purchase.amount).label("total_amount")
+        ).select_from(Purchase).join(
+            Track, Purchase.track_id == Track.id
+        ).where(
+            Track.artist_id == artist_id,
+            Purchase.status == PurchaseStatus.COMPLETED,
+            *within_days(Purchase.purchase_date, start_date, end_date)
+        )
+        return query.group_by(*group_by) if group_by else query
+
+    rows = db.execute(union_all(
+        grouped("day", purchase_day, null(), null(), purchase_day),
+        grouped("track", null(), Track.id, Track.title, Track.id, Track.title),
+        grouped("total", null(), null(), null())
+    )).all()
+
+    daily_revenue = sorted(
+        (str(row.day), float(row.total_amount or 0)) for row in rows if row.kind == "day"
+    )
+    track_revenue = sorted(
+        (row for row in rows if row.kind == "track"),
+        key=lambda row: row.total_amount or 0,
+        reverse=True
+    )
+    totals = next(row for row in rows if row.kind == "total")
+    total_revenue = float(totals.total_amount or 0)
     
     # 手数料計算（例: 15%のプラットフォーム手数料）
     platform_fee = total_revenue * 0.15
@@ -108,15 +101,15 @@ def get_artist_revenue(
             "total_revenue": total_revenue,
             "platform_fee": platform_fee,
             "net_revenue": net_revenue,
-            "sales_count": len(purchases)
+            "sales_count": totals.sales_count
         },
         "daily_revenue": [
-            {"date": date, "amount": amount}
-            for date, amount in sorted(daily_revenue.items())
+            {"date": day, "amount": amount}
+            for day, amount in daily_revenue
         ],
         "track_revenue": [
             {
-                "track_id": str(item.id),
+                "track_id": str(item.track_id),
                 "title": item.title,
                 "sales_count": item.sales_count,
                 "total_amount": float(item.total_amount) if item.total_amount else 0
@@ -151,32 +144,39 @@ def get_artist_stats(
     if not end_date:
         end_date = datetime.now().date()
     
-    # 全楽曲の合計再生回数
+    # 全楽曲の合計再生回数（畳み込み済み + 分散カウンターの未畳み込み分）
     total_plays = db.query(func.sum(Track.play_count)).filter(
         Track.artist_id == artist_id
     ).scalar() or 0
-    
-    # 期間中の再生数
-    period_plays = db.query(func.count(PlayHistory.id)).join(
-        Track, PlayHistory.track_id == Track.id
+    total_plays += db.query(func.sum(TrackPlayCounter.plays)).join(
+        Track, TrackPlayCounter.track_id == Track.id
     ).filter(
-        Track.artist_id == artist_id,
-        func.date(PlayHistory.played_at) >= start_date,
-        func.date(PlayHistory.played_at) <= end_date
+        Track.artist_id == artist_id
     ).scalar() or 0
     
+    # 期間中の集計はすべて日ごとの集計（play_daily）から読む
+    period_filter = (
+        Track.artist_id == artist_id,
+        PlayDaily.day >= start_date,
+        PlayDaily.day <= end_date
+    )
+
+    # 期間中の再生数と再生秒数
+    period_plays, period_duration = db.query(
+        func.coalesce(func.sum(PlayDaily.plays), 0),
+        func.coalesce(func.sum(PlayDaily.total_duration), 0)
+    ).join(
+        Track, PlayDaily.track_id == Track.id
+    ).filter(*period_filter).one()
+    
     # 楽曲ごとの再生数ランキング
     track_plays = db.query(
         Track.id,
         Track.title,
-        func.count(PlayHistory.id).label("play_count")
+        func.sum(PlayDaily.plays).label("play_count")
     ).join(
-        PlayHistory, Track.id == PlayHistory.track_id
-    ).filter(
-        Track.artist_id == artist_id,
-        func.date(PlayHistory.played_at) >= start_date,
-        func.date(PlayHistory.played_at) <= end_date
-    ).group_by(
+        PlayDaily, Track.id == PlayDaily.track_id
+    ).filter(*period_filter).group_by(
         Track.id, Track.title
     ).order_by(
         desc("play_count")
@@ -184,18 +184,14 @@ def get_artist_stats(
     
     # 日ごとの再生数
     daily_plays = db.query(
-        func.date(PlayHistory.played_at).label("play_date"),
-        func.count(PlayHistory.id).label("play_count")
+        PlayDaily.day.label("play_date"),
+        func.sum(PlayDaily.plays).label("play_count")
     ).join(
-        Track, PlayHistory.track_id == Track.id
-    ).filter(
-        Track.artist_id == artist_id,
-        func.date(PlayHistory.played_at) >= start_date,
-        func.date(PlayHistory.played_at) <= end_date
-    ).group_by(
-        "play_date"
+        Track, PlayDaily.track_id == Track.id
+    ).filter(*period_filter).group_by(
+        PlayDaily.day
     ).order_by(
-        "play_date"
+        PlayDaily.day
     ).all()
     
     # レスポンスの構築
@@ -206,21 +202,22 @@ def get_artist_stats(
         },
         "summary": {
             "total_plays_all_time": total_plays,
-            "total_plays_period": period_plays,
+            "total_plays_period": int(period_plays),
+            "total_play_seconds_period": int(period_duration),
             "track_count": db.query(Track).filter(Track.artist_id == artist_id).count()
         },
         "top_tracks": [
             {
                 "track_id": str(item.id),
                 "title": item.title,
-                "play_count": item.play_count
+                "play_count": int(item.play_count)
             }
             for item in track_plays
         ],
         "daily_plays": [
             {
                 "date": item.play_date.isoformat(),
-                "play_count": item.play_count
+                "play_count": int(item.play_count)
             }
             for item in daily_plays
         ]
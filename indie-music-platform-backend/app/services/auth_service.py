@@ -1,6 +1,8 @@
 from sqlalchemy.orm import Session
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate, UserRole
+from app.services import search_service, track_service
+from app.services.suggest_service import suggest_index
 from fastapi import HTTPException
 from starlette.status import HTTP_400_BAD_REQUEST, HTTP_404_NOT_FOUND
 
@@ -74,13 +76,21 @@ def update_user(db: Session, user_id: str, user_data: UserUpdate) -> User:
         )
     
     # 更新可能なフィールドのみを更新
+    renamed = user_data.display_name is not None and user_data.display_name != user.display_name
     if user_data.display_name is not None:
         user.display_name = user_data.display_name
     if user_data.profile_image is not None:
         user.profile_image = user_data.profile_image
     
+    # アーティスト名は検索インデックスに含まれるため再登録
+    if renamed:
+        search_service.reindex_artist(db, user_id)
+    
     db.commit()
     db.refresh(user)
+    if renamed:
+        track_service.invalidate_catalog(artist_id=user_id)
+        suggest_index.rename_artist(user_id, user.display_name)
     return user
 
 
@@ -0,0 +1,173 @@
+"""
+アーティストダッシュボード（統計・収益）の事前計算スナップショット
+
+既定の期間（今月、直近30日）の統計・収益をアーティストごとに保持し、
+バックグラウンドで DASHBOARD_SNAPSHOT_REFRESH_SECONDS ごとに再計算する。
+既定の期間のリクエストはスナップショットを返し（辞書の参照のみ）、
+任意の期間を指定したリクエストだけが集計クエリを実行する。
+更新対象は DASHBOARD_SNAPSHOT_IDLE_SECONDS 以内にダッシュボードを開いたアーティストに限る。
+"""
+
+import logging
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.periodic import PeriodicTask
+from app.services import artist_service
+
+logger = logging.getLogger(__name__)
+
+# スナップショットの種類
+KIND_STATS = "stats"
+KIND_REVENUE = "revenue"
+
+# 既定の期間
+PERIOD_THIS_MONTH = "this_month"
+PERIOD_LAST_30_DAYS = "last_30_days"
+
+_COMPUTE: Dict[str, Callable[..., Dict[str, Any]]] = {
+    KIND_STATS: artist_service.get_artist_stats,
+    KIND_REVENUE: artist_service.get_artist_revenue,
+}
+
+# 期間を指定しない場合の既定の期間（artist_service の既定値と同じ）
+_DEFAULT_PERIOD = {
+    KIND_STATS: PERIOD_LAST_30_DAYS,
+    KIND_REVENUE: PERIOD_THIS_MONTH,
+}
+
+SnapshotKey = Tuple[str, str, str]  # (アーティストID, 種類, 期間)
+
+
+def default_periods(today: date) -> Dict[str, Tuple[date, date]]:
+    """既定の期間ごとの (開始日, 終了日)"""
+    return {
+        PERIOD_THIS_MONTH: (today.replace(day=1), today),
+        PERIOD_LAST_30_DAYS: (today - timedelta(days=30), today),
+    }
+
+
+class DashboardSnapshots:
+    """アーティストごとの既定期間のダッシュボードを保持する"""
+
+    def __init__(self, idle_seconds: float = 86400.0):
+        self.idle_seconds = idle_seconds
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._snapshots: Dict[SnapshotKey, Tuple[Tuple[date, date], Dict[str, Any]]] = {}
+            self._last_viewed: Dict[str, float] = {}
+
+    def _match_period(self, kind: str, start_date: Optional[date], end_date: Optional[date], today: date) -> Optional[str]:
+        if start_date is None and end_date is None:
+            return _DEFAULT_PERIOD[kind]
+        for period, bounds in default_periods(today).items():
+            if (start_date, end_date) == bounds:
+                return period
+        return None
+
+    def get(
+        self,
+        db: Session,
+        kind: str,
+        artist_id: str,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        today: Optional[date] = None
+    ) -> Dict[str, Any]:
+        """
+        既定の期間はスナップショットから、それ以外は集計クエリで返す
+        スナップショットがまだない（初回・日付が変わった）場合はその場で計算して保持する
+        """
+        today = today or datetime.now().date()
+        period = self._match_period(kind, start_date, end_date, today)
+        if period is None:
+            return _COMPUTE[kind](db, artist_id, start_date, end_date)
+
+        key = (artist_id, kind, period)
+        bounds = default_periods(today)[period]
+        with self._lock:
+            self._last_viewed[artist_id] = time.monotonic()
+            cached = self._snapshots.get(key)
+        if cached is not None and cached[0] == bounds:
+            return cached[1]
+
+        payload = _COMPUTE[kind](db, artist_id, *bounds)
+        with self._lock:
+            self._snapshots[key] = (bounds, payload)
+        return payload
+
+    def refresh(self, db: Session, today: Optional[date] = None) -> int:
+        """閲覧中のアーティストのスナップショットを再計算し、更新した件数を返す"""
+        today = today or datetime.now().date()
+        now = time.monotonic()
+        with self._lock:
+            for artist_id in [a for a, viewed in self._last_viewed.items() if now - viewed > self.idle_seconds]:
+                self._forget(artist_id)
+            artist_ids = list(self._last_viewed)
+
+        refreshed = 0
+        periods = default_periods(today)
+        for artist_id in artist_ids:
+            try:
+                snapshots = {
+                    (artist_id, kind, period): (bounds, compute(db, artist_id, *bounds))
+                    for kind, compute in _COMPUTE.items()
+                    for period, bounds in periods.items()
+                }
+            except HTTPException:
+                # アーティストでなくなった・削除されたユーザー
+                with self._lock:
+                    self._forget(artist_id)
+                continue
+            with self._lock:
+                if artist_id in self._last_viewed:
+                    self._snapshots.update(snapshots)
+                    refreshed += len(snapshots)
+        return refreshed
+
+    def _forget(self, artist_id: str) -> None:
+        self._last_viewed.pop(artist_id, None)
+        for key in [key for key in self._snapshots if key[0] == artist_id]:
+            del self._snapshots[key]
+
+
+def get_artist_stats(db: Session, artist_id: str, start_date: Optional[date] = None, end_date: Optional[date] = None) -> Dict[str, Any]:
+    """アーティスト統計（既定の期間はスナップショット）"""
+    return dashboard_snapshots.get(db, KIND_STATS, artist_id, start_date, end_date)
+
+
+def get_artist_revenue(db: Session, artist_id: str, start_date: Optional[date] = None, end_date: Optional[date] = None) -> Dict[str, Any]:
+    """アーティスト収益（既定の期間はスナップショット）"""
+    return dashboard_snapshots.get(db, KIND_REVENUE, artist_id, start_date, end_date)
+
+
+def _refresh_with_new_session() -> None:
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        refreshed = dashboard_snapshots.refresh(db)
+    finally:
+        db.close()
+    if refreshed:
+        logger.debug(f"ダッシュボードのスナップショットを更新しました: {refreshed}件")
+
+
+# アプリケーション全体で共有するスナップショット
+dashboard_snapshots = DashboardSnapshots(idle_seconds=settings.DASHBOARD_SNAPSHOT_IDLE_SECONDS)
+
+# スナップショットの定期更新（アプリ起動時に開始）
+snapshot_task = PeriodicTask(
+    "artist-dashboard-snapshots",
+    settings.DASHBOARD_SNAPSHOT_REFRESH_SECONDS,
+    _refresh_with_new_session
+)
@@ -0,0 +1,139 @@
+"""
+アーティストの売上・再生履歴のエクスポート
+
+行はサーバーサイドカーソル（stream_results + yield_per）で EXPORT_BATCH_ROWS 件ずつ読み、
+CSV のチャンクまたは Parquet の row group として逐次書き出す。
+結果全体をメモリに載せないため、数百万行のエクスポートでもメモリ使用量は一定。
+"""
+
+from datetime import date
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from starlette.status import HTTP_400_BAD_REQUEST
+
+from app.models.purchase import Purchase
+from app.models.track import Track
+from app.services.play_partitions import history_tables
+from app.utils.date_range import days_filter
+from app.utils.tabular_stream import ColumnSpec, iter_csv, iter_parquet
+
+# 1回に読み込む（Parquet では1つの row group にする）行数
+EXPORT_BATCH_ROWS = 10_000
+
+FORMAT_CSV = "csv"
+FORMAT_PARQUET = "parquet"
+
+MEDIA_TYPES = {
+    FORMAT_CSV: "text/csv; charset=utf-8",
+    FORMAT_PARQUET: "application/vnd.apache.parquet",
+}
+
+# 購入者・再生者のユーザーIDは個人情報のため出力しない
+SALES_COLUMNS: List[ColumnSpec] = [
+    ("purchase_id", "string"),
+    ("purchased_at", "timestamp"),
+    ("track_id", "string"),
+    ("track_title", "string"),
+    ("amount", "float"),
+    ("payment_method", "string"),
+    ("status", "string"),
+    ("transaction_id", "string"),
+]
+
+PLAY_COLUMNS: List[ColumnSpec] = [
+    ("play_id", "string"),
+    ("played_at", "timestamp"),
+    ("track_id", "string"),
+    ("track_title", "string"),
+    ("play_duration", "int"),
+]
+
+
+def _check_format(export_format: str) -> str:
+    export_format = (export_format or FORMAT_CSV).lower()
+    if export_format not in MEDIA_TYPES:
+        raise HTTPException(
+            status_code=HTTP_400_BAD_REQUEST,
+            detail=f"出力形式は {', '.join(MEDIA_TYPES)} のいずれかを指定してください"
+        )
+    return export_format
+
+
+def _iter_batches(db: Session, statements: Iterable[Any]) -> Iterator[List[Tuple[Any, ...]]]:
+    """各クエリの結果を EXPORT_BATCH_ROWS 件ずつ、サーバーサイドカーソルで読む"""
+    for statement in statements:
+        result = db.execute(
+            statement.execution_options(stream_results=True, yield_per=EXPORT_BATCH_ROWS)
+        )
+        try:
+            for rows in result.partitions():
+                yield [tuple(row) for row in rows]
+        finally:
+            result.close()
+
+
+def _encode(export_format: str, columns: List[ColumnSpec], batches: Iterator[List[Tuple[Any, ...]]]) -> Iterator[bytes]:
+    if export_format == FORMAT_PARQUET:
+        return iter_parquet(columns, batches)
+    return iter_csv(columns, batches)
+
+
+def export_filename(kind: str, export_format: str, start_date: Optional[date] = None, end_date: Optional[date] = None) -> str:
+    parts = [kind]
+    if start_date or end_date:
+        parts.append(f"{start_date:%Y%m%d}" if start_date else "")
+        parts.append(f"{end_date:%Y%m%d}" if end_date else "")
+    return "_".join(parts) + "." + export_format
+
+
+def export_sales(
+    db: Session,
+    artist_id: str,
+    export_format: str = FORMAT_CSV,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+) -> Tuple[str, Iterator[bytes]]:
+    """
+    アーティストの楽曲の購入を購入日時順に出力し、(メディアタイプ, バイト列のイテレーター) を返す
+    出力形式の検証はレスポンス送信前にエラーを返せるよう呼び出し時に行う
+    """
+    export_format = _check_format(export_format)
+    statement = select(
+        Purchase.id, Purchase.purchase_date, Purchase.track_id, Track.title,
+        Purchase.amount, Purchase.payment_method, Purchase.status, Purchase.transaction_id
+    ).join(
+        Track, Purchase.track_id == Track.id
+    ).where(
+        Track.artist_id == artist_id,
+        *days_filter(Purchase.purchase_date, start_date, end_date)
+    ).order_by(Purchase.purchase_date, Purchase.id)
+    return MEDIA_TYPES[export_format], _encode(export_format, SALES_COLUMNS, _iter_batches(db, [statement]))
+
+
+def export_plays(
+    db: Session,
+    artist_id: str,
+    export_format: str = FORMAT_CSV,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+) -> Tuple[str, Iterator[bytes]]:
+    """
+    アーティストの楽曲の再生履歴を再生日時順に出力し、(メディアタイプ, バイト列のイテレーター) を返す
+    SQLite で月別テーブルへ移した古い月も含める（アーカイブ済みの月は含まない）
+    """
+    export_format = _check_format(export_format)
+    statements = [
+        select(
+            history.c.id, history.c.played_at, history.c.track_id, Track.title, history.c.play_duration
+        ).join(
+            Track, history.c.track_id == Track.id
+        ).where(
+            Track.artist_id == artist_id,
+            *days_filter(history.c.played_at, start_date, end_date)
+        ).order_by(history.c.played_at, history.c.id)
+        for history in history_tables(db, start_date, end_date)
+    ]
+    return MEDIA_TYPES[export_format], _encode(export_format, PLAY_COLUMNS, _iter_batches(db, statements))
@@ -0,0 +1,161 @@
+"""
+楽曲の完走率・リテンション（再生継続率）の集計
+
+リテンション曲線は「再生開始から t 秒の時点でまだ再生されていた割合」で、
+再生された秒数（PlayHistory.play_duration、途中終了でなければ楽曲の長さ）の
+ヒストグラムを後ろから累積した値を再生数で割って求める。
+
+再生ごとの行は DB 側で (楽曲, 再生された秒数) ごとの件数にまとめてから読み込み、
+NumPy の配列演算（bincount / cumsum）でヒストグラムと曲線を計算する。
+"""
+
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy
+from fastapi import HTTPException
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+from starlette.status import HTTP_404_NOT_FOUND
+
+from app.models.track import Track
+from app.services.play_partitions import history_tables
+from app.utils.date_range import days_filter
+
+# 楽曲の長さのこの割合以上を再生したら完走とみなす
+COMPLETION_RATIO = 0.95
+
+# 全楽曲をまとめた曲線の刻み（楽曲の長さに対する 0〜100%）
+PERCENT_BINS = 101
+
+# (楽曲ID, 再生された秒数, 再生数)
+HistogramRow = Tuple[str, int, int]
+
+
+def _histogram_statement(history, artist_id: str, track_id: Optional[str], start_date: Optional[date], end_date: Optional[date]):
+    # 再生された秒数を 0〜楽曲の長さに丸める（未設定は最後まで再生）
+    listened = case(
+        (history.c.play_duration.is_(None), Track.duration),
+        (history.c.play_duration > Track.duration, Track.duration),
+        (history.c.play_duration < 0, 0),
+        else_=history.c.play_duration
+    )
+    criteria = [Track.artist_id == artist_id, *days_filter(history.c.played_at, start_date, end_date)]
+    if track_id is not None:
+        criteria.append(history.c.track_id == track_id)
+    return select(
+        history.c.track_id, listened.label("seconds"), func.count().label("plays")
+    ).join(
+        Track, history.c.track_id == Track.id
+    ).where(*criteria).group_by(history.c.track_id, listened)
+
+
+def _fetch_histogram(
+    db: Session,
+    artist_id: str,
+    track_id: Optional[str],
+    start_date: Optional[date],
+    end_date: Optional[date]
+) -> List[HistogramRow]:
+    rows: List[HistogramRow] = []
+    for history in history_tables(db, start_date, end_date):
+        rows.extend(db.execute(_histogram_statement(history, artist_id, track_id, start_date, end_date)).all())
+    return rows
+
+
+def _aggregate(durations: Sequence[int], track_index: Dict[str, int], rows: List[HistogramRow], curve_index: Optional[int]) -> Dict[str, Any]:
+    count = len(durations)
+    if rows:
+        row_tracks, row_seconds, row_plays = zip(*rows)
+    else:
+        row_tracks, row_seconds, row_plays = (), (), ()
+    ids = numpy.array(sorted(track_index))
+    index = numpy.searchsorted(ids, numpy.array(row_tracks, dtype=ids.dtype)) if rows else numpy.zeros(0, dtype=numpy.int64)
+    seconds = numpy.array(row_seconds, dtype=numpy.int64)
+    plays = numpy.array(row_plays, dtype=numpy.int64)
+    length = numpy.maximum(numpy.array(durations, dtype=numpy.int64), 1)[index]
+
+    complete = seconds >= length * COMPLETION_RATIO
+    percent = numpy.minimum(seconds * 100 // length, 100)
+    result = {
+        "plays": numpy.bincount(index, weights=plays, minlength=count),
+        "completions": numpy.bincount(index, weights=plays * complete, minlength=count),
+        "listened_seconds": numpy.bincount(index, weights=plays * seconds, minlength=count),
+        "listened_ratio": numpy.bincount(index, weights=plays * seconds / length, minlength=count),
+        "percent_histogram": numpy.bincount(percent, weights=plays, minlength=PERCENT_BINS),
+        "second_histogram": None,
+    }
+    if curve_index is not None:
+        selected = index == curve_index
+        result["second_histogram"] = numpy.bincount(
+            seconds[selected], weights=plays[selected], minlength=max(durations[curve_index], 0) + 1
+        )
+    return {key: value.tolist() if value is not None else None for key, value in result.items()}
+
+
+def _retention_curve(histogram: Sequence[float]) -> List[float]:
+    """ヒストグラム（その時点で再生を終えた件数）から各時点の再生継続率を求める"""
+    remaining = numpy.cumsum(numpy.asarray(histogram, dtype=numpy.float64)[::-1])[::-1]
+    total = remaining[0] if len(remaining) else 0.0
+    return numpy.round(remaining / total, 4).tolist() if total else [0.0] * len(remaining)
+
+
+def _ratio(numerator: float, denominator: float) -> float:
+    return round(numerator / denominator, 4) if denominator else 0.0
+
+
+def get_listener_retention(
+    db: Session,
+    artist_id: str,
+    track_id: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+) -> Dict[str, Any]:
+    """
+    アーティストの楽曲ごとの完走率と、楽曲の長さに対する割合（0〜100%）ごとのリテンション曲線を取得
+    track_id を指定した場合はその楽曲の1秒ごとのリテンション曲線も返す
+    """
+    query = db.query(Track.id, Track.title, Track.duration).filter(Track.artist_id == artist_id)
+    if track_id is not None:
+        query = query.filter(Track.id == track_id)
+    # searchsorted で楽曲の位置を引くため、DB の照合順序ではなく Python の順序で並べる
+    tracks = sorted(query.all(), key=lambda track: track.id)
+    if track_id is not None and not tracks:
+        raise HTTPException(
+            status_code=HTTP_404_NOT_FOUND,
+            detail="楽曲が見つかりません"
+        )
+
+    durations = [track.duration or 0 for track in tracks]
+    track_index = {track.id: index for index, track in enumerate(tracks)}
+    rows = _fetch_histogram(db, artist_id, track_id, start_date, end_date)
+    totals = _aggregate(durations, track_index, rows, 0 if track_id is not None else None)
+
+    total_plays = sum(totals["plays"])
+    result = {
+        "period": {
+            "start_date": start_date.isoformat() if start_date else None,
+            "end_date": end_date.isoformat() if end_date else None
+        },
+        "summary": {
+            "plays": int(total_plays),
+            "completion_rate": _ratio(sum(totals["completions"]), total_plays),
+            "average_listen_ratio": _ratio(sum(totals["listened_ratio"]), total_plays)
+        },
+        "retention_by_percent": _retention_curve(totals["percent_histogram"]),
+        "tracks": sorted([
+            {
+                "track_id": track.id,
+                "title": track.title,
+                "duration": track.duration,
+                "plays": int(totals["plays"][index]),
+                "completion_rate": _ratio(totals["completions"][index], totals["plays"][index]),
+                "average_listen_seconds": round(totals["listened_seconds"][index] / totals["plays"][index], 1) if totals["plays"][index] else 0.0,
+                "average_listen_ratio": _ratio(totals["listened_ratio"][index], totals["plays"][index])
+            }
+            for index, track in enumerate(tracks)
+        ], key=lambda item: item["plays"], reverse=True)
+    }
+    if track_id is not None:
+        result["retention_by_second"] = _retention_curve(totals["second_histogram"])
+    return result
@@ -0,0 +1,194 @@
+"""
+再生イベントの取り込みバッファ
+
+record_play の再生イベントをプロセス内に溜め、一定間隔（PLAY_BUFFER_FLUSH_INTERVAL_MS）
+または一定件数（PLAY_BUFFER_MAX_EVENTS）ごとにまとめて書き込む。
+1回のフラッシュは PlayHistory の一括 INSERT と、楽曲ごとに集計した加算数の
+分散カウンター（play_counter）・日ごとの集計（play_rollup）への反映を1トランザクションで行う。
+"""
+
+import logging
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.play_history import PlayHistory
+from app.models.track import Track
+from app.models.user import User
+from app.services import play_counter, play_rollup
+from app.services.suggest_service import suggest_index
+from app.services.trending_service import trending_index
+
+logger = logging.getLogger(__name__)
+
+
+def apply_play_events(db: Session, events: List[Dict[str, Any]]) -> Counter:
+    """
+    再生イベントを一括で書き込み、楽曲ごとの加算数を返す（コミットは呼び出し側）
+    """
+    if not events:
+        return Counter()
+
+    db.execute(insert(PlayHistory), events)
+
+    # 再生回数は分散カウンターに加算（Track の行には書き込まない）
+    plays = Counter(event["track_id"] for event in events)
+    play_counter.increment(db, plays)
+    play_rollup.add_events(db, events)
+    return plays
+
+
+def write_play_events(db: Session, events: List[Dict[str, Any]]) -> None:
+    """再生イベントを1トランザクションで書き込み、サジェストと急上昇のスコアに反映"""
+    try:
+        plays = apply_play_events(db, events)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    for track_id, count in plays.items():
+        suggest_index.add_plays(track_id, count)
+    trending_index.add_events(events)
+
+
+def drop_orphaned_events(db: Session, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """削除済みの楽曲・ユーザーを参照するイベントを除いたイベントを返す"""
+    track_ids = {event["track_id"] for event in events}
+    user_ids = {event["user_id"] for event in events if event["user_id"] is not None}
+    tracks = set(db.scalars(select(Track.id).where(Track.id.in_(track_ids)))) if track_ids else set()
+    users = set(db.scalars(select(User.id).where(User.id.in_(user_ids)))) if user_ids else set()
+    return [
+        event for event in events
+        if event["track_id"] in tracks and (event["user_id"] is None or event["user_id"] in users)
+    ]
+
+
+class PlayEventBuffer:
+    """再生イベントを溜めて定期的に一括書き込みするバッファ"""
+
+    def __init__(self, max_events: int = 500, flush_interval_ms: int = 1000):
+        self.max_events = max_events
+        self.flush_interval_ms = flush_interval_ms
+        self._lock = threading.Lock()
+        # 書き込み先のエンジンごとの未書き込みイベント
+        self._pending: Dict[Engine, List[Dict[str, Any]]] = {}
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_events > 1 and self.flush_interval_ms > 0
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return sum(len(events) for events in self._pending.values())
+
+    def reset(self) -> None:
+        """未書き込みのイベントを破棄"""
+        with self._lock:
+            self._pending = {}
+
+    def add(
+        self,
+        db: Session,
+        track_id: str,
+        user_id: Optional[str] = None,
+        duration: Optional[int] = None,
+        played_at: Optional[datetime] = None
+    ) -> None:
+        """再生イベントを追加（無効時・上限到達時はその場で書き込む）"""
+        event = {
+            "track_id": track_id,
+            "user_id": user_id,
+            "play_duration": duration,
+            "played_at": played_at or datetime.utcnow(),
+        }
+        if not self.enabled:
+            write_play_events(db, [event])
+            return
+
+        with self._lock:
+            events = self._pending.setdefault(db.get_bind(), [])
+            events.append(event)
+            full = len(events) >= self.max_events
+        if full:
+            self.flush()
+
+    def flush(self) -> int:
+        """溜まっているイベントをすべて書き込み、書き込んだ件数を返す"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+
+            written = 0
+            for engine, events in pending.items():
+                db = Session(bind=engine)
+                try:
+                    write_play_events(db, events)
+                    written += len(events)
+                except IntegrityError as e:
+                    # 削除済みの楽曲・ユーザーへの再生は再試行しても成功しないため、そのイベントだけを破棄し、
+                    # 残りは再投入して次回のフラッシュで書き込む
+                    valid = drop_orphaned_events(db, events)
+                    if len(valid) == len(events):
+                        # 参照先の削除以外が原因の場合は、これまでどおりすべて破棄する
+                        valid = []
+                    logger.error(f"再生イベント{len(events) - len(valid)}件を書き込めないため破棄しました: {str(e)}")
+                    if valid:
+                        self._requeue(engine, valid)
+                except Exception as e:
+                    logger.error(f"再生イベントの書き込みに失敗しました（{len(events)}件を再投入）: {str(e)}")
+                    self._requeue(engine, events)
+                finally:
+                    db.close()
+            return written
+
+    def _requeue(self, engine: Engine, events: List[Dict[str, Any]]) -> None:
+        # 書き込み先の障害が続いてもメモリを使い切らないよう、上限を超えた分は破棄
+        limit = self.max_events * 10
+        with self._lock:
+            queued = events + self._pending.get(engine, [])
+            if len(queued) > limit:
+                logger.error(f"再生イベントを{len(queued) - limit}件破棄しました")
+                queued = queued[-limit:]
+            self._pending[engine] = queued
+
+    # ==================== バックグラウンド書き込み ====================
+
+    def start(self) -> None:
+        """一定間隔で書き込むスレッドを開始"""
+        if not self.enabled or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="play-event-buffer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> int:
+        """スレッドを停止し、残っているイベントを書き込む"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        return self.flush()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval_ms / 1000):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"再生イベントの定期書き込みでエラーが発生しました: {str(e)}")
+
+
+# アプリケーション全体で共有するバッファ
+play_buffer = PlayEventBuffer(
+    max_events=settings.PLAY_BUFFER_MAX_EVENTS,
+    flush_interval_ms=settings.PLAY_BUFFER_FLUSH_INTERVAL_MS
+)
@@ -0,0 +1,118 @@
+"""
+再生回数の分散カウンター
+
+再生の加算は track_play_counter のランダムな slot 行に行い、Track の行には書き込まない
+（人気楽曲への同時書き込みが1行に集中せず、Track.updated_at も変化しない）。
+読み取り時は Track.play_count と未畳み込みの slot の合計を足し合わせ、
+定期処理（fold_counters）で slot の値を Track.play_count と一覧用テーブルへ畳み込む。
+"""
+
+import logging
+import random
+from typing import Dict, Iterable, Mapping
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.periodic import PeriodicTask
+from app.db.upsert import upsert_increment
+from app.models.play_counter import TrackPlayCounter
+from app.models.track import Track
+from app.models.track_listing import TrackListing
+
+logger = logging.getLogger(__name__)
+
+counters = TrackPlayCounter.__table__
+
+
+def increment(db: Session, plays: Mapping[str, int]) -> None:
+    """
+    楽曲ごとの加算数をランダムな slot に加算（コミットは呼び出し側）
+    """
+    rows = [
+        {"track_id": track_id, "slot": random.randrange(settings.PLAY_COUNTER_SHARDS), "plays": count}
+        for track_id, count in plays.items() if count
+    ]
+    upsert_increment(db, counters, rows, ("track_id", "slot"), ("plays",))
+
+
+def pending_plays(db: Session, track_ids: Iterable[str]) -> Dict[str, int]:
+    """まだ Track.play_count に畳み込まれていない再生回数"""
+    track_ids = list(track_ids)
+    if not track_ids:
+        return {}
+    rows = db.query(counters.c.track_id, func.sum(counters.c.plays))\
+        .filter(counters.c.track_id.in_(track_ids))\
+        .group_by(counters.c.track_id).all()
+    return {track_id: int(total or 0) for track_id, total in rows}
+
+
+def total_play_counts(db: Session, tracks: Iterable[Track]) -> Dict[str, int]:
+    """楽曲ごとの再生回数（畳み込み済み + 未畳み込み）"""
+    tracks = list(tracks)
+    pending = pending_plays(db, [track.id for track in tracks])
+    return {track.id: (track.play_count or 0) + pending.get(track.id, 0) for track in tracks}
+
+
+def fold_counters(db: Session) -> int:
+    """
+    slot の値を Track.play_count と一覧用テーブルへ畳み込み、畳み込んだ楽曲数を返す
+    読み取った値だけを減算するため、畳み込み中の加算は失われない
+    """
+    # 複数プロセスが同時に畳み込んでも二重に加算しないよう行ロックを取る（PostgreSQL）
+    rows = db.execute(
+        select(counters.c.track_id, counters.c.slot, counters.c.plays)
+        .where(counters.c.plays != 0)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not rows:
+        return 0
+
+    totals: Dict[str, int] = {}
+    for track_id, slot, plays in rows:
+        db.execute(
+            update(counters)
+            .where(counters.c.track_id == track_id, counters.c.slot == slot)
+            .values(plays=counters.c.plays - plays)
+        )
+        totals[track_id] = totals.get(track_id, 0) + plays
+
+    for track_id, plays in totals.items():
+        # 再生回数の反映では楽曲の更新日時を変えない
+        db.execute(
+            update(Track).where(Track.id == track_id)
+            .values(play_count=Track.play_count + plays, updated_at=Track.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        db.execute(
+            update(TrackListing).where(TrackListing.track_id == track_id)
+            .values(play_count=TrackListing.play_count + plays)
+            .execution_options(synchronize_session=False)
+        )
+
+    db.execute(counters.delete().where(counters.c.plays == 0))
+    db.commit()
+    return len(totals)
+
+
+def _fold_with_new_session() -> None:
+    from app.db.session import SessionLocal
+    from app.services.track_service import invalidate_catalog
+
+    db = SessionLocal()
+    try:
+        folded = fold_counters(db)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    if folded:
+        # 一覧の再生回数が変わるためカタログのキャッシュを更新
+        invalidate_catalog()
+        logger.debug(f"再生回数を畳み込みました: {folded}曲")
+
+
+# 定期的な畳み込み処理（アプリ起動時に開始）
+fold_task = PeriodicTask("play-counter-fold", settings.PLAY_COUNTER_FOLD_INTERVAL_SECONDS, _fold_with_new_session)
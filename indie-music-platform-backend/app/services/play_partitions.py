@@ -0,0 +1,307 @@
+"""
+再生履歴（PlayHistory）の月別パーティションと保存期間の管理
+
+PostgreSQL: playhistory を played_at の月ごとのレンジパーティションに分け、
+PLAY_HISTORY_PARTITIONS_AHEAD か月先までのパーティションを事前に作成する。
+SQLite: パーティションがないため、直近 PLAY_HISTORY_HOT_MONTHS か月より古い行を
+月別テーブル（playhistory_YYYYMM）へ移し、playhistory には直近の行だけを残す。
+
+保存期間（PLAY_HISTORY_RETENTION_MONTHS）を過ぎた月は、日ごとの集計（play_daily）が
+その月の再生をすべて含んでいることを確認してから、Parquet（zstd圧縮）として
+PLAY_ARCHIVE_DIR に書き出し、パーティション（テーブル）を削除する。
+"""
+
+import logging
+import os
+import re
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import pyarrow
+import pyarrow.parquet
+from sqlalchemy import Column, Index, MetaData, Table, column, delete, func, insert, select, table, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.periodic import PeriodicTask
+from app.models.play_daily import PlayDaily
+from app.models.play_history import PlayHistory
+
+logger = logging.getLogger(__name__)
+
+history = PlayHistory.__table__
+
+DEFAULT_PARTITION = "playhistory_default"
+PARTITION_PATTERN = re.compile(r"^playhistory_(\d{4})(\d{2})$")
+
+# アーカイブに書き出す列と、1回に読み込む行数
+ARCHIVE_COLUMNS = ("id", "user_id", "track_id", "played_at", "play_duration")
+ARCHIVE_BATCH_ROWS = 10_000
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"playhistory_{month:%Y%m}"
+
+
+def _month_table(name: str):
+    """月別パーティション（テーブル）を PlayHistory と同じ列で参照する"""
+    return table(name, *[column(col.name, col.type) for col in history.columns])
+
+
+def _create_month_table(db: Session, name: str) -> None:
+    """
+    月別テーブルを PlayHistory と同じ列・主キーで作成し、楽曲・ユーザーごとの期間指定の読み取り用の
+    インデックスを付ける（エクスポート・分析が月別テーブルも読むため）
+    作成済みのテーブルにインデックスがなければ追加する
+    外部キーは付けない（移した後の行は参照先の削除を妨げない）
+    """
+    month = Table(
+        name,
+        MetaData(),
+        *[Column(col.name, col.type, primary_key=col.primary_key, nullable=col.nullable) for col in history.columns],
+        Index(f"ix_{name}_track_played", "track_id", "played_at"),
+        Index(f"ix_{name}_user_played", "user_id", "played_at"),
+    )
+    connection = db.connection()
+    month.create(connection, checkfirst=True)
+    for index in month.indexes:
+        index.create(connection, checkfirst=True)
+
+
+def _dialect(db: Session) -> str:
+    return db.get_bind().dialect.name
+
+
+def _today(today: Optional[date]) -> date:
+    return today or datetime.utcnow().date()
+
+
+# ==================== パーティションの作成・移動 ====================
+
+def ensure_partitions(db: Session, today: Optional[date] = None) -> List[str]:
+    """
+    今月から PLAY_HISTORY_PARTITIONS_AHEAD か月先までのパーティションを作成（PostgreSQL のみ）
+    範囲外の再生日時は DEFAULT パーティションが受ける
+    """
+    if _dialect(db) != "postgresql":
+        return []
+
+    db.execute(text(f'CREATE TABLE IF NOT EXISTS "{DEFAULT_PARTITION}" PARTITION OF playhistory DEFAULT'))
+    current = month_start(_today(today))
+    names = []
+    for offset in range(settings.PLAY_HISTORY_PARTITIONS_AHEAD + 1):
+        month = add_months(current, offset)
+        name = partition_name(month)
+        db.execute(text(
+            f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF playhistory '
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+        ))
+        names.append(name)
+    db.commit()
+    return names
+
+
+def rotate_hot_table(db: Session, today: Optional[date] = None) -> int:
+    """
+    直近 PLAY_HISTORY_HOT_MONTHS か月より古い行を月別テーブルへ移し、移した件数を返す（SQLite のみ）
+    """
+    if _dialect(db) != "sqlite":
+        return 0
+
+    hot_start = add_months(month_start(_today(today)), -(max(settings.PLAY_HISTORY_HOT_MONTHS, 1) - 1))
+    hot_start = datetime.combine(hot_start, datetime.min.time())
+    months = db.execute(
+        select(func.strftime("%Y-%m-01", history.c.played_at)).distinct()
+        .where(history.c.played_at < hot_start)
+    ).scalars().all()
+
+    moved = 0
+    for value in months:
+        month = date.fromisoformat(value)
+        name = partition_name(month)
+        in_month = (
+            history.c.played_at >= datetime.combine(month, datetime.min.time()),
+            history.c.played_at < datetime.combine(add_months(month, 1), datetime.min.time()),
+        )
+        _create_month_table(db, name)
+        names = [col.name for col in history.columns]
+        db.execute(insert(_month_table(name)).from_select(names, select(*history.columns).where(*in_month)))
+        moved += db.execute(delete(history).where(*in_month)).rowcount
+        db.commit()
+    return moved
+
+
+def maintain_partitions(db: Session, today: Optional[date] = None) -> None:
+    """データベースに応じてパーティションの作成（PostgreSQL）または古い行の移動（SQLite）を行う"""
+    ensure_partitions(db, today)
+    rotated = rotate_hot_table(db, today)
+    if rotated:
+        logger.info(f"再生履歴{rotated}件を月別テーブルへ移しました")
+
+
+def list_partitions(db: Session) -> List[Tuple[date, str]]:
+    """月別パーティション（テーブル）の (月初日, テーブル名) を古い順に返す"""
+    dialect = _dialect(db)
+    if dialect == "postgresql":
+        names = db.execute(text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = 'playhistory'"
+        )).scalars().all()
+    elif dialect == "sqlite":
+        names = db.execute(text(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'playhistory\\_%' ESCAPE '\\'"
+        )).scalars().all()
+    else:
+        return []
+
+    partitions = []
+    for name in names:
+        match = PARTITION_PATTERN.match(name)
+        if match:
+            partitions.append((date(int(match.group(1)), int(match.group(2)), 1), name))
+    return sorted(partitions)
+
+
+def history_tables(db: Session, start_date: Optional[date] = None, end_date: Optional[date] = None) -> List[Any]:
+    """
+    期間内の再生履歴を読むためのテーブルを古い順に返す
+    PostgreSQL は親テーブル（パーティションの振り分けはDBが行う）、SQLite は月別テーブルと playhistory
+    """
+    if _dialect(db) != "sqlite":
+        return [history]
+    tables = [
+        _month_table(name) for month, name in list_partitions(db)
+        if (start_date is None or add_months(month, 1) > start_date)
+        and (end_date is None or month <= end_date)
+    ]
+    return tables + [history]
+
+
+# ==================== 保存期間を過ぎた月のアーカイブ ====================
+
+def uncovered_rollups(db: Session, name: str, month: date) -> int:
+    """
+    パーティション内の再生数が日ごとの集計を上回る (楽曲, 日付) の数
+    0 であれば集計がパーティションの再生をすべて含んでいる
+    """
+    partition = _month_table(name)
+    played_day = func.date(partition.c.played_at)
+    counts = db.execute(
+        select(partition.c.track_id, played_day, func.count()).group_by(partition.c.track_id, played_day)
+    ).all()
+    if not counts:
+        return 0
+
+    rollups = {
+        (track_id, str(day)): plays
+        for track_id, day, plays in db.query(PlayDaily.track_id, PlayDaily.day, PlayDaily.plays)
+        .filter(PlayDaily.day >= month, PlayDaily.day < add_months(month, 1)).all()
+    }
+    return sum(1 for track_id, day, plays in counts if rollups.get((track_id, str(day)), 0) < plays)
+
+
+def archive_path(name: str) -> str:
+    return os.path.join(settings.PLAY_ARCHIVE_DIR, name + ".parquet")
+
+
+def _iter_column_batches(db: Session, name: str) -> Iterator[Dict[str, List[Any]]]:
+    """パーティションの行を ARCHIVE_BATCH_ROWS 件ずつ列ごとのリストにして返す"""
+    partition = _month_table(name)
+    result = db.execute(
+        select(*[partition.c[col] for col in ARCHIVE_COLUMNS])
+        .execution_options(yield_per=ARCHIVE_BATCH_ROWS)
+    )
+    for rows in result.partitions():
+        yield {col: [row[index] for row in rows] for index, col in enumerate(ARCHIVE_COLUMNS)}
+
+
+def _write_parquet(path: str, batches: Iterator[Dict[str, List[Any]]]) -> None:
+    schema = pyarrow.schema([
+        ("id", pyarrow.string()),
+        ("user_id", pyarrow.string()),
+        ("track_id", pyarrow.string()),
+        ("played_at", pyarrow.timestamp("us")),
+        ("play_duration", pyarrow.int64()),
+    ])
+    with pyarrow.parquet.ParquetWriter(path, schema, compression="zstd") as writer:
+        for batch in batches:
+            writer.write_table(pyarrow.Table.from_pydict(batch, schema=schema))
+
+
+def export_partition(db: Session, name: str) -> str:
+    """パーティションを Parquet（zstd圧縮）へ書き出し、ファイルのパスを返す"""
+    path = archive_path(name)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # 書き出し途中のファイルを完成品と取り違えないよう、一時ファイルから置き換える
+    temp_path = path + ".tmp"
+    try:
+        _write_parquet(temp_path, _iter_column_batches(db, name))
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return path
+
+
+def _drop_partition(db: Session, name: str) -> None:
+    if _dialect(db) == "postgresql":
+        db.execute(text(f'ALTER TABLE playhistory DETACH PARTITION "{name}"'))
+    db.execute(text(f'DROP TABLE "{name}"'))
+    db.commit()
+
+
+def archive_expired_partitions(db: Session, today: Optional[date] = None) -> List[str]:
+    """
+    保存期間を過ぎた月のパーティションをアーカイブして削除し、書き出したファイルのパスを返す
+    日ごとの集計が再生をすべて含んでいない月は削除せずに残す
+    """
+    maintain_partitions(db, today)
+    if settings.PLAY_HISTORY_RETENTION_MONTHS <= 0:
+        return []
+
+    cutoff = add_months(month_start(_today(today)), -settings.PLAY_HISTORY_RETENTION_MONTHS)
+    archived = []
+    for month, name in list_partitions(db):
+        if month >= cutoff:
+            continue
+        uncovered = uncovered_rollups(db, name, month)
+        if uncovered:
+            logger.warning(f"{name} は日ごとの集計に含まれない再生があるためアーカイブしません（{uncovered}件）")
+            continue
+        path = export_partition(db, name)
+        _drop_partition(db, name)
+        logger.info(f"{name} を {path} へアーカイブしました")
+        archived.append(path)
+    return archived
+
+
+def _maintain_with_new_session() -> None:
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        archive_expired_partitions(db)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+# パーティションの作成・移動とアーカイブの定期処理（アプリ起動時に開始）
+maintenance_task = PeriodicTask(
+    "play-history-maintenance",
+    settings.PLAY_HISTORY_MAINTENANCE_INTERVAL_SECONDS,
+    _maintain_with_new_session
+)
@@ -0,0 +1,64 @@
+"""
+日ごとの再生集計（play_daily）
+
+再生イベントの書き込みと同じトランザクションで (楽曲, 日付) ごとの再生数と
+再生秒数の合計を加算する。アーティスト統計はこの集計だけを読み、
+PlayHistory の件数に関わらず日数 × 楽曲数の行を集計するだけで済む。
+集計のない既存の再生履歴は起動時に sync_rollups で補完する。
+"""
+
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Tuple
+
+from sqlalchemy import Date, cast, exists, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.db.upsert import upsert_increment
+from app.models.play_daily import PlayDaily
+from app.services.play_partitions import history_tables
+
+rollups = PlayDaily.__table__
+
+
+def aggregate_events(events: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """再生イベントを (楽曲, 日付) ごとの加算行にまとめる"""
+    totals: Dict[Tuple[str, Any], List[int]] = defaultdict(lambda: [0, 0])
+    for event in events:
+        total = totals[(event["track_id"], event["played_at"].date())]
+        total[0] += 1
+        total[1] += event.get("play_duration") or 0
+    return [
+        {"track_id": track_id, "day": day, "plays": plays, "total_duration": duration}
+        for (track_id, day), (plays, duration) in totals.items()
+    ]
+
+
+def add_events(db: Session, events: Iterable[Dict[str, Any]]) -> None:
+    """再生イベントを日ごとの集計に加算（コミットは呼び出し側）"""
+    upsert_increment(db, rollups, aggregate_events(events), ("track_id", "day"), ("plays", "total_duration"))
+
+
+def _played_day(db: Session, played_at):
+    # SQLite の CAST(... AS DATE) は数値になるため date() で日付文字列にする
+    if db.get_bind().dialect.name == "sqlite":
+        return func.date(played_at)
+    return cast(played_at, Date)
+
+
+def sync_rollups(db: Session) -> int:
+    """
+    集計行が存在しない (楽曲, 日付) を再生履歴から補完し、追加した行数を返す（既存DBのバックフィル用）
+    集計行がある日は加算済みとみなして変更しない
+    """
+    added = 0
+    for history in history_tables(db):
+        day = _played_day(db, history.c.played_at)
+        missing = ~exists().where(PlayDaily.track_id == history.c.track_id, PlayDaily.day == day)
+        added += db.execute(insert(rollups).from_select(
+            ["track_id", "day", "plays", "total_duration"],
+            select(
+                history.c.track_id, day, func.count(), func.coalesce(func.sum(history.c.play_duration), 0)
+            ).where(missing).group_by(history.c.track_id, day)
+        )).rowcount or 0
+    db.commit()
+    return added
@@ -3,10 +3,11 @@ from app.models.purchase import Purchase, PurchaseStatus, PaymentMethod
 from app.models.track import Track
 from app.schemas.purchase import PurchaseCreate
 from app.services.payment import process_payment
-from app.services.storage import generate_presigned_url
+from app.services.storage import object_key_from_url, sign_media_url
 from fastapi import HTTPException
 from starlette.status import HTTP_400_BAD_REQUEST, HTTP_404_NOT_FOUND, HTTP_403_FORBIDDEN
 from typing import List
+import time
 import uuid
 
 
@@ -127,8 +128,8 @@ def get_download_url(db: Session, track_id: str, user_id: str) -> str:
         )
     
     # オブジェクト名の抽出（URLからキーを取り出す）
-    object_key = track.audio_file_url.split(f"{BUCKET_NAME}.s3.amazonaws.com/")[1]
+    object_key = object_key_from_url(track.audio_file_url)
     
     # 署名付きURL生成（24時間有効）
-    signed_url = generate_presigned_url(object_key, expiration=86400)
+    signed_url = sign_media_url(object_key, int(time.time()) + 86400)
     return signed_url
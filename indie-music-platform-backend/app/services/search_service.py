@@ -0,0 +1,224 @@
+"""
+楽曲の全文検索インデックス
+
+データベースの方言ごとに検索エンジンを切り替える
+- SQLite: FTS5 仮想テーブル track_fts（bm25でランキング）
+- PostgreSQL: tsvector列 + GINインデックスを持つ track_search テーブル（ts_rankでランキング）
+- その他: ILIKEによるフォールバック（ランキングなし）
+
+インデックスはタイトル・アーティスト名・ジャンル・説明文を対象とし、
+track_service の作成・更新・削除と同じトランザクション内で更新する。
+各列は app.utils.search_tokenizer で正規化・トークン化（日本語はバイグラム）した
+空白区切りのトークン列として格納し、検索語も同じ規則でフレーズに変換して照合する。
+"""
+
+import logging
+import re
+from typing import Any, List, Optional
+
+from sqlalchemy import DDL, Float, String, event, literal, or_, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.models.base import Base
+from app.models.track import Track
+from app.models.user import User
+from app.utils.search_tokenizer import index_text, query_groups
+
+logger = logging.getLogger(__name__)
+
+# bm25 の列ごとの重み（track_id, title, artist_name, genre, description）
+FTS5_COLUMN_WEIGHTS = (0.0, 10.0, 5.0, 2.0, 1.0)
+
+# ==================== DDL ====================
+
+_SQLITE_CREATE = DDL(
+    "CREATE VIRTUAL TABLE IF NOT EXISTS track_fts USING fts5("
+    "track_id UNINDEXED, title, artist_name, genre, description, "
+    "tokenize = 'unicode61 remove_diacritics 2')"
+)
+_SQLITE_DROP = DDL("DROP TABLE IF EXISTS track_fts")
+
+_POSTGRES_CREATE = DDL(
+    "CREATE TABLE IF NOT EXISTS track_search ("
+    "track_id VARCHAR PRIMARY KEY REFERENCES track(id) ON DELETE CASCADE, "
+    "document TSVECTOR NOT NULL)"
+)
+_POSTGRES_CREATE_INDEX = DDL(
+    "CREATE INDEX IF NOT EXISTS ix_track_search_document ON track_search USING GIN (document)"
+)
+_POSTGRES_DROP = DDL("DROP TABLE IF EXISTS track_search")
+
+# create_all / drop_all に合わせて検索用テーブルも作成・削除する
+event.listen(Base.metadata, "after_create", _SQLITE_CREATE.execute_if(dialect="sqlite"))
+event.listen(Base.metadata, "before_drop", _SQLITE_DROP.execute_if(dialect="sqlite"))
+event.listen(Base.metadata, "after_create", _POSTGRES_CREATE.execute_if(dialect="postgresql"))
+event.listen(Base.metadata, "after_create", _POSTGRES_CREATE_INDEX.execute_if(dialect="postgresql"))
+event.listen(Base.metadata, "before_drop", _POSTGRES_DROP.execute_if(dialect="postgresql"))
+
+# PostgreSQL の重み付き文書ベクトル（title: A, artist: B, genre: C, description: D）
+_POSTGRES_DOCUMENT = (
+    "setweight(to_tsvector('simple', coalesce(:title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(:artist_name, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(:genre, '')), 'C') || "
+    "setweight(to_tsvector('simple', coalesce(:description, '')), 'D')"
+)
+
+
+def _dialect(bind: Any) -> str:
+    return bind.get_bind().dialect.name if isinstance(bind, Session) else bind.dialect.name
+
+
+# 検索語から除去する制御文字（FTS5はNUL文字を含むクエリを解釈できない）
+_CONTROL_CHARS = re.compile(r"[\x00-\x1f\x7f]")
+
+
+def _split_terms(query: str) -> List[str]:
+    """検索文字列を空白区切りの語に分割"""
+    query = _CONTROL_CHARS.sub(" ", query)
+    return [term for term in re.split(r"\s+", query.strip()) if term]
+
+
+def _fts5_match_expression(groups: List[List[str]]) -> str:
+    """各トークングループを末尾前方一致のフレーズとしてANDで結合したFTS5クエリ"""
+    return " ".join('"{}"*'.format(" ".join(group).replace('"', '""')) for group in groups)
+
+
+def _tsquery_expression(groups: List[List[str]]) -> str:
+    """各トークングループを隣接演算子(<->)のフレーズとしてANDで結合したtsquery"""
+    phrases = []
+    for group in groups:
+        lexemes = ["'{}'".format(token.replace("'", "''")) for token in group]
+        lexemes[-1] += ":*"
+        phrases.append(" <-> ".join(lexemes))
+    return " & ".join(f"({phrase})" for phrase in phrases)
+
+
+# ==================== インデックス更新 ====================
+
+def _document_params(track: Track, artist_name: Optional[str]) -> dict:
+    return {
+        "track_id": track.id,
+        "title": index_text(track.title),
+        "artist_name": index_text(artist_name),
+        "genre": index_text(track.genre),
+        "description": index_text(track.description),
+    }
+
+
+def index_track(db: Session, track: Track) -> None:
+    """
+    楽曲をインデックスに登録（既存のエントリは置き換え）
+    呼び出し側のトランザクション内で実行され、コミットは呼び出し側が行う
+    """
+    artist_name = track.artist.display_name if track.artist else None
+    params = _document_params(track, artist_name)
+    dialect = _dialect(db)
+
+    if dialect == "sqlite":
+        db.execute(text("DELETE FROM track_fts WHERE track_id = :track_id"), params)
+        db.execute(
+            text(
+                "INSERT INTO track_fts (track_id, title, artist_name, genre, description) "
+                "VALUES (:track_id, :title, :artist_name, :genre, :description)"
+            ),
+            params
+        )
+    elif dialect == "postgresql":
+        db.execute(
+            text(
+                f"INSERT INTO track_search (track_id, document) VALUES (:track_id, {_POSTGRES_DOCUMENT}) "
+                "ON CONFLICT (track_id) DO UPDATE SET document = EXCLUDED.document"
+            ),
+            params
+        )
+
+
+def remove_track(db: Session, track_id: str) -> None:
+    """
+    楽曲をインデックスから削除
+    """
+    dialect = _dialect(db)
+    if dialect == "sqlite":
+        db.execute(text("DELETE FROM track_fts WHERE track_id = :track_id"), {"track_id": track_id})
+    elif dialect == "postgresql":
+        db.execute(text("DELETE FROM track_search WHERE track_id = :track_id"), {"track_id": track_id})
+
+
+def reindex_artist(db: Session, artist_id: str) -> None:
+    """
+    アーティスト名の変更時に、そのアーティストの全楽曲を再登録
+    """
+    for track in db.query(Track).filter(Track.artist_id == artist_id).all():
+        index_track(db, track)
+
+
+def sync_index(bind: Engine) -> int:
+    """
+    インデックス未登録の楽曲を登録する（起動時のバックフィル用）
+    登録した件数を返す
+    """
+    dialect = bind.dialect.name
+    if dialect == "sqlite":
+        index_table = "track_fts"
+    elif dialect == "postgresql":
+        index_table = "track_search"
+    else:
+        return 0
+
+    with Session(bind=bind) as db:
+        missing = db.query(Track).filter(
+            ~Track.id.in_(select(text("track_id")).select_from(text(index_table)))
+        ).all()
+        for track in missing:
+            index_track(db, track)
+        db.commit()
+
+    if missing:
+        logger.info(f"検索インデックスに{len(missing)}件の楽曲を登録しました")
+    return len(missing)
+
+
+# ==================== 検索 ====================
+
+def match_subquery(db: Session, query: str) -> Optional[Any]:
+    """
+    検索語に一致する楽曲の (track_id, score) を返すサブクエリ
+    scoreは大きいほど関連度が高い。検索語が空の場合はNone
+    """
+    dialect = _dialect(db)
+    if dialect in ("sqlite", "postgresql"):
+        groups = query_groups(query)
+        if not groups:
+            return None
+
+        if dialect == "sqlite":
+            weights = ", ".join(str(w) for w in FTS5_COLUMN_WEIGHTS)
+            stmt = text(
+                f"SELECT track_id, -bm25(track_fts, {weights}) AS score "
+                "FROM track_fts WHERE track_fts MATCH :match"
+            ).bindparams(match=_fts5_match_expression(groups))
+        else:
+            stmt = text(
+                "SELECT track_id, ts_rank(document, to_tsquery('simple', :q)) AS score "
+                "FROM track_search WHERE document @@ to_tsquery('simple', :q)"
+            ).bindparams(q=_tsquery_expression(groups))
+        return stmt.columns(track_id=String, score=Float).subquery("matches")
+
+    # 未対応の方言はILIKEで代替（ランキングなし）
+    terms = _split_terms(query)
+    if not terms:
+        return None
+    conditions = []
+    for term in terms:
+        pattern = f"%{term}%"
+        conditions.append(or_(
+            Track.title.ilike(pattern),
+            User.display_name.ilike(pattern),
+            Track.genre.ilike(pattern),
+            Track.description.ilike(pattern)
+        ))
+    stmt = select(Track.id.label("track_id"), literal(0.0, Float).label("score"))\
+        .join(User, Track.artist_id == User.id)\
+        .where(*conditions)
+    return stmt.subquery("matches")
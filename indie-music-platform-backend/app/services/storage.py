@@ -4,8 +4,13 @@ from fastapi import UploadFile, HTTPException
 from botocore.exceptions import ClientError
 from starlette.status import HTTP_500_INTERNAL_SERVER_ERROR
 from datetime import datetime, timedelta
+from urllib.parse import unquote, urlparse
+import time
 import uuid
 
+from app.core.config import settings
+from app.utils import media_token
+
 
 # S3クライアントの初期化
 s3_client = boto3.client(
@@ -73,3 +78,21 @@ def generate_presigned_url(object_name: str, expiration: int = 3600) -> str:
         )
 
 
+def object_key_from_url(url: str) -> str:
+    """
+    アップロード時に返したURLからS3のオブジェクトキーを取り出す
+    """
+    prefix = f"https://{BUCKET_NAME}.s3.amazonaws.com/"
+    if url.startswith(prefix):
+        return url[len(prefix):]
+    return unquote(urlparse(url).path).lstrip("/")
+
+
+def sign_media_url(object_key: str, expires_at: int) -> str:
+    """
+    指定時刻（UNIX秒）に失効するメディアURLを発行
+    MEDIA_URL_SIGNER が "hmac" の場合は boto3 を使わずローカルで署名する
+    """
+    if settings.MEDIA_URL_SIGNER == "hmac":
+        return media_token.build_signed_url(object_key, expires_at)
+    return generate_presigned_url(object_key, expiration=max(int(expires_at - time.time()), 1))
@@ -0,0 +1,257 @@
+"""
+楽曲ストリーミング（署名付きURLの発行と再生記録）
+
+署名付きURLの有効期限は STREAM_URL_BUCKET_SECONDS ごとの区切りに揃え、
+同じ区切り内のリクエストには同じURLを返す（boto3 の署名処理は区切りごとに1回）。
+どのリクエストにも少なくとも STREAM_URL_TTL_SECONDS の有効期間が残る。
+MEDIA_URL_SIGNER="hmac" の場合はローカルのHMAC署名でURLを発行する。
+"""
+
+from datetime import datetime, timedelta, timezone
+import bisect
+from typing import Any, Dict, List, Optional, Tuple
+import time
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from starlette.status import (
+    HTTP_400_BAD_REQUEST,
+    HTTP_403_FORBIDDEN,
+    HTTP_404_NOT_FOUND,
+    HTTP_429_TOO_MANY_REQUESTS,
+)
+
+from app.core.cache import MISS, VersionedCache
+from app.core.config import settings
+from app.core.dedup import SlidingWindowFilter
+from app.models.track import Track
+from app.schemas.stream import PlayEvent
+from app.services import storage
+from app.services.play_buffer import play_buffer, write_play_events
+
+
+# 一括送信で受け付ける再生イベントの上限
+MAX_PLAY_BATCH = 500
+# クライアントの時計のずれとして許容する未来方向の時間
+MAX_CLOCK_SKEW = timedelta(minutes=5)
+# 受け付ける再生日時の古さの上限（オフライン再生の後送り用）
+MAX_PLAY_EVENT_AGE = timedelta(days=30)
+# 楽曲の長さを超える再生秒数として許容する誤差
+PLAY_DURATION_TOLERANCE_SECONDS = 5
+
+# 署名付きURLのキャッシュ（キー: (オブジェクトキー, 区切りの開始時刻)）
+stream_url_cache = VersionedCache(
+    max_entries=settings.STREAM_URL_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.STREAM_URL_BUCKET_SECONDS
+)
+
+# 同じ再生者（ユーザーまたはIP）・楽曲の短時間の繰り返し再生を弾くフィルター
+play_dedup_filter = SlidingWindowFilter(
+    window_seconds=settings.PLAY_DEDUP_WINDOW_SECONDS,
+    capacity=settings.PLAY_DEDUP_CAPACITY,
+    error_rate=settings.PLAY_DEDUP_ERROR_RATE
+)
+
+
+def _player_key(user_id: Optional[str], client_id: Optional[str]) -> Optional[str]:
+    """重複判定に使う再生者の識別子（ログインユーザーを優先し、なければクライアントIP）"""
+    if user_id:
+        return f"user:{user_id}"
+    if client_id:
+        return f"client:{client_id}"
+    return None
+
+
+def _expiry_window(now: float) -> Tuple[int, int]:
+    """現在時刻の属する区切りの開始時刻と、その区切りで発行するURLの失効時刻（UNIX秒）"""
+    bucket = max(settings.STREAM_URL_BUCKET_SECONDS, 1)
+    window_start = int(now // bucket) * bucket
+    return window_start, window_start + bucket + settings.STREAM_URL_TTL_SECONDS
+
+
+def get_signed_media_url(object_key: str, now: Optional[float] = None) -> Tuple[str, datetime]:
+    """
+    オブジェクトの署名付きURLと失効日時を取得（区切りごとにキャッシュ）
+    """
+    now = time.time() if now is None else now
+    window_start, expires_at = _expiry_window(now)
+    key = (object_key, window_start)
+
+    cached = stream_url_cache.get(key)
+    if cached is MISS:
+        cached = (storage.sign_media_url(object_key, expires_at), expires_at)
+        stream_url_cache.set(key, cached)
+
+    url, expires_at = cached
+    return url, datetime.fromtimestamp(expires_at, tz=timezone.utc)
+
+
+def _get_streamable_track(db: Session, track_id: str, user_id: Optional[str]) -> Track:
+    track = db.query(Track).filter(Track.id == track_id).first()
+    if not track:
+        raise HTTPException(
+            status_code=HTTP_404_NOT_FOUND,
+            detail="楽曲が見つかりません"
+        )
+
+    # 非公開楽曲はアーティスト本人のみ再生可能
+    if not track.is_public and track.artist_id != user_id:
+        raise HTTPException(
+            status_code=HTTP_403_FORBIDDEN,
+            detail="この楽曲を再生する権限がありません"
+        )
+
+    return track
+
+
+def get_stream_url(db: Session, track_id: str, user_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    楽曲ストリーミング用の署名付きURLを取得
+    """
+    track = _get_streamable_track(db, track_id, user_id)
+    url, expires_at = get_signed_media_url(storage.object_key_from_url(track.audio_file_url))
+    return {"url": url, "expires_at": expires_at}
+
+
+def record_play(
+    db: Session,
+    track_id: str,
+    user_id: Optional[str] = None,
+    duration: Optional[int] = None,
+    client_id: Optional[str] = None
+) -> None:
+    """
+    再生を記録（取り込みバッファ経由で一括書き込みされる）
+    同じ再生者・楽曲の PLAY_DEDUP_WINDOW_SECONDS 秒以内の再生はDBに触れる前に拒否する
+    """
+    player = _player_key(user_id, client_id)
+    if player and play_dedup_filter.check_and_add((player, track_id)):
+        raise HTTPException(
+            status_code=HTTP_429_TOO_MANY_REQUESTS,
+            detail="同じ楽曲の再生が短時間に繰り返されています"
+        )
+
+    _get_streamable_track(db, track_id, user_id)
+    play_buffer.add(db, track_id=track_id, user_id=user_id, duration=duration)
+
+
+def _to_utc_naive(value: datetime) -> datetime:
+    """PlayHistory.played_at と同じ UTC の naive datetime に揃える"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _reject_reason(event: PlayEvent, track: Optional[Any], user_id: Optional[str], now: datetime) -> Optional[str]:
+    """再生イベントを受け付けない理由（受け付ける場合は None）"""
+    if track is None:
+        return "track_not_found"
+    if not track.is_public and track.artist_id != user_id:
+        return "forbidden"
+    if event.duration < 0 or event.duration > track.duration + PLAY_DURATION_TOLERANCE_SECONDS:
+        return "invalid_duration"
+    if event.played_at is not None:
+        played_at = _to_utc_naive(event.played_at)
+        if played_at > now + MAX_CLOCK_SKEW:
+            return "future_timestamp"
+        if played_at < now - MAX_PLAY_EVENT_AGE:
+            return "too_old"
+    return None
+
+
+def _min_play_interval(track: Any) -> float:
+    """同じ再生者・楽曲の再生として認める最短の間隔（秒）。楽曲の長さ、不明なら重複判定のウィンドウ"""
+    if track.duration and track.duration > 0:
+        return float(track.duration)
+    return max(settings.PLAY_DEDUP_WINDOW_SECONDS, 1.0)
+
+
+def _is_duplicate(
+    event: PlayEvent,
+    track: Any,
+    player: Optional[str],
+    accepted_times: Dict[str, List[datetime]]
+) -> bool:
+    """
+    再生日時のないイベントは record_play と同じウィンドウで判定する
+    再生日時のあるイベントは、同じバッチで受け付けた再生との間隔が楽曲の長さ未満なら重複とし、
+    バッチをまたぐ判定は再生日時を楽曲の長さごとの区切りに丸めたキーで行う
+    （日時をずらした再送でも、受け付けるのは区切りごとに1件まで）
+    """
+    if player is None:
+        return False
+    if event.played_at is None:
+        return play_dedup_filter.check_and_add((player, event.track_id))
+
+    played_at = _to_utc_naive(event.played_at)
+    interval = _min_play_interval(track)
+    times = accepted_times.setdefault(event.track_id, [])
+    position = bisect.bisect(times, played_at)
+    if position > 0 and (played_at - times[position - 1]).total_seconds() < interval:
+        return True
+    if position < len(times) and (times[position] - played_at).total_seconds() < interval:
+        return True
+
+    bucket = int(played_at.replace(tzinfo=timezone.utc).timestamp() // interval)
+    if play_dedup_filter.check_and_add((player, event.track_id, bucket)):
+        return True
+    times.insert(position, played_at)
+    return False
+
+
+def record_plays_batch(
+    db: Session,
+    events: List[PlayEvent],
+    user_id: Optional[str] = None,
+    client_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    再生イベントをまとめて検証し、受け付けたものを1回の一括INSERTで記録
+    楽曲は1回の IN クエリで取得し、イベントごとに受付・拒否の結果を返す
+    """
+    if len(events) > MAX_PLAY_BATCH:
+        raise HTTPException(
+            status_code=HTTP_400_BAD_REQUEST,
+            detail=f"一度に送信できる再生イベントは{MAX_PLAY_BATCH}件までです"
+        )
+
+    track_ids = {event.track_id for event in events}
+    tracks = {
+        row.id: row
+        for row in db.query(Track.id, Track.artist_id, Track.is_public, Track.duration)
+        .filter(Track.id.in_(track_ids)).all()
+    } if track_ids else {}
+
+    now = datetime.utcnow()
+    player = _player_key(user_id, client_id)
+    results, accepted = [], []
+    # 楽曲ごとに、このバッチで受け付けた再生日時（昇順）
+    accepted_times: Dict[str, List[datetime]] = {}
+    for index, event in enumerate(events):
+        track = tracks.get(event.track_id)
+        reason = _reject_reason(event, track, user_id, now)
+        # 重複判定は書き込み前に行い、受け付け可能なイベントだけをウィンドウに記録する
+        if reason is None and _is_duplicate(event, track, player, accepted_times):
+            reason = "duplicate"
+        results.append({
+            "index": index,
+            "track_id": event.track_id,
+            "accepted": reason is None,
+            "reason": reason,
+        })
+        if reason is None:
+            accepted.append({
+                "track_id": event.track_id,
+                "user_id": user_id,
+                "play_duration": event.duration,
+                "played_at": _to_utc_naive(event.played_at) if event.played_at else now,
+            })
+
+    if accepted:
+        write_play_events(db, accepted)
+
+    return {
+        "accepted": len(accepted),
+        "rejected": len(events) - len(accepted),
+        "results": results,
+    }
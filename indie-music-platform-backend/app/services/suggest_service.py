@@ -0,0 +1,275 @@
+"""
+検索ボックスの入力補完（サジェスト）
+
+公開楽曲のタイトルとアーティスト名をプロセス内のトライ木で保持し、
+再生回数の多い順に前方一致の候補を返す。各ノードは上位候補をキャッシュするため、
+問い合わせはプレフィックス長に比例する時間で完了しデータベースにはアクセスしない。
+楽曲の作成・更新・削除、アーティスト名の変更に合わせて差分更新する。
+"""
+
+import heapq
+import logging
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.track import Track
+from app.models.track_listing import TrackListing
+from app.utils.search_tokenizer import normalize
+
+logger = logging.getLogger(__name__)
+
+# 各ノードでキャッシュする上位候補数（= 1回に返せる最大件数）
+MAX_SUGGESTIONS = 10
+
+# 候補の種別
+KIND_TRACK = "track"
+KIND_ARTIST = "artist"
+
+EntryKey = Tuple[str, str]  # (種別, ID)
+
+
+class _Node:
+    __slots__ = ("children", "terminals", "top")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.terminals: Set[EntryKey] = set()
+        # 部分木内の上位候補（Noneは再計算が必要な状態）
+        self.top: Optional[List[EntryKey]] = []
+
+
+def _index_keys(display_text: str) -> List[str]:
+    """全体と、各単語の先頭から始まる部分文字列を登録キーとする"""
+    normalized = normalize(display_text).strip()
+    if not normalized:
+        return []
+    keys = [normalized]
+    for i, char in enumerate(normalized):
+        if char == " " and i + 1 < len(normalized) and normalized[i + 1] != " ":
+            keys.append(normalized[i + 1:])
+    return keys
+
+
+class SuggestIndex:
+    """楽曲タイトル・アーティスト名の前方一致インデックス"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        """インデックスを空にし、未ロード状態に戻す"""
+        with self._lock:
+            self._root = _Node()
+            self._entries: Dict[EntryKey, Tuple[str, int]] = {}
+            self._keys: Dict[EntryKey, List[str]] = {}
+            self._tracks: Dict[str, Tuple[str, int]] = {}  # track_id -> (artist_id, play_count)
+            self._artist_tracks: Dict[str, Set[str]] = {}
+            self._artist_names: Dict[str, str] = {}
+            self.loaded = False
+
+    # ==================== 読み込み ====================
+
+    def load(self, db: Session) -> None:
+        """公開楽曲からインデックスを構築"""
+        rows = db.query(
+            TrackListing.track_id, TrackListing.title, TrackListing.play_count,
+            TrackListing.artist_id, TrackListing.artist_name
+        ).filter(TrackListing.is_public == True).all()
+
+        with self._lock:
+            self.reset()
+            for row in rows:
+                self._put_track(row.track_id, row.title, row.play_count, row.artist_id, row.artist_name)
+            self.loaded = True
+        logger.info(f"サジェストインデックスを構築しました: {len(rows)}件の楽曲")
+
+    def ensure_loaded(self, db: Session) -> None:
+        if not self.loaded:
+            self.load(db)
+
+    # ==================== 差分更新 ====================
+
+    def upsert_track(self, track: Track, artist_name: str) -> None:
+        """楽曲を登録・更新（非公開になった楽曲は削除）"""
+        with self._lock:
+            if not self.loaded:
+                return
+            if not track.is_public:
+                self._drop_track(track.id)
+                return
+            self._put_track(track.id, track.title, track.play_count, track.artist_id, artist_name)
+
+    def remove_track(self, track_id: str) -> None:
+        with self._lock:
+            if self.loaded:
+                self._drop_track(track_id)
+
+    def add_plays(self, track_id: str, count: int = 1) -> None:
+        """再生回数の加算を反映"""
+        with self._lock:
+            if not self.loaded or track_id not in self._tracks:
+                return
+            artist_id, play_count = self._tracks[track_id]
+            self._tracks[track_id] = (artist_id, play_count + count)
+            self._set_score((KIND_TRACK, track_id), play_count + count)
+            self._refresh_artist(artist_id)
+
+    def rename_artist(self, artist_id: str, display_name: str) -> None:
+        with self._lock:
+            if not self.loaded or artist_id not in self._artist_tracks:
+                return
+            self._artist_names[artist_id] = display_name
+            self._remove_entry((KIND_ARTIST, artist_id))
+            self._refresh_artist(artist_id)
+
+    # ==================== 検索 ====================
+
+    def suggest(self, prefix: str, limit: int = MAX_SUGGESTIONS) -> List[Dict[str, object]]:
+        """前方一致する候補を再生回数の多い順に返す"""
+        normalized = normalize(prefix).strip()
+        if not normalized:
+            return []
+
+        with self._lock:
+            node = self._root
+            for char in normalized:
+                node = node.children.get(char)
+                if node is None:
+                    return []
+            if node.top is None:
+                node.top = self._collect_top(node)
+            return [
+                {
+                    "type": key[0],
+                    "id": key[1],
+                    "text": self._entries[key][0],
+                    "play_count": self._entries[key][1],
+                }
+                for key in node.top[:min(limit, MAX_SUGGESTIONS)]
+            ]
+
+    # ==================== 内部処理 ====================
+
+    def _rank(self, key: EntryKey) -> Tuple[int, str]:
+        text, score = self._entries[key]
+        return (-score, text)
+
+    def _put_track(self, track_id, title, play_count, artist_id, artist_name):
+        previous = self._tracks.get(track_id)
+        if previous and previous[0] != artist_id:
+            self._drop_track(track_id)
+
+        self._tracks[track_id] = (artist_id, play_count or 0)
+        self._artist_tracks.setdefault(artist_id, set()).add(track_id)
+        self._artist_names[artist_id] = artist_name
+
+        key = (KIND_TRACK, track_id)
+        if key in self._entries and self._entries[key][0] != title:
+            self._remove_entry(key)
+        if key in self._entries:
+            self._set_score(key, play_count or 0)
+        else:
+            self._add_entry(key, title, play_count or 0)
+        self._refresh_artist(artist_id)
+
+    def _drop_track(self, track_id):
+        previous = self._tracks.pop(track_id, None)
+        if previous is None:
+            return
+        self._remove_entry((KIND_TRACK, track_id))
+        artist_id = previous[0]
+        self._artist_tracks.get(artist_id, set()).discard(track_id)
+        self._refresh_artist(artist_id)
+
+    def _refresh_artist(self, artist_id):
+        """アーティスト候補のスコア（公開楽曲の再生回数合計）を更新"""
+        key = (KIND_ARTIST, artist_id)
+        track_ids = self._artist_tracks.get(artist_id)
+        if not track_ids:
+            self._artist_tracks.pop(artist_id, None)
+            self._artist_names.pop(artist_id, None)
+            self._remove_entry(key)
+            return
+        score = sum(self._tracks[track_id][1] for track_id in track_ids)
+        name = self._artist_names[artist_id]
+        if key in self._entries and self._entries[key][0] != name:
+            self._remove_entry(key)
+        if key in self._entries:
+            self._set_score(key, score)
+        else:
+            self._add_entry(key, name, score)
+
+    def _path(self, index_key: str, create: bool = False) -> List[_Node]:
+        nodes = []
+        node = self._root
+        for char in index_key:
+            child = node.children.get(char)
+            if child is None:
+                if not create:
+                    break
+                child = node.children[char] = _Node()
+            node = child
+            nodes.append(node)
+        return nodes
+
+    def _add_entry(self, key: EntryKey, text: str, score: int) -> None:
+        self._entries[key] = (text, score)
+        self._keys[key] = _index_keys(text)
+        for index_key in self._keys[key]:
+            nodes = self._path(index_key, create=True)
+            nodes[-1].terminals.add(key)
+            for node in nodes:
+                self._offer(node, key)
+
+    def _remove_entry(self, key: EntryKey) -> None:
+        if key not in self._entries:
+            return
+        for index_key in self._keys.pop(key):
+            nodes = self._path(index_key)
+            if len(nodes) == len(index_key):
+                nodes[-1].terminals.discard(key)
+            for node in nodes:
+                if node.top is not None and key in node.top:
+                    node.top = None
+        del self._entries[key]
+
+    def _set_score(self, key: EntryKey, score: int) -> None:
+        text, previous = self._entries[key]
+        if score == previous:
+            return
+        self._entries[key] = (text, score)
+        for index_key in self._keys[key]:
+            for node in self._path(index_key):
+                if score < previous:
+                    # 順位が下がると部分木内の別候補が繰り上がる可能性があるため再計算
+                    if node.top is not None and key in node.top:
+                        node.top = None
+                else:
+                    self._offer(node, key)
+
+    def _offer(self, node: _Node, key: EntryKey) -> None:
+        """ノードの上位候補キャッシュに候補を反映"""
+        if node.top is None:
+            return
+        if key not in node.top:
+            if len(node.top) >= MAX_SUGGESTIONS and self._rank(key) >= self._rank(node.top[-1]):
+                return
+            node.top.append(key)
+        node.top.sort(key=self._rank)
+        del node.top[MAX_SUGGESTIONS:]
+
+    def _collect_top(self, node: _Node) -> List[EntryKey]:
+        keys: Set[EntryKey] = set()
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            keys.update(current.terminals)
+            stack.extend(current.children.values())
+        return heapq.nsmallest(MAX_SUGGESTIONS, keys, key=self._rank)
+
+
+# アプリケーション全体で共有するインデックス
+suggest_index = SuggestIndex()
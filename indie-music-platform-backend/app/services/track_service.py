@@ -1,110 +1,253 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from app.models.track import Track
+from app.models.track_listing import TrackListing
 from app.models.user import User
-from app.schemas.track import TrackCreate, TrackUpdate, TrackListItem
+from app.schemas.track import TrackCreate, TrackUpdate, TrackListItem, TrackWithArtist
+from app.core.cache import MISS, catalog_cache
 from fastapi import HTTPException, UploadFile
 from app.services.storage import upload_file_to_s3
-from sqlalchemy import desc, asc, or_
+from app.services import play_counter, search_service
+from app.services.suggest_service import suggest_index
+from app.services.trending_service import trending_index
+from app.utils.etag import make_etag
+from app.utils.pagination import apply_keyset, cursor_key, next_cursor
+from sqlalchemy import false, func, select
 from starlette.status import HTTP_400_BAD_REQUEST, HTTP_404_NOT_FOUND
-from typing import List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 import uuid
 import os
 from datetime import datetime
 
 
-def get_tracks(
+# ストリーミング出力時に1回で取得する行数
+STREAM_BATCH_SIZE = 500
+
+# 一括取得で指定できる楽曲IDの上限
+MAX_BATCH_TRACKS = 200
+
+# カタログキャッシュのバージョンカウンター名
+CATALOG_VERSION = "catalog"
+
+
+def _artist_version(artist_id: str) -> str:
+    return f"artist:{artist_id}"
+
+
+def _track_version(track_id: str) -> str:
+    return f"track:{track_id}"
+
+
+def invalidate_catalog(track_id: Optional[str] = None, artist_id: Optional[str] = None) -> None:
+    """
+    楽曲・アーティストの変更をカタログキャッシュに通知
+    """
+    names = [CATALOG_VERSION]
+    if artist_id:
+        names.append(_artist_version(artist_id))
+    if track_id:
+        names.append(_track_version(track_id))
+    catalog_cache.bump(*names)
+
+
+# 一覧系エンドポイントで指定可能なソートキー
+SORT_COLUMNS = {
+    "title": TrackListing.title,
+    "artist": TrackListing.artist_name,
+    "price": TrackListing.price,
+    "release_date": TrackListing.release_date,
+    "play_count": TrackListing.play_count,
+    "created_at": TrackListing.created_at,
+}
+
+
+def _track_list_query(db: Session):
+    """
+    楽曲一覧用の基本クエリ（非正規化テーブル track_listing の単一テーブル参照）
+    """
+    return db.query(
+        TrackListing.track_id.label("track_id"),
+        TrackListing.title.label("track_title"),
+        TrackListing.artist_id.label("track_artist_id"),
+        TrackListing.artist_name.label("artist_name"),
+        TrackListing.cover_art_url.label("track_cover_art_url"),
+        TrackListing.duration.label("track_duration"),
+        TrackListing.price.label("track_price"),
+        TrackListing.genre.label("track_genre"),
+        TrackListing.release_date.label("track_release_date"),
+        TrackListing.play_count.label("track_play_count")
+    )
+
+
+def _row_to_list_item(row) -> Dict[str, Any]:
+    """
+    一覧クエリの行をTrackListItem形式の辞書に変換
+    """
+    return {
+        "id": row.track_id,
+        "title": row.track_title,
+        "artist_id": row.track_artist_id,
+        "artist_name": row.artist_name,
+        "cover_art_url": row.track_cover_art_url,
+        "duration": row.track_duration,
+        "price": float(row.track_price) if row.track_price else None,
+        "genre": row.track_genre,
+        "release_date": row.track_release_date if row.track_release_date else None,
+        "play_count": row.track_play_count
+    }
+
+
+def _fetch_page(
+    query,
+    sort_col,
+    sort_by: str,
+    sort_desc: bool,
+    skip: int,
+    limit: int,
+    cursor: Optional[str]
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    ソート・ページネーションを適用して1ページ分を取得
+    cursor指定時はキーセット方式（skipは無視）、未指定時は従来のoffset方式
+    """
+    query = query.add_columns(cursor_key(sort_col).label("sort_key"))
+    query = apply_keyset(query, sort_col, TrackListing.track_id, sort_desc, cursor, sort_by)
+    if not cursor:
+        query = query.offset(skip)
+    rows = query.limit(limit).all()
+
+    results = []
+    for row in rows:
+        try:
+            results.append(_row_to_list_item(row))
+        except Exception as e:
+            # 行処理でエラーが発生した場合はログに記録してスキップ
+            print(f"Error processing track row: {e}")
+            continue
+
+    return results, next_cursor(rows, limit, sort_by, sort_desc)
+
+
+def get_tracks_page(
     db: Session,
     skip: int = 0,
     limit: int = 100,
     genre: Optional[str] = None,
     search: Optional[str] = None,
     sort_by: Optional[str] = "created_at",
-    sort_desc: bool = True
-) -> List[TrackListItem]:
+    sort_desc: bool = True,
+    cursor: Optional[str] = None
+) -> Tuple[List[TrackListItem], Optional[str]]:
     """
-    楽曲一覧を取得
+    楽曲一覧を1ページ分取得し、次ページのカーソルと共に返す
+    結果は正規化した検索条件をキーにキャッシュされ、楽曲の変更で無効化される
     """
-    query = db.query(
-        Track.id.label("track_id"),  # 列エイリアスを修正
-        Track.title.label("track_title"),
-        Track.artist_id.label("track_artist_id"),
-        User.display_name.label("artist_name"),
-        Track.cover_art_url.label("track_cover_art_url"),
-        Track.duration.label("track_duration"),
-        Track.price.label("track_price"),
-        Track.genre.label("track_genre"),
-        Track.release_date.label("track_release_date"),
-        Track.play_count.label("track_play_count")
-    ).join(User, Track.artist_id == User.id)\
-    .filter(Track.is_public == True)
+    # キャッシュキーが揃うよう条件を正規化
+    if sort_by not in SORT_COLUMNS:
+        sort_by = "created_at"
+    genre = genre or None
+    search = " ".join(search.split()) if search else None
+    if cursor:
+        skip = 0
+    
+    key = ("tracks", skip, limit, genre, search, sort_by, sort_desc, cursor)
+    return catalog_cache.get_or_load(
+        key,
+        (CATALOG_VERSION,),
+        lambda: _query_tracks_page(db, skip, limit, genre, search, sort_by, sort_desc, cursor)
+    )
+
+
+def _public_tracks_query(db: Session, genre: Optional[str], search: Optional[str]):
+    """公開楽曲一覧の絞り込み条件を適用したクエリ"""
+    query = _track_list_query(db).filter(TrackListing.is_public == True)
     
     # ジャンルフィルター
     if genre:
-        query = query.filter(Track.genre == genre)
+        query = query.filter(TrackListing.genre == genre)
     
-    # 検索フィルター
+    # 検索フィルター（全文検索インデックスで絞り込み、並び順は指定のソートに従う）
     if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            or_(
-                Track.title.ilike(search_term),
-                User.display_name.ilike(search_term)
-            )
-        )
-    
-    # ソート
-    if sort_by:
-        if sort_by == "title":
-            sort_col = Track.title
-        elif sort_by == "artist":
-            sort_col = User.display_name
-        elif sort_by == "price":
-            sort_col = Track.price
-        elif sort_by == "release_date":
-            sort_col = Track.release_date
-        elif sort_by == "play_count":
-            sort_col = Track.play_count
-        else:
-            sort_col = Track.created_at
-        
-        if sort_desc:
-            query = query.order_by(desc(sort_col))
+        matches = search_service.match_subquery(db, search)
+        if matches is None:
+            query = query.filter(false())
         else:
-            query = query.order_by(asc(sort_col))
-    
-    # ページネーション
-    query = query.offset(skip).limit(limit)
+            query = query.filter(TrackListing.track_id.in_(select(matches.c.track_id)))
     
-    # 結果を辞書形式で取得
-    rows = query.all()
-    results = []
-    
-    # 空の結果も正常に処理
-    if not rows:
-        return []
+    return query
+
+
+def _query_tracks_page(
+    db: Session,
+    skip: int,
+    limit: int,
+    genre: Optional[str],
+    search: Optional[str],
+    sort_by: str,
+    sort_desc: bool,
+    cursor: Optional[str]
+) -> Tuple[List[TrackListItem], Optional[str]]:
+    query = _public_tracks_query(db, genre, search)
     
-    for row in rows:
-        try:
-            # rowの属性を使って辞書を作成（スキーマに合わせて）
-            result_dict = {
-                "id": row.track_id,
-                "title": row.track_title,
-                "artist_id": row.track_artist_id,
-                "artist_name": row.artist_name,
-                "cover_art_url": row.track_cover_art_url,
-                "duration": row.track_duration,
-                "price": float(row.track_price) if row.track_price else None,
-                "genre": row.track_genre,
-                "release_date": row.track_release_date if row.track_release_date else None,
-                "play_count": row.track_play_count
-            }
-            results.append(result_dict)
-        except Exception as e:
-            # 行処理でエラーが発生した場合はログに記録してスキップ
-            print(f"Error processing track row: {e}")
-            continue
+    # ソート（未知のキーは作成日時順に正規化済み）
+    sort_col = SORT_COLUMNS[sort_by]
     
-    return results
+    return _fetch_page(query, sort_col, sort_by, sort_desc, skip, limit, cursor)
+
+
+def iter_tracks(
+    db: Session,
+    skip: int = 0,
+    limit: Optional[int] = None,
+    genre: Optional[str] = None,
+    search: Optional[str] = None,
+    sort_by: Optional[str] = "created_at",
+    sort_desc: bool = True,
+    cursor: Optional[str] = None,
+    batch_size: int = STREAM_BATCH_SIZE
+) -> Iterator[Dict[str, Any]]:
+    """
+    楽曲一覧を1件ずつ返すイテレーター（ストリーミング出力用、キャッシュしない）
+    行は batch_size 件ずつ取得するため、件数に関わらず保持する行数は一定
+    カーソルの検証はレスポンス送信前にエラーを返せるよう呼び出し時に行う
+    """
+    if sort_by not in SORT_COLUMNS:
+        sort_by = "created_at"
+    sort_col = SORT_COLUMNS[sort_by]
+
+    query = _public_tracks_query(db, genre or None, search)
+    query = apply_keyset(query, sort_col, TrackListing.track_id, sort_desc, cursor, sort_by)
+    if not cursor and skip:
+        query = query.offset(skip)
+    if limit is not None:
+        query = query.limit(limit)
+
+    return (_row_to_list_item(row) for row in query.yield_per(batch_size))
+
+
+def get_tracks(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    genre: Optional[str] = None,
+    search: Optional[str] = None,
+    sort_by: Optional[str] = "created_at",
+    sort_desc: bool = True,
+    cursor: Optional[str] = None
+) -> List[TrackListItem]:
+    """
+    楽曲一覧を取得
+    """
+    tracks, _ = get_tracks_page(
+        db=db,
+        skip=skip,
+        limit=limit,
+        genre=genre,
+        search=search,
+        sort_by=sort_by,
+        sort_desc=sort_desc,
+        cursor=cursor
+    )
+    return tracks
 
 
 def get_track(db: Session, track_id: str):
@@ -127,6 +270,169 @@ def get_track(db: Session, track_id: str):
     return track
 
 
+def get_track_detail(db: Session, track_id: str) -> Dict[str, Any]:
+    """
+    アーティスト情報付きの楽曲詳細を取得（キャッシュ対象）
+    """
+    key = ("track", track_id)
+    cached = catalog_cache.get(key)
+    if cached is not MISS:
+        return _with_pending_plays(db, [cached])[0]
+
+    # アーティストIDは読み込むまで分からないため、読み込み中にカタログ全体の
+    # カウンターが進んだ場合（改名を含む変更があった場合）はキャッシュしない
+    catalog_version = catalog_cache.version(CATALOG_VERSION)
+    track_deps = catalog_cache.snapshot((_track_version(track_id),))
+    track = get_track(db, track_id)
+    detail = _cache_track_detail(track, catalog_version, track_deps)
+    return _with_pending_plays(db, [detail])[0]
+
+
+def _cache_track_detail(track: Track, catalog_version: int, track_deps) -> Dict[str, Any]:
+    detail = TrackWithArtist.model_validate(track).model_dump()
+    if catalog_cache.version(CATALOG_VERSION) == catalog_version:
+        artist_deps = catalog_cache.snapshot((_artist_version(track.artist_id),))
+        catalog_cache.set(("track", track.id), detail, track_deps + artist_deps)
+    return detail
+
+
+def _with_pending_plays(db: Session, details: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    キャッシュした詳細（畳み込み済みの再生回数）に未畳み込みの再生回数を加えた複製を返す
+    """
+    pending = play_counter.pending_plays(db, [detail["id"] for detail in details])
+    return [
+        {**detail, "play_count": (detail["play_count"] or 0) + pending[detail["id"]]}
+        if pending.get(detail["id"]) else detail
+        for detail in details
+    ]
+
+
+def get_tracks_batch(db: Session, track_ids: List[str]) -> Dict[str, Any]:
+    """
+    複数の楽曲詳細を指定順で一括取得
+    キャッシュにない楽曲のみをアーティスト込みの1回の IN クエリで読み込み、
+    存在しないIDは missing_ids として返す
+    """
+    ordered_ids = list(dict.fromkeys(track_id for track_id in track_ids if track_id))
+    if len(ordered_ids) > MAX_BATCH_TRACKS:
+        raise HTTPException(
+            status_code=HTTP_400_BAD_REQUEST,
+            detail=f"一度に取得できる楽曲は{MAX_BATCH_TRACKS}件までです"
+        )
+
+    details: Dict[str, Dict[str, Any]] = {}
+    for track_id in ordered_ids:
+        cached = catalog_cache.get(("track", track_id))
+        if cached is not MISS:
+            details[track_id] = cached
+
+    uncached_ids = [track_id for track_id in ordered_ids if track_id not in details]
+    if uncached_ids:
+        catalog_version = catalog_cache.version(CATALOG_VERSION)
+        track_deps = {
+            track_id: catalog_cache.snapshot((_track_version(track_id),))
+            for track_id in uncached_ids
+        }
+        tracks = db.query(Track).options(joinedload(Track.artist))\
+            .filter(Track.id.in_(uncached_ids)).all()
+        for track in tracks:
+            details[track.id] = _cache_track_detail(track, catalog_version, track_deps[track.id])
+
+    return {
+        "tracks": _with_pending_plays(db, [details[track_id] for track_id in ordered_ids if track_id in details]),
+        "missing_ids": [track_id for track_id in ordered_ids if track_id not in details],
+    }
+
+
+def get_trending_tracks(db: Session, genre: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+    """
+    時間減衰スコアの高い順に急上昇楽曲を取得
+    順位はプロセス内の上位K件から決め、表示用の列は該当楽曲だけを IN クエリで読む
+    """
+    trending_index.ensure_loaded(db)
+    ranked = trending_index.top(genre, limit)
+    if not ranked:
+        return []
+
+    rows = {
+        row.track_id: row
+        for row in _track_list_query(db).filter(
+            TrackListing.track_id.in_([track_id for track_id, _ in ranked]),
+            TrackListing.is_public == True
+        ).all()
+    }
+    return [
+        {**_row_to_list_item(rows[track_id]), "trending_score": score}
+        for track_id, score in ranked if track_id in rows
+    ]
+
+
+def _listing_stamp(db: Session, *criteria) -> Tuple[int, Any]:
+    """一覧用テーブルの件数と最終更新日時（追加・変更・削除のいずれでも変化する）"""
+    return tuple(db.query(
+        func.count(TrackListing.track_id), func.max(TrackListing.updated_at)
+    ).filter(*criteria).one())
+
+
+def _versioned_etag(key: Tuple, depends_on: Tuple[str, ...], load_stamp) -> Optional[str]:
+    """
+    バージョンスタンプからETagを生成し、依存カウンターが進むまでキャッシュする
+    DBの更新日時は秒単位の場合があるため、プロセス内のカウンターもスタンプに含める
+    （カウンターは読み込み前に取得するため、読み込み中の変更は次回の再計算で反映される）
+    """
+    def load():
+        versions = [catalog_cache.version(name) for name in depends_on]
+        stamp = load_stamp()
+        return make_etag(*key, *versions, *stamp) if stamp is not None else None
+
+    return catalog_cache.get_or_load(("etag",) + key, depends_on, load)
+
+
+def get_catalog_etag(db: Session) -> str:
+    """
+    楽曲一覧のETag
+    条件付きリクエストでは一覧の本クエリとシリアライズを実行せずに判定できる
+    """
+    return _versioned_etag(("catalog",), (CATALOG_VERSION,), lambda: _listing_stamp(db))
+
+
+def get_artist_tracks_etag(db: Session, artist_id: str) -> str:
+    """
+    アーティストの楽曲一覧のETag
+    """
+    return _versioned_etag(
+        ("artist_tracks", artist_id),
+        (_artist_version(artist_id),),
+        lambda: _listing_stamp(db, TrackListing.artist_id == artist_id)
+    )
+
+
+def get_track_etag(db: Session, track_id: str) -> Optional[str]:
+    """
+    楽曲詳細のETag（楽曲とアーティストの更新日時と、未畳み込みの再生回数から生成）
+    楽曲が存在しない場合は None
+    """
+    def load_stamp():
+        return db.query(Track.updated_at, User.updated_at)\
+            .join(User, Track.artist_id == User.id)\
+            .filter(Track.id == track_id).first()
+
+    # アーティストの変更もカタログのカウンターを進めるため、カタログ全体に依存させる
+    etag = _versioned_etag(
+        ("track", track_id),
+        (_track_version(track_id), CATALOG_VERSION),
+        load_stamp
+    )
+    if etag is None:
+        return None
+
+    # 詳細の再生回数には未畳み込みの再生も含まれるが、加算ではカウンターが進まないため毎回読む
+    # （畳み込み時はカタログのカウンターが進み、キャッシュしたETagも作り直される）
+    pending = play_counter.pending_plays(db, [track_id]).get(track_id, 0)
+    return make_etag(etag, pending) if pending else etag
+
+
 def create_track(db: Session, track_data: TrackCreate, artist_id: str) -> Track:
     """
     新規楽曲を登録
@@ -146,8 +452,13 @@ def create_track(db: Session, track_data: TrackCreate, artist_id: str) -> Track:
     )
     
     db.add(track)
+    db.flush()
+    search_service.index_track(db, track)
     db.commit()
     db.refresh(track)
+    invalidate_catalog(track_id=track.id, artist_id=track.artist_id)
+    suggest_index.upsert_track(track, track.artist.display_name)
+    trending_index.upsert_track(track)
     return track
 
 
@@ -176,8 +487,12 @@ def update_track(db: Session, track_id: str, track_data: TrackUpdate) -> Track:
     if track_data.is_public is not None:
         track.is_public = track_data.is_public
     
+    search_service.index_track(db, track)
     db.commit()
     db.refresh(track)
+    invalidate_catalog(track_id=track.id, artist_id=track.artist_id)
+    suggest_index.upsert_track(track, track.artist.display_name)
+    trending_index.upsert_track(track)
     return track
 
 
@@ -192,8 +507,13 @@ def delete_track(db: Session, track_id: str) -> None:
             detail="楽曲が見つかりません"
         )
     
+    artist_id = track.artist_id
+    search_service.remove_track(db, track_id)
     db.delete(track)
     db.commit()
+    invalidate_catalog(track_id=track_id, artist_id=artist_id)
+    suggest_index.remove_track(track_id)
+    trending_index.remove_track(track_id)
 
 
 def upload_cover_art(file: UploadFile, user_id: str) -> str:
@@ -240,59 +560,77 @@ def upload_audio_file(file: UploadFile, user_id: str) -> str:
     return url
 
 
-def get_artist_tracks(db: Session, artist_id: str, skip: int = 0, limit: int = 100) -> List[TrackListItem]:
+def get_artist_tracks_page(
+    db: Session,
+    artist_id: str,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None
+) -> Tuple[List[TrackListItem], Optional[str]]:
+    """
+    アーティストの楽曲一覧を1ページ分取得し、次ページのカーソルと共に返す
+    結果はキャッシュされ、そのアーティストの楽曲の変更で無効化される
+    """
+    if cursor:
+        skip = 0
+
+    def load():
+        query = _track_list_query(db)\
+            .filter(TrackListing.artist_id == artist_id, TrackListing.is_public == True)
+        return _fetch_page(query, TrackListing.release_date, "release_date", True, skip, limit, cursor)
+
+    key = ("artist_tracks", artist_id, skip, limit, cursor)
+    return catalog_cache.get_or_load(key, (_artist_version(artist_id),), load)
+
+
+def get_artist_tracks(
+    db: Session,
+    artist_id: str,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None
+) -> List[TrackListItem]:
     """
     アーティストの楽曲一覧を取得
     """
-    query = db.query(
-        Track.id.label("track_id"),
-        Track.title.label("track_title"),
-        Track.artist_id.label("track_artist_id"),
-        User.display_name.label("artist_name"),
-        Track.cover_art_url.label("track_cover_art_url"),
-        Track.duration.label("track_duration"),
-        Track.price.label("track_price"),
-        Track.genre.label("track_genre"),
-        Track.release_date.label("track_release_date"),
-        Track.play_count.label("track_play_count")
-    ).join(User, Track.artist_id == User.id)\
-    .filter(Track.artist_id == artist_id, Track.is_public == True)\
-    .order_by(desc(Track.release_date))\
-    .offset(skip).limit(limit)
-    
-    results = [dict(row) for row in query.all()]
-    return results
+    tracks, _ = get_artist_tracks_page(
+        db=db, artist_id=artist_id, skip=skip, limit=limit, cursor=cursor
+    )
+    return tracks
 
 
-def search_tracks(db: Session, query: str, skip: int = 0, limit: int = 100) -> List[TrackListItem]:
+def search_tracks_page(
+    db: Session,
+    query: str,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None
+) -> Tuple[List[TrackListItem], Optional[str]]:
     """
-    楽曲を検索
+    楽曲を検索し、関連度順に次ページのカーソルと共に返す
     """
-    search_term = f"%{query}%"
-    query = db.query(
-        Track.id.label("track_id"),
-        Track.title.label("track_title"),
-        Track.artist_id.label("track_artist_id"),
-        User.display_name.label("artist_name"),
-        Track.cover_art_url.label("track_cover_art_url"),
-        Track.duration.label("track_duration"),
-        Track.price.label("track_price"),
-        Track.genre.label("track_genre"),
-        Track.release_date.label("track_release_date"),
-        Track.play_count.label("track_play_count")
-    ).join(User, Track.artist_id == User.id)\
-    .filter(
-        Track.is_public == True,
-        or_(
-            Track.title.ilike(search_term),
-            User.display_name.ilike(search_term),
-            Track.genre.ilike(search_term)
-        )
-    )\
-    .order_by(desc(Track.play_count))\
-    .offset(skip).limit(limit)
+    matches = search_service.match_subquery(db, query)
+    if matches is None:
+        return [], None
+
+    list_query = _track_list_query(db)\
+        .join(matches, matches.c.track_id == TrackListing.track_id)\
+        .filter(TrackListing.is_public == True)
     
-    results = [dict(row) for row in query.all()]
-    return results
+    return _fetch_page(list_query, matches.c.score, "relevance", True, skip, limit, cursor)
 
 
+def search_tracks(
+    db: Session,
+    query: str,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None
+) -> List[TrackListItem]:
+    """
+    楽曲を検索
+    """
+    tracks, _ = search_tracks_page(
+        db=db, query=query, skip=skip, limit=limit, cursor=cursor
+    )
+    return tracks
@@ -0,0 +1,231 @@
+"""
+再生数の時間減衰スコアによる急上昇楽曲
+
+スコアは再生ごとに 2^((再生日時 - 基準時刻) / 半減期) を加算した値（前方減衰）で保持する。
+どの時点で比べても「半減期ごとに半分になる再生数の合計」と同じ順序になるため、
+時間の経過に合わせて全楽曲のスコアを更新する必要はなく、再生のたびに該当楽曲だけを加算する。
+ジャンルごと（と全体）に上位 TRENDING_TOP_K 件を最小ヒープで保持し、
+問い合わせはその上位件数だけを並べ替える（カタログ全体は並べ替えない）。
+"""
+
+import heapq
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.play_daily import PlayDaily
+from app.models.track import Track
+from app.models.track_listing import TrackListing
+
+logger = logging.getLogger(__name__)
+
+# 全ジャンルの上位を表すキー
+ALL_GENRES = None
+
+# 起動時のスコア構築で読む日ごとの集計の期間（半減期の何倍か）
+LOOKBACK_HALF_LIVES = 8
+
+# 基準時刻からの経過がこの半減期数を超えたらスコアを縮小して基準時刻を進める（桁あふれ防止）
+REBASE_HALF_LIVES = 512
+
+
+class _TopK:
+    """スコアが増える一方の要素の上位K件（最小ヒープ、更新前のエントリは遅延削除）"""
+
+    def __init__(self, k: int):
+        self.k = k
+        self.members: Dict[str, float] = {}
+        self._heap: List[Tuple[float, str]] = []
+
+    def offer(self, track_id: str, score: float) -> None:
+        if track_id in self.members:
+            self.members[track_id] = score
+            heapq.heappush(self._heap, (score, track_id))
+            if len(self._heap) > self.k * 4:
+                self._heap = [(value, key) for key, value in self.members.items()]
+                heapq.heapify(self._heap)
+            return
+
+        if len(self.members) < self.k:
+            self.members[track_id] = score
+            heapq.heappush(self._heap, (score, track_id))
+            return
+
+        self._prune()
+        if score <= self._heap[0][0]:
+            return
+        _, evicted = heapq.heapreplace(self._heap, (score, track_id))
+        del self.members[evicted]
+        self.members[track_id] = score
+
+    def discard(self, track_id: str) -> bool:
+        return self.members.pop(track_id, None) is not None
+
+    def top(self, limit: int) -> List[Tuple[str, float]]:
+        return heapq.nlargest(limit, self.members.items(), key=lambda item: item[1])
+
+    def _prune(self) -> None:
+        # 先頭が更新前・削除済みのエントリなら取り除く
+        while self._heap and self.members.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+
+class TrendingIndex:
+    """ジャンルごとの急上昇楽曲の上位K件"""
+
+    def __init__(self, half_life_hours: float = 24.0, top_k: int = 100):
+        self.half_life_seconds = half_life_hours * 3600
+        self.top_k = top_k
+        self._lock = threading.RLock()
+        self.reset()
+
+    def reset(self) -> None:
+        """インデックスを空にし、未ロード状態に戻す"""
+        with self._lock:
+            self._epoch = datetime.utcnow()
+            self._scores: Dict[str, float] = {}
+            self._genres: Dict[str, Optional[str]] = {}  # 公開楽曲の track_id -> genre
+            self._tops: Dict[Optional[str], _TopK] = {}
+            # 楽曲の削除で上位K件に欠けが出たジャンル（次回参照時に再構築）
+            self._stale: Set[Optional[str]] = set()
+            self.loaded = False
+
+    # ==================== 読み込み ====================
+
+    def load(self, db: Session, now: Optional[datetime] = None) -> None:
+        """公開楽曲と直近の日ごとの集計からスコアを構築"""
+        now = now or datetime.utcnow()
+        since = (now - timedelta(seconds=self.half_life_seconds * LOOKBACK_HALF_LIVES)).date()
+        tracks = db.query(TrackListing.track_id, TrackListing.genre)\
+            .filter(TrackListing.is_public == True).all()
+        daily = db.query(PlayDaily.track_id, PlayDaily.day, PlayDaily.plays)\
+            .filter(PlayDaily.day >= since).all()
+
+        with self._lock:
+            self.reset()
+            self._epoch = now
+            self._genres = {track_id: genre for track_id, genre in tracks}
+            for track_id, day, plays in daily:
+                if track_id in self._genres:
+                    # 日ごとの集計は日の中央に再生されたものとして扱う
+                    played_at = datetime.combine(day, datetime.min.time()) + timedelta(hours=12)
+                    self._scores[track_id] = self._scores.get(track_id, 0.0) + plays * self._weight(played_at)
+            self._rebuild_all()
+            self.loaded = True
+        logger.info(f"急上昇スコアを構築しました: {len(self._scores)}件の楽曲")
+
+    def ensure_loaded(self, db: Session) -> None:
+        if not self.loaded:
+            self.load(db)
+
+    # ==================== 差分更新 ====================
+
+    def add_events(self, events: Iterable[Dict[str, Any]]) -> None:
+        """再生イベントをスコアに加算（再生日時に応じて重み付け）"""
+        with self._lock:
+            if not self.loaded:
+                return
+            for event in events:
+                track_id = event["track_id"]
+                if track_id not in self._genres:
+                    continue
+                self._maybe_rebase(event["played_at"])
+                score = self._scores.get(track_id, 0.0) + self._weight(event["played_at"])
+                self._scores[track_id] = score
+                for key in self._keys(self._genres[track_id]):
+                    self._top(key).offer(track_id, score)
+
+    def upsert_track(self, track: Track) -> None:
+        """楽曲の公開状態・ジャンルの変更を反映"""
+        with self._lock:
+            if not self.loaded:
+                return
+            if not track.is_public:
+                self.remove_track(track.id)
+                return
+            if track.id in self._genres and self._genres[track.id] == track.genre:
+                return
+            self.remove_track(track.id, keep_score=True)
+            self._genres[track.id] = track.genre
+            score = self._scores.get(track.id)
+            if score:
+                for key in self._keys(track.genre):
+                    self._top(key).offer(track.id, score)
+
+    def remove_track(self, track_id: str, keep_score: bool = False) -> None:
+        with self._lock:
+            if not self.loaded or track_id not in self._genres:
+                return
+            genre = self._genres.pop(track_id)
+            if not keep_score:
+                self._scores.pop(track_id, None)
+            for key in self._keys(genre):
+                if key in self._tops and self._tops[key].discard(track_id):
+                    self._stale.add(key)
+
+    # ==================== 検索 ====================
+
+    def top(self, genre: Optional[str] = ALL_GENRES, limit: int = 20, now: Optional[datetime] = None) -> List[Tuple[str, float]]:
+        """(楽曲ID, 現在時点の減衰後スコア) をスコアの高い順に返す"""
+        now = now or datetime.utcnow()
+        with self._lock:
+            key = genre or ALL_GENRES
+            if key in self._stale:
+                self._rebuild(key)
+            top = self._tops.get(key)
+            if top is None:
+                return []
+            scale = self._weight(now)
+            return [(track_id, score / scale) for track_id, score in top.top(min(limit, self.top_k))]
+
+    # ==================== 内部処理 ====================
+
+    def _weight(self, at: datetime) -> float:
+        return 2.0 ** ((at - self._epoch).total_seconds() / self.half_life_seconds)
+
+    def _keys(self, genre: Optional[str]) -> List[Optional[str]]:
+        return [ALL_GENRES, genre] if genre else [ALL_GENRES]
+
+    def _top(self, key: Optional[str]) -> _TopK:
+        if key not in self._tops:
+            self._tops[key] = _TopK(self.top_k)
+        return self._tops[key]
+
+    def _maybe_rebase(self, at: datetime) -> None:
+        elapsed = (at - self._epoch).total_seconds() / self.half_life_seconds
+        if elapsed < REBASE_HALF_LIVES:
+            return
+        factor = self._weight(at)
+        self._scores = {track_id: score / factor for track_id, score in self._scores.items()}
+        self._epoch = at
+        self._rebuild_all()
+
+    def _rebuild(self, key: Optional[str]) -> None:
+        track_ids = [
+            track_id for track_id in self._scores
+            if track_id in self._genres and (key is ALL_GENRES or self._genres[track_id] == key)
+        ]
+        top = _TopK(self.top_k)
+        for track_id in heapq.nlargest(self.top_k, track_ids, key=self._scores.get):
+            top.offer(track_id, self._scores[track_id])
+        self._tops[key] = top
+        self._stale.discard(key)
+
+    def _rebuild_all(self) -> None:
+        self._tops = {}
+        self._stale = set()
+        for track_id, score in self._scores.items():
+            if track_id in self._genres:
+                for key in self._keys(self._genres[track_id]):
+                    self._top(key).offer(track_id, score)
+
+
+# アプリケーション全体で共有するインデックス
+trending_index = TrendingIndex(
+    half_life_hours=settings.TRENDING_HALF_LIFE_HOURS,
+    top_k=settings.TRENDING_TOP_K
+)
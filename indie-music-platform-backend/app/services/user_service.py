@@ -2,7 +2,9 @@ from sqlalchemy.orm import Session
 from app.models.user import User
 from fastapi import HTTPException, UploadFile
 from app.services.storage import upload_file_to_s3
+from app.utils.etag import make_etag
 from starlette.status import HTTP_404_NOT_FOUND
+from typing import Optional
 import os
 import uuid
 
@@ -20,6 +22,15 @@ def get_user_profile(db: Session, user_id: str) -> User:
     return user
 
 
+def get_user_profile_etag(db: Session, user_id: str) -> Optional[str]:
+    """
+    ユーザープロフィールのETag（更新日時から生成）
+    ユーザーが存在しない場合は None
+    """
+    updated_at = db.query(User.updated_at).filter(User.id == user_id).scalar()
+    return make_etag("user", user_id, updated_at) if updated_at else None
+
+
 async def upload_profile_image(file: UploadFile, user_id: str) -> str:
     """
     プロフィール画像をアップロード
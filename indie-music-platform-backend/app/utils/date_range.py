@@ -0,0 +1,33 @@
+"""
+日付範囲の絞り込み条件
+
+func.date(列) のように列を関数で包むとインデックスを使えないため、
+日付の範囲 [開始日, 終了日] を日時の半開区間 [開始日 0:00, 終了日の翌日 0:00) に変換し、
+列そのものとの比較にする。
+"""
+
+from datetime import date, datetime, time, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy.sql.elements import ColumnElement
+
+
+def day_bounds(start_date: date, end_date: date) -> Tuple[datetime, datetime]:
+    """終了日を含む日付範囲を、日時の半開区間（開始を含み終了を含まない）に変換"""
+    return datetime.combine(start_date, time.min), datetime.combine(end_date + timedelta(days=1), time.min)
+
+
+def within_days(column, start_date: date, end_date: date) -> Tuple[ColumnElement, ColumnElement]:
+    """日時の列が開始日から終了日（当日を含む）に入る条件"""
+    start, end = day_bounds(start_date, end_date)
+    return column >= start, column < end
+
+
+def days_filter(column, start_date: Optional[date] = None, end_date: Optional[date] = None) -> List[ColumnElement]:
+    """開始日・終了日のどちらか一方だけの指定も受け付ける within_days（指定がなければ条件なし）"""
+    conditions = []
+    if start_date is not None:
+        conditions.append(column >= datetime.combine(start_date, time.min))
+    if end_date is not None:
+        conditions.append(column < datetime.combine(end_date + timedelta(days=1), time.min))
+    return conditions
@@ -0,0 +1,60 @@
+"""
+条件付きリクエスト（ETag / If-None-Match）
+レスポンス本文のハッシュではなく、更新日時などのバージョンスタンプから ETag を生成し、
+一致した場合は本処理とシリアライズを行わずに 304 を返す
+"""
+
+import hashlib
+from datetime import date, datetime
+from typing import Any, Optional
+
+from fastapi import Request, Response
+from starlette.status import HTTP_304_NOT_MODIFIED
+
+ETAG_HEADER = "ETag"
+IF_NONE_MATCH_HEADER = "If-None-Match"
+
+
+def _stamp_value(value: Any) -> str:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return repr(value)
+
+
+def make_etag(*parts: Any) -> str:
+    """バージョンスタンプの組から強いETag（引用符付き）を生成"""
+    raw = "|".join(_stamp_value(part) for part in parts).encode("utf-8")
+    return '"' + hashlib.sha256(raw).hexdigest()[:32] + '"'
+
+
+def _opaque_tag(tag: str) -> str:
+    # If-None-Match は弱い比較のため W/ 接頭辞は無視する
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match ヘッダーが ETag に一致するか"""
+    header = request.headers.get(IF_NONE_MATCH_HEADER)
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(_opaque_tag(tag) == etag for tag in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=HTTP_304_NOT_MODIFIED, headers={ETAG_HEADER: etag})
+
+
+def conditional_response(request: Request, response: Response, etag: Optional[str]) -> Optional[Response]:
+    """
+    一致すれば 304 レスポンスを返し、一致しなければ通常レスポンスに ETag を設定して None を返す
+    etag が None（対象が存在しない等）の場合は何もしない
+    """
+    if etag is None:
+        return None
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers[ETAG_HEADER] = etag
+    return None
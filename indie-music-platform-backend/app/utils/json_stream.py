@@ -0,0 +1,50 @@
+"""
+JSON配列のストリーミング出力
+行を1件ずつシリアライズし、一定サイズごとにチャンクとして書き出すため、
+件数に関わらずメモリ使用量はチャンクサイズ程度に収まる
+"""
+
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Iterable, Iterator
+
+# orjson があれば高速なエンコーダーを使用
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 1チャンクあたりの目安サイズ（バイト）
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"JSONに変換できない型です: {type(value).__name__}")
+
+
+def dumps(value: Any) -> bytes:
+    """1件分をJSONのバイト列に変換"""
+    if orjson is not None:
+        return orjson.dumps(value, default=_default)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+def iter_json_array(items: Iterable[Any], chunk_size: int = STREAM_CHUNK_BYTES) -> Iterator[bytes]:
+    """要素を順にシリアライズし、JSON配列としてチャンク単位で返す"""
+    buffer = bytearray(b"[")
+    first = True
+    for item in items:
+        if not first:
+            buffer += b","
+        buffer += dumps(item)
+        first = False
+        if len(buffer) >= chunk_size:
+            yield bytes(buffer)
+            buffer.clear()
+    buffer += b"]"
+    yield bytes(buffer)
@@ -0,0 +1,42 @@
+"""
+メディアURLのHMAC署名トークン
+オブジェクトキーと失効時刻（UNIX秒）をHMAC-SHA256で署名し、
+/api/v1/media（または同じ鍵で検証するCDN）で検証する
+boto3 を経由しないため、URLの発行はマイクロ秒単位で完了する
+"""
+
+import base64
+import hashlib
+import hmac
+import time
+from typing import Optional
+from urllib.parse import quote, urlencode
+
+from app.core.config import settings
+
+
+def _signing_key() -> bytes:
+    if not settings.MEDIA_URL_SIGNING_KEY:
+        raise RuntimeError("MEDIA_URL_SIGNING_KEY が設定されていません")
+    return settings.MEDIA_URL_SIGNING_KEY.encode("utf-8")
+
+
+def sign(object_key: str, expires: int) -> str:
+    """オブジェクトキーと失効時刻の署名（URLセーフなBase64、パディングなし）"""
+    message = f"{object_key}\n{int(expires)}".encode("utf-8")
+    digest = hmac.new(_signing_key(), message, hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).decode("ascii").rstrip("=")
+
+
+def build_signed_url(object_key: str, expires: int) -> str:
+    """失効時刻付きの署名URLを生成"""
+    query = urlencode({"expires": int(expires), "sig": sign(object_key, expires)})
+    return f"{settings.MEDIA_BASE_URL.rstrip('/')}/{quote(object_key)}?{query}"
+
+
+def verify(object_key: str, expires: int, signature: str, now: Optional[float] = None) -> bool:
+    """署名が正しく、かつ失効していないか"""
+    now = time.time() if now is None else now
+    if expires < now:
+        return False
+    return hmac.compare_digest(sign(object_key, expires), signature)
@@ -0,0 +1,100 @@
+"""
+カーソル（キーセット）ページネーション
+ソートキー + ID からなる不透明なカーソル文字列のエンコード・デコードを提供
+"""
+
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import String, and_, or_, type_coerce
+from starlette.status import HTTP_400_BAD_REQUEST
+
+
+def _to_json_value(value: Any) -> Any:
+    """カーソルに埋め込めるJSON値へ変換"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def encode_cursor(sort_by: str, sort_desc: bool, sort_value: Any, last_id: str) -> str:
+    """
+    最終行のソートキーとIDからカーソル文字列を生成
+    """
+    payload = {
+        "s": sort_by,
+        "d": sort_desc,
+        "k": [_to_json_value(sort_value), last_id],
+    }
+    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str, sort_desc: bool) -> Tuple[Any, str]:
+    """
+    カーソル文字列を (ソートキー値, ID) に復元
+    ソート条件が発行時と異なる場合は400エラー
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        sort_value, last_id = payload["k"]
+        cursor_sort, cursor_desc = payload["s"], payload["d"]
+    except (ValueError, KeyError, TypeError, binascii.Error, UnicodeError):
+        raise HTTPException(
+            status_code=HTTP_400_BAD_REQUEST,
+            detail="無効なカーソルです"
+        )
+
+    if cursor_sort != sort_by or cursor_desc != sort_desc or not isinstance(last_id, str):
+        raise HTTPException(
+            status_code=HTTP_400_BAD_REQUEST,
+            detail="カーソルのソート条件がリクエストと一致しません"
+        )
+
+    return sort_value, last_id
+
+
+def cursor_key(sort_col: Any) -> Any:
+    """
+    カーソル用にソート列をDBの生の値のまま取り出す式
+    （SQLiteのDateTime文字列表現などを比較時にそのまま使い回すため）
+    """
+    return type_coerce(sort_col, String)
+
+
+def apply_keyset(query: Any, sort_col: Any, id_col: Any, sort_desc: bool,
+                 cursor: Optional[str], sort_by: str) -> Any:
+    """
+    クエリに (ソート列, ID) の複合キーによる順序とシーク条件を付与
+    """
+    if cursor:
+        sort_value, last_id = decode_cursor(cursor, sort_by, sort_desc)
+        key = cursor_key(sort_col)
+        bound = type_coerce(sort_value, String)
+        if sort_desc:
+            query = query.filter(or_(key < bound, and_(key == bound, id_col < last_id)))
+        else:
+            query = query.filter(or_(key > bound, and_(key == bound, id_col > last_id)))
+
+    if sort_desc:
+        return query.order_by(sort_col.desc(), id_col.desc())
+    return query.order_by(sort_col.asc(), id_col.asc())
+
+
+def next_cursor(rows: List[Any], limit: int, sort_by: str, sort_desc: bool) -> Optional[str]:
+    """
+    取得件数がlimitに達していれば次ページ用のカーソルを返す
+    rowsは sort_key / track_id ラベルを持つ行であること
+    """
+    if not rows or len(rows) < limit:
+        return None
+    last = rows[-1]
+    return encode_cursor(sort_by, sort_desc, last.sort_key, last.track_id)
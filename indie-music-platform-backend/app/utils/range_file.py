@@ -0,0 +1,173 @@
+"""
+ローカルファイルの Range 配信（206 Partial Content）
+
+Range / If-Range / If-None-Match を解釈し、要求された範囲のバイトだけを送る。
+ASGIサーバーが zerocopysend 拡張に対応していれば sendfile で送信し、
+そうでなければメモリマップしたファイルからチャンク単位で送るため、
+ファイル全体をPythonのメモリに読み込むことはない。
+"""
+
+import mimetypes
+import mmap
+import os
+from email.utils import formatdate
+from typing import Mapping, Optional, Tuple
+
+from fastapi import Request
+from starlette.responses import Response
+from starlette.status import (
+    HTTP_200_OK,
+    HTTP_206_PARTIAL_CONTENT,
+    HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+)
+from starlette.types import Receive, Scope, Send
+
+from app.utils.etag import ETAG_HEADER, etag_matches, not_modified
+
+# mmap から1回に送るバイト数
+RANGE_CHUNK_BYTES = 64 * 1024
+
+ZEROCOPY_EXTENSION = "http.response.zerocopysend"
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_byte_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Range ヘッダーを (開始, 終了) の閉区間に変換
+    単一範囲のみ対応し、解釈できない・複数範囲の場合は None（全体を返す）
+    ファイル内に収まらない範囲は RangeNotSatisfiable
+    """
+    if not header:
+        return None
+    unit, _, spec = header.strip().partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+
+    start_text, sep, end_text = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if start_text:
+            start = int(start_text)
+            end = int(end_text) if end_text else size - 1
+        else:
+            # bytes=-N は末尾Nバイト
+            suffix = int(end_text)
+            if suffix <= 0:
+                raise RangeNotSatisfiable()
+            start, end = max(size - suffix, 0), size - 1
+    except ValueError:
+        return None
+
+    if start >= size:
+        raise RangeNotSatisfiable()
+    if start < 0 or end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def _file_validators(stat_result: os.stat_result) -> Tuple[str, str]:
+    """ETag（更新時刻とサイズから生成する強いETag）と Last-Modified"""
+    etag = f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+    return etag, formatdate(stat_result.st_mtime, usegmt=True)
+
+
+def _if_range_matches(if_range: Optional[str], etag: str, last_modified: str) -> bool:
+    """If-Range が現在の表現に一致するか（不一致なら Range を無視して全体を返す）"""
+    if if_range is None:
+        return True
+    if_range = if_range.strip()
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        # ETag は強い比較（弱いETagは一致しない）
+        return if_range == etag
+    return if_range == last_modified
+
+
+class RangeFileResponse(Response):
+    """ファイルの一部（または全体）を送るレスポンス"""
+
+    def __init__(
+        self,
+        path: str,
+        start: int,
+        end: int,
+        status_code: int,
+        headers: Mapping[str, str],
+        media_type: Optional[str] = None
+    ):
+        self.path = path
+        self.start = start
+        self.count = max(end - start + 1, 0)
+        self.status_code = status_code
+        self.media_type = media_type
+        self.background = None
+        self.init_headers({**headers, "Content-Length": str(self.count)})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope.get("method") == "HEAD" or self.count == 0:
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        with open(self.path, "rb") as file:
+            if ZEROCOPY_EXTENSION in scope.get("extensions", {}):
+                await send({
+                    "type": ZEROCOPY_EXTENSION,
+                    "file": file.fileno(),
+                    "offset": self.start,
+                    "count": self.count,
+                })
+                return
+
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                try:
+                    position, stop = self.start, self.start + self.count
+                    while position < stop:
+                        chunk_end = min(position + RANGE_CHUNK_BYTES, stop)
+                        await send({
+                            "type": "http.response.body",
+                            "body": bytes(view[position:chunk_end]),
+                            "more_body": chunk_end < stop,
+                        })
+                        position = chunk_end
+                finally:
+                    view.release()
+
+
+def range_file_response(request: Request, path: str) -> Response:
+    """
+    リクエストの条件ヘッダーに応じて 200 / 206 / 304 / 416 のレスポンスを返す
+    """
+    stat_result = os.stat(path)
+    size = stat_result.st_size
+    etag, last_modified = _file_validators(stat_result)
+    headers = {
+        "Accept-Ranges": "bytes",
+        ETAG_HEADER: etag,
+        "Last-Modified": last_modified,
+    }
+
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    byte_range = None
+    if _if_range_matches(request.headers.get("If-Range"), etag, last_modified):
+        try:
+            byte_range = parse_byte_range(request.headers.get("Range"), size)
+        except RangeNotSatisfiable:
+            return Response(
+                status_code=HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                headers={"Content-Range": f"bytes */{size}", "Accept-Ranges": "bytes"}
+            )
+
+    media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    if byte_range is None:
+        return RangeFileResponse(path, 0, size - 1, HTTP_200_OK, headers, media_type)
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return RangeFileResponse(path, start, end, HTTP_206_PARTIAL_CONTENT, headers, media_type)
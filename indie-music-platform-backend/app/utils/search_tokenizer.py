@@ -0,0 +1,81 @@
+"""
+検索用テキストの正規化とトークン化
+日本語（かな・漢字）はバイグラム、英数字は単語単位で分割する
+"""
+
+import re
+import unicodedata
+from typing import List, Tuple
+
+# ひらがな → カタカナ（ぁ〜ゖ, ゝゞ）
+_HIRAGANA_TO_KATAKANA = {code: code + 0x60 for code in range(0x3041, 0x3097)}
+_HIRAGANA_TO_KATAKANA.update({0x309D: 0x30FD, 0x309E: 0x30FE})
+
+# バイグラム化する文字（カタカナ・長音記号・CJK統合漢字・ハングル）
+_CJK_CHARS = (
+    "\u30a1-\u30fa\u30fc-\u30ff"  # カタカナ・長音記号（ひらがなは正規化で畳み込み済み）
+    "\u3400-\u4dbf"                # CJK統合漢字拡張A
+    "\u4e00-\u9fff"                # CJK統合漢字
+    "\uf900-\ufaff"                # CJK互換漢字
+    "\uac00-\ud7af"                # ハングル
+    "\u3005"                        # 々
+)
+
+# CJK文字の連続、またはそれ以外の単語文字の連続
+_RUN_PATTERN = re.compile(rf"([{_CJK_CHARS}]+)|((?:(?![{_CJK_CHARS}])[^\W_])+)")
+
+
+def normalize(text: str) -> str:
+    """
+    NFKC正規化（全角英数・半角カナの畳み込み）、大文字小文字の統一、
+    ひらがなのカタカナへの畳み込みを行う
+    """
+    text = unicodedata.normalize("NFKC", text).casefold()
+    return text.translate(_HIRAGANA_TO_KATAKANA)
+
+
+def _runs(text: str) -> List[Tuple[bool, str]]:
+    """正規化済みテキストを (CJKかどうか, 文字列) の連続に分割"""
+    return [
+        (bool(match.group(1)), match.group(0))
+        for match in _RUN_PATTERN.finditer(normalize(text))
+    ]
+
+
+def _bigrams(run: str) -> List[str]:
+    return [run[i:i + 2] for i in range(len(run) - 1)]
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    インデックス登録用のトークン列
+    CJKの連続はバイグラムと末尾の1文字（1文字検索の前方一致用）に分割する
+    """
+    tokens = []
+    for is_cjk, run in _runs(text or ""):
+        if is_cjk:
+            tokens.extend(_bigrams(run))
+            tokens.append(run[-1])
+        else:
+            tokens.append(run)
+    return tokens
+
+
+def index_text(text: str) -> str:
+    """インデックスの列に格納する、空白区切りのトークン列"""
+    return " ".join(tokenize(text))
+
+
+def query_groups(text: str) -> List[List[str]]:
+    """
+    検索用のトークングループ
+    各グループは連続して出現すべきトークン列（フレーズ）で、末尾は前方一致とする
+    CJKの連続はバイグラムのフレーズ（1文字の場合はその文字の前方一致）になる
+    """
+    groups = []
+    for is_cjk, run in _runs(text or ""):
+        if is_cjk and len(run) > 1:
+            groups.append(_bigrams(run))
+        else:
+            groups.append([run])
+    return groups
@@ -0,0 +1,115 @@
+"""
+表形式データ（CSV / Parquet）のストリーミング出力
+行をバッチ単位で受け取り、CSVは一定サイズごとのチャンク、Parquetはバッチごとの
+row group として書き出すため、件数に関わらずメモリ使用量はバッチ1つ分程度に収まる
+"""
+
+import csv
+import io
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import pyarrow
+import pyarrow.parquet
+
+from app.utils.json_stream import STREAM_CHUNK_BYTES
+
+# 列の定義: (列名, 型) 型は "string" / "timestamp" / "int" / "float"
+ColumnSpec = Tuple[str, str]
+Batch = List[Sequence[Any]]
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def iter_csv(columns: Sequence[ColumnSpec], batches: Iterable[Batch], chunk_size: int = STREAM_CHUNK_BYTES) -> Iterator[bytes]:
+    """ヘッダー行に続けて行をCSVとして書き出し、チャンク単位で返す"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow([name for name, _ in columns])
+    for batch in batches:
+        for row in batch:
+            writer.writerow([_csv_value(value) for value in row])
+            if buffer.tell() >= chunk_size:
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+class _DrainableSink:
+    """
+    ParquetWriter の書き込み先
+    書き込まれたバイト列を drain() で取り出せる（取り出した分は保持しない）
+    Parquet のフッターは書き込み位置を参照するため、位置は取り出しに関わらず通算で返す
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _parquet_schema(columns: Sequence[ColumnSpec]):
+    types = {
+        "string": pyarrow.string(),
+        "timestamp": pyarrow.timestamp("us"),
+        "int": pyarrow.int64(),
+        "float": pyarrow.float64(),
+    }
+    return pyarrow.schema([(name, types[kind]) for name, kind in columns])
+
+
+def iter_parquet(columns: Sequence[ColumnSpec], batches: Iterable[Batch]) -> Iterator[bytes]:
+    """バッチごとに row group を書き出し、書き出した分のバイト列を順に返す"""
+    schema = _parquet_schema(columns)
+    names = [name for name, _ in columns]
+    sink = _DrainableSink()
+    writer: Optional[Any] = pyarrow.parquet.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        for batch in batches:
+            if not batch:
+                continue
+            data = {
+                name: [_csv_value(row[index]) if columns[index][1] == "string" else row[index] for row in batch]
+                for index, name in enumerate(names)
+            }
+            writer.write_table(pyarrow.Table.from_pydict(data, schema=schema))
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+        writer.close()
+        writer = None
+        yield sink.drain()
+    finally:
+        if writer is not None:
+            writer.close()
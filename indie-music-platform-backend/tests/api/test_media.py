@@ -0,0 +1,80 @@
+import time
+import pytest
+from fastapi import status
+from urllib.parse import urlparse
+
+from app.core.config import settings
+from app.utils import media_token
+
+
+@pytest.fixture
+def media_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "MEDIA_URL_SIGNER", "hmac")
+    monkeypatch.setattr(settings, "MEDIA_URL_SIGNING_KEY", "test-signing-key")
+    monkeypatch.setattr(settings, "MEDIA_BASE_URL", "/api/v1/media")
+    monkeypatch.setattr(settings, "MEDIA_ROOT", str(tmp_path))
+    (tmp_path / "tracks").mkdir()
+    (tmp_path / "tracks" / "a.mp3").write_bytes(b"ID3" + bytes(range(256)))
+    return tmp_path
+
+
+def _path_and_query(url):
+    parsed = urlparse(url)
+    return f"{parsed.path}?{parsed.query}"
+
+
+def test_media_serves_file_with_valid_token(client, media_root):
+    url = media_token.build_signed_url("tracks/a.mp3", int(time.time()) + 60)
+    response = client.get(_path_and_query(url))
+    assert response.status_code == status.HTTP_200_OK
+    assert response.content == (media_root / "tracks" / "a.mp3").read_bytes()
+
+
+def test_media_rejects_invalid_or_expired_token(client, media_root):
+    expired = media_token.build_signed_url("tracks/a.mp3", int(time.time()) - 1)
+    assert client.get(_path_and_query(expired)).status_code == status.HTTP_403_FORBIDDEN
+
+    valid = media_token.build_signed_url("tracks/a.mp3", int(time.time()) + 60)
+    tampered = _path_and_query(valid).replace("a.mp3", "b.mp3")
+    assert client.get(tampered).status_code == status.HTTP_403_FORBIDDEN
+
+    missing = media_token.build_signed_url("tracks/missing.mp3", int(time.time()) + 60)
+    assert client.get(_path_and_query(missing)).status_code == status.HTTP_404_NOT_FOUND
+
+
+def _signed(object_key="tracks/a.mp3"):
+    return _path_and_query(media_token.build_signed_url(object_key, int(time.time()) + 60))
+
+
+def test_media_range_requests(client, media_root):
+    data = (media_root / "tracks" / "a.mp3").read_bytes()
+    url = _signed()
+
+    full = client.get(url)
+    assert full.headers["accept-ranges"] == "bytes"
+    etag = full.headers["etag"]
+
+    response = client.get(url, headers={"Range": "bytes=10-19"})
+    assert response.status_code == status.HTTP_206_PARTIAL_CONTENT
+    assert response.content == data[10:20]
+    assert response.headers["content-range"] == f"bytes 10-19/{len(data)}"
+    assert response.headers["content-length"] == "10"
+
+    response = client.get(url, headers={"Range": "bytes=-5"})
+    assert response.content == data[-5:]
+
+    response = client.get(url, headers={"Range": "bytes=250-"})
+    assert response.content == data[250:]
+
+    response = client.get(url, headers={"Range": f"bytes={len(data)}-"})
+    assert response.status_code == status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+    assert response.headers["content-range"] == f"bytes */{len(data)}"
+
+    # If-Range が一致すれば部分取得、一致しなければ全体を返す
+    response = client.get(url, headers={"Range": "bytes=0-1", "If-Range": etag})
+    assert response.status_code == status.HTTP_206_PARTIAL_CONTENT
+    response = client.get(url, headers={"Range": "bytes=0-1", "If-Range": '"stale"'})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.content == data
+
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == status.HTTP_304_NOT_MODIFIED
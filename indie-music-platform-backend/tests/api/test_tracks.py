@@ -1,6 +1,8 @@
 import pytest
 from fastapi import status
 import json
+from app.schemas.track import TrackUpdate
+from app.services import track_service
 
 
 def test_list_tracks(client, db, test_track):
@@ -106,3 +108,71 @@ def test_delete_track(client, db, test_track, test_artist, mock_firebase_auth):
     assert response.status_code == status.HTTP_404_NOT_FOUND
 
 
+
+
+def test_list_tracks_next_cursor_header(client, db, test_track):
+    """
+    一覧APIが次ページのカーソルをX-Next-Cursorヘッダーで返すこと
+    """
+    response = client.get("/api/v1/tracks/", params={"limit": 1})
+    assert response.status_code == status.HTTP_200_OK
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = client.get("/api/v1/tracks/", params={"limit": 1, "cursor": cursor})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == []
+    assert "X-Next-Cursor" not in response.headers
+
+    response = client.get("/api/v1/tracks/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_conditional_get_returns_not_modified(client, db, test_artist, test_track):
+    """
+    If-None-Match が現在のETagに一致すれば304、変更後は200で新しいETagを返すこと
+    """
+    for url in (
+        "/api/v1/tracks/",
+        f"/api/v1/tracks/{test_track.id}",
+        f"/api/v1/tracks/artist/{test_artist.id}",
+        f"/api/v1/users/{test_artist.id}/profile",
+    ):
+        response = client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        etag = response.headers["ETag"]
+
+        response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.headers["ETag"] == etag
+        assert response.content == b""
+
+    etag = client.get(f"/api/v1/tracks/{test_track.id}").headers["ETag"]
+    track_service.update_track(db, test_track.id, TrackUpdate(title="Renamed"))
+    response = client.get(f"/api/v1/tracks/{test_track.id}", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["title"] == "Renamed"
+
+
+def test_get_tracks_batch(client, db, test_track):
+    """
+    一括取得APIがカンマ区切りのIDを受け付けること
+    """
+    response = client.get("/api/v1/tracks/batch", params={"ids": f"unknown,{test_track.id}"})
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert [t["id"] for t in data["tracks"]] == [test_track.id]
+    assert data["missing_ids"] == ["unknown"]
+
+
+def test_list_tracks_stream(client, db, test_track):
+    """
+    stream=true の一覧が通常の一覧と同じJSONを返すこと
+    """
+    expected = client.get("/api/v1/tracks/").json()
+    response = client.get("/api/v1/tracks/", params={"stream": True})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == expected
+
+    response = client.get("/api/v1/tracks/", params={"stream": True, "cursor": "not-a-cursor"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
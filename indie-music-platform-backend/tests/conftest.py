@@ -1,6 +1,6 @@
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 import sys
@@ -70,6 +70,25 @@ def db():
         Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture(autouse=True)
+def reset_in_process_caches():
+    # テストごとにDBを作り直すため、プロセス内のキャッシュ・インデックスも初期化
+    from app.core.cache import catalog_cache
+    from app.services.suggest_service import suggest_index
+    from app.services.stream_service import play_dedup_filter, stream_url_cache
+    from app.services.play_buffer import play_buffer
+    from app.services.trending_service import trending_index
+    from app.services.dashboard_service import dashboard_snapshots
+    play_buffer.reset()
+    catalog_cache.clear()
+    stream_url_cache.clear()
+    play_dedup_filter.reset()
+    suggest_index.reset()
+    trending_index.reset()
+    dashboard_snapshots.reset()
+    yield
+
+
 @pytest.fixture(scope="function")
 def client():
     # FastAPIのテストクライアント
@@ -148,3 +167,34 @@ def mock_firebase_auth():
     # Firebase認証関数をモック
     with patch('firebase_admin.auth.verify_id_token', side_effect=mock_verify_id_token):
         yield
+
+
+def query_plan(db, statement, parameters):
+    """SQLite の EXPLAIN QUERY PLAN の各ステップ"""
+    rows = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+    return [row[-1] for row in rows]
+
+
+@pytest.fixture
+def capture_selects(db):
+    """
+    指定したテーブルからの SELECT を (SQL, パラメータ) で記録するリストを返す関数
+    記録はテスト終了時に止める
+    """
+    engine = db.get_bind()
+    listeners = []
+
+    def start(table_name):
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("SELECT") and f"FROM {table_name}" in " ".join(statement.split()):
+                statements.append((statement, parameters))
+
+        event.listen(engine, "before_cursor_execute", capture)
+        listeners.append(capture)
+        return statements
+
+    yield start
+    for capture in listeners:
+        event.remove(engine, "before_cursor_execute", capture)
@@ -0,0 +1,140 @@
+"""
+期間集計クエリのインデックス利用と性能の回帰テスト
+
+100万件の購入データでのベンチマークは時間がかかるため、RUN_BENCHMARKS=1 のときのみ実行する
+"""
+
+import os
+import random
+import time
+import uuid
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.base import Base
+from app.models.purchase import PaymentMethod, Purchase, PurchaseStatus
+from app.models.track import Track
+from app.models.user import User
+from app.schemas.user import UserRole
+from app.services import artist_service
+from app.utils.date_range import within_days
+from tests.conftest import query_plan
+
+BENCHMARK_PURCHASES = 1_000_000
+
+
+def test_revenue_query_uses_composite_index(db, test_artist, capture_selects):
+    """
+    売上集計が購入日時を関数で包まず、(track_id, status, purchase_date) のインデックスで絞り込むこと
+    """
+    artist_id = test_artist.id
+    statements = capture_selects("purchase")
+    artist_service.get_artist_revenue(db, artist_id, date(2026, 10, 1), date(2026, 10, 31))
+
+    assert len(statements) == 1
+    statement, parameters = statements[0]
+    assert "date(purchase.purchase_date) >=" not in statement
+    plan = query_plan(db, statement, parameters)
+    assert any("ix_purchase_track_status_date" in step and "purchase_date>" in step for step in plan), plan
+    assert not any(step.startswith("SCAN purchase") for step in plan), plan
+
+
+def _seed(engine):
+    rng = random.Random(42)
+    with Session(bind=engine) as db:
+        artist = User(
+            id=str(uuid.uuid4()), email="bench@example.com", firebase_uid="bench",
+            display_name="Bench Artist", user_role=UserRole.ARTIST
+        )
+        listener = User(
+            id=str(uuid.uuid4()), email="listener@example.com", firebase_uid="listener",
+            display_name="Listener", user_role=UserRole.LISTENER
+        )
+        db.add_all([artist, listener])
+        tracks = [
+            Track(
+                id=str(uuid.uuid4()), artist_id=artist.id if i < 20 else listener.id, title=f"Track {i}",
+                duration=180, audio_file_url="https://example.com/a.mp3", price=100,
+                release_date=date(2025, 1, 1), is_public=True
+            )
+            for i in range(200)
+        ]
+        db.add_all(tracks)
+        db.commit()
+        artist_id, listener_id = artist.id, listener.id
+        track_ids = [track.id for track in tracks]
+
+    start = datetime(2025, 1, 1)
+    statuses = [PurchaseStatus.COMPLETED] * 8 + [PurchaseStatus.REFUNDED, PurchaseStatus.FAILED]
+    with engine.begin() as connection:
+        for offset in range(0, BENCHMARK_PURCHASES, 50_000):
+            connection.execute(insert(Purchase), [
+                {
+                    "id": f"p{n}",
+                    "user_id": listener_id,
+                    "track_id": rng.choice(track_ids),
+                    "amount": 100.0,
+                    "purchase_date": start + timedelta(seconds=rng.randrange(730 * 86400)),
+                    "payment_method": PaymentMethod.CREDIT_CARD,
+                    "transaction_id": f"tx{n}",
+                    "status": rng.choice(statuses),
+                }
+                for n in range(offset, min(offset + 50_000, BENCHMARK_PURCHASES))
+            ])
+        connection.exec_driver_sql("ANALYZE")
+    return artist_id
+
+
+def _best_of(runs, func):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def _revenue_total(artist_id, *date_conditions):
+    """売上集計と同じ結合・絞り込みで、期間の条件だけを差し替えた件数・合計のクエリ"""
+    return select(func.count(Purchase.id), func.sum(Purchase.amount)).join(
+        Track, Purchase.track_id == Track.id
+    ).where(
+        Track.artist_id == artist_id,
+        Purchase.status == PurchaseStatus.COMPLETED,
+        *date_conditions
+    )
+
+
+@pytest.mark.slow
+@pytest.mark.performance
+@pytest.mark.skipif(not os.environ.get("RUN_BENCHMARKS"), reason="RUN_BENCHMARKS=1 のときのみ実行")
+def test_revenue_benchmark_million_purchases(tmp_path):
+    """
+    100万件の購入データで、同じ集計クエリを半開区間の条件（within_days）で実行した方が
+    func.date() で包んだ条件より速く、結果が一致すること
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'bench.db'}")
+    Base.metadata.create_all(bind=engine)
+    artist_id = _seed(engine)
+    start_date, end_date = date(2025, 6, 1), date(2025, 6, 30)
+
+    sargable = _revenue_total(artist_id, *within_days(Purchase.purchase_date, start_date, end_date))
+    # 変更前と同じ func.date() で包んだ条件（インデックスを使えない）
+    wrapped = _revenue_total(
+        artist_id,
+        func.date(Purchase.purchase_date) >= start_date,
+        func.date(Purchase.purchase_date) <= end_date
+    )
+
+    with Session(bind=engine) as db:
+        elapsed, (count, total) = _best_of(3, lambda: db.execute(sargable).one())
+        wrapped_elapsed, (wrapped_count, wrapped_total) = _best_of(3, lambda: db.execute(wrapped).one())
+        revenue = artist_service.get_artist_revenue(db, artist_id, start_date, end_date)
+
+    assert (count, total) == (wrapped_count, wrapped_total)
+    assert revenue["summary"]["sales_count"] == count
+    assert revenue["summary"]["total_revenue"] == total
+    assert elapsed * 2 < wrapped_elapsed
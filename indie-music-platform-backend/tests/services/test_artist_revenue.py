@@ -0,0 +1,69 @@
+from datetime import date, datetime
+
+from sqlalchemy import event
+
+from app.models.purchase import PaymentMethod, Purchase, PurchaseStatus
+from app.models.track import Track
+from app.services import artist_service
+
+
+def _purchase(db, user_id, track_id, amount, purchased_at, status=PurchaseStatus.COMPLETED):
+    db.add(Purchase(
+        user_id=user_id,
+        track_id=track_id,
+        amount=amount,
+        purchase_date=purchased_at,
+        payment_method=PaymentMethod.CREDIT_CARD,
+        transaction_id=f"tx-{track_id}-{purchased_at.isoformat()}-{amount}-{status.value}",
+        status=status,
+    ))
+
+
+def test_revenue_is_aggregated_in_one_query(db, test_artist, test_listener, test_track):
+    """
+    日ごと・楽曲ごと・合計の集計が1回のクエリで計算されること
+    """
+    other = Track(
+        artist_id=test_artist.id, title="Other", duration=100, audio_file_url="https://example.com/b.mp3",
+        price=200, release_date=date(2026, 1, 1), is_public=True
+    )
+    db.add(other)
+    db.commit()
+
+    _purchase(db, test_listener.id, test_track.id, 100, datetime(2026, 10, 1, 9))
+    _purchase(db, test_listener.id, test_track.id, 100, datetime(2026, 10, 1, 21))
+    _purchase(db, test_listener.id, other.id, 300, datetime(2026, 10, 3, 12))
+    _purchase(db, test_listener.id, other.id, 999, datetime(2026, 10, 3, 13), PurchaseStatus.REFUNDED)
+    _purchase(db, test_listener.id, test_track.id, 100, datetime(2026, 11, 1, 0))
+    db.commit()
+    artist_id = test_artist.id
+
+    statements = []
+    engine = db.get_bind()
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        result = artist_service.get_artist_revenue(db, artist_id, date(2026, 10, 1), date(2026, 10, 31))
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    # アーティストの確認 + 集計の2回
+    assert len(statements) == 2
+    assert result["summary"]["total_revenue"] == 500
+    assert result["summary"]["sales_count"] == 3
+    assert result["summary"]["net_revenue"] == 500 * 0.85
+    assert result["daily_revenue"] == [
+        {"date": "2026-10-01", "amount": 200.0},
+        {"date": "2026-10-03", "amount": 300.0},
+    ]
+    assert [(item["title"], item["sales_count"], item["total_amount"]) for item in result["track_revenue"]] == [
+        ("Other", 1, 300.0),
+        (test_track.title, 2, 200.0),
+    ]
+
+
+def test_revenue_without_sales(db, test_artist):
+    result = artist_service.get_artist_revenue(db, test_artist.id, date(2026, 10, 1), date(2026, 10, 31))
+    assert result["summary"]["total_revenue"] == 0
+    assert result["summary"]["sales_count"] == 0
+    assert result["daily_revenue"] == [] and result["track_revenue"] == []
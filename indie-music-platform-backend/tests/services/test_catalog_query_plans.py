@@ -0,0 +1,46 @@
+import pytest
+
+from app.services import track_service
+from app.utils.pagination import encode_cursor
+from tests.conftest import query_plan
+
+
+@pytest.fixture
+def captured_listing_queries(capture_selects):
+    """実行された track_listing への SELECT をパラメータ付きで記録"""
+    return capture_selects("track_listing")
+
+
+def _assert_index_only_order(db, statements):
+    assert statements
+    for statement, parameters in statements:
+        plan = query_plan(db, statement, parameters)
+        # テーブル全体の走査やソート用一時B-treeが発生しないこと
+        assert not any(step.startswith("SCAN track_listing") and "INDEX" not in step for step in plan), plan
+        assert not any("TEMP B-TREE" in step for step in plan), plan
+
+
+@pytest.mark.parametrize("sort_by", ["created_at", "play_count", "release_date", "title"])
+@pytest.mark.parametrize("genre", [None, "Rock"])
+def test_catalog_listing_uses_composite_indexes(db, test_track, captured_listing_queries, sort_by, genre):
+    """
+    公開楽曲一覧（ジャンル絞り込みあり・なし）が複合インデックスで処理されること
+    """
+    _, cursor = track_service.get_tracks_page(db, limit=1, genre=genre, sort_by=sort_by)
+    assert cursor is None or isinstance(cursor, str)
+    # カーソル指定時のキーセット条件もインデックスで処理されること
+    track_service.get_tracks_page(
+        db, limit=1, genre=genre, sort_by=sort_by,
+        cursor=encode_cursor(sort_by, True, "x", "id")
+    )
+    _assert_index_only_order(db, captured_listing_queries)
+
+
+def test_artist_listing_uses_composite_index(db, test_artist, test_track, captured_listing_queries):
+    """
+    アーティストの楽曲一覧が複合インデックスで処理されること
+    """
+    track_service.get_artist_tracks_page(db, test_artist.id, limit=1)
+    _assert_index_only_order(db, captured_listing_queries)
+    plan = query_plan(db, *captured_listing_queries[0])
+    assert any("ix_track_listing_artist_release" in step for step in plan), plan
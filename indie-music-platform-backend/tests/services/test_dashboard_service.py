@@ -0,0 +1,127 @@
+from datetime import date, datetime
+
+from sqlalchemy import event
+
+from app.models.purchase import PaymentMethod, Purchase, PurchaseStatus
+from app.services.dashboard_service import (
+    KIND_REVENUE, KIND_STATS, PERIOD_LAST_30_DAYS, PERIOD_THIS_MONTH,
+    DashboardSnapshots, default_periods
+)
+
+TODAY = date(2026, 10, 17)
+
+
+def _purchase(db, user_id, track_id, amount, purchased_at):
+    db.add(Purchase(
+        user_id=user_id,
+        track_id=track_id,
+        amount=amount,
+        purchase_date=purchased_at,
+        payment_method=PaymentMethod.CREDIT_CARD,
+        transaction_id=f"tx-{track_id}-{purchased_at.isoformat()}-{amount}",
+        status=PurchaseStatus.COMPLETED,
+    ))
+    db.commit()
+
+
+def _count_statements(db, func):
+    statements = []
+    engine = db.get_bind()
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        result = func()
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    return result, len(statements)
+
+
+def test_default_periods():
+    periods = default_periods(TODAY)
+    assert periods[PERIOD_THIS_MONTH] == (date(2026, 10, 1), TODAY)
+    assert periods[PERIOD_LAST_30_DAYS] == (date(2026, 9, 17), TODAY)
+
+
+def test_default_period_is_served_from_snapshot(db, test_artist, test_listener, test_track):
+    """
+    既定の期間は2回目以降クエリを実行せずにスナップショットを返すこと
+    """
+    _purchase(db, test_listener.id, test_track.id, 100, datetime(2026, 10, 5, 12))
+    artist_id = test_artist.id
+    snapshots = DashboardSnapshots()
+
+    first, first_count = _count_statements(db, lambda: snapshots.get(db, KIND_REVENUE, artist_id, today=TODAY))
+    assert first_count > 0
+    assert first["summary"]["total_revenue"] == 100
+
+    # 期間の指定なし、今月を明示した指定のどちらもスナップショットから返る
+    second, second_count = _count_statements(db, lambda: snapshots.get(db, KIND_REVENUE, artist_id, today=TODAY))
+    explicit, explicit_count = _count_statements(
+        db, lambda: snapshots.get(db, KIND_REVENUE, artist_id, date(2026, 10, 1), TODAY, today=TODAY)
+    )
+    assert second_count == 0 and explicit_count == 0
+    assert second is first and explicit is first
+
+
+def test_custom_range_runs_live_query(db, test_artist, test_listener, test_track):
+    _purchase(db, test_listener.id, test_track.id, 100, datetime(2026, 10, 5, 12))
+    artist_id = test_artist.id
+    snapshots = DashboardSnapshots()
+    snapshots.get(db, KIND_REVENUE, artist_id, today=TODAY)
+
+    result, count = _count_statements(
+        db, lambda: snapshots.get(db, KIND_REVENUE, artist_id, date(2026, 10, 6), TODAY, today=TODAY)
+    )
+    assert count > 0
+    assert result["summary"]["total_revenue"] == 0
+
+
+def test_refresh_updates_snapshots_of_viewed_artists(db, test_artist, test_listener, test_track):
+    artist_id = test_artist.id
+    snapshots = DashboardSnapshots()
+    assert snapshots.refresh(db, today=TODAY) == 0
+
+    assert snapshots.get(db, KIND_REVENUE, artist_id, today=TODAY)["summary"]["total_revenue"] == 0
+    _purchase(db, test_listener.id, test_track.id, 300, datetime(2026, 10, 10, 12))
+
+    # 更新前はスナップショットのまま
+    assert snapshots.get(db, KIND_REVENUE, artist_id, today=TODAY)["summary"]["total_revenue"] == 0
+
+    # 2種類 × 2期間
+    assert snapshots.refresh(db, today=TODAY) == 4
+    assert snapshots.get(db, KIND_REVENUE, artist_id, today=TODAY)["summary"]["total_revenue"] == 300
+    stats, count = _count_statements(db, lambda: snapshots.get(db, KIND_STATS, artist_id, today=TODAY))
+    assert count == 0
+    assert stats["summary"]["track_count"] == 1
+
+
+def test_snapshot_is_recomputed_when_day_changes(db, test_artist, test_listener, test_track):
+    artist_id = test_artist.id
+    snapshots = DashboardSnapshots()
+    snapshots.get(db, KIND_REVENUE, artist_id, today=TODAY)
+
+    # 月が変わると「今月」の範囲が変わるため、古いスナップショットは使わない
+    _purchase(db, test_listener.id, test_track.id, 100, datetime(2026, 11, 1, 12))
+    result = snapshots.get(db, KIND_REVENUE, artist_id, today=date(2026, 11, 1))
+    assert result["period"]["start_date"] == "2026-11-01"
+    assert result["summary"]["total_revenue"] == 100
+
+
+def test_idle_artists_are_not_refreshed(db, test_artist):
+    artist_id = test_artist.id
+    snapshots = DashboardSnapshots(idle_seconds=0)
+    snapshots.get(db, KIND_REVENUE, artist_id, today=TODAY)
+
+    assert snapshots.refresh(db, today=TODAY) == 0
+    assert snapshots._snapshots == {}
+
+
+def test_refresh_forgets_removed_artist(db, test_artist):
+    artist_id = test_artist.id
+    snapshots = DashboardSnapshots()
+    snapshots.get(db, KIND_REVENUE, artist_id, today=TODAY)
+
+    db.delete(test_artist)
+    db.commit()
+    assert snapshots.refresh(db, today=TODAY) == 0
+    assert snapshots._snapshots == {}
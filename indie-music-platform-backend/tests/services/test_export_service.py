@@ -0,0 +1,121 @@
+import csv
+import io
+from datetime import date, datetime
+
+import pyarrow
+import pyarrow.parquet
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import text
+
+from app.models.play_history import PlayHistory
+from app.models.purchase import PaymentMethod, Purchase, PurchaseStatus
+from app.models.track import Track
+from app.models.user import User
+from app.schemas.user import UserRole
+from app.services import export_service
+from app.services.play_partitions import list_partitions, rotate_hot_table
+
+
+@pytest.fixture
+def drop_month_tables(db):
+    yield
+    # 月別テーブルはメタデータにないため drop_all では削除されない
+    for _, name in list_partitions(db):
+        db.execute(text(f'DROP TABLE "{name}"'))
+    db.commit()
+
+
+def _read_csv(content):
+    return list(csv.DictReader(io.StringIO(b"".join(content).decode("utf-8"))))
+
+
+def _other_artist_track(db):
+    other = User(
+        email="other@example.com", firebase_uid="firebaseuid_other", display_name="Other", user_role=UserRole.ARTIST
+    )
+    db.add(other)
+    db.commit()
+    track = Track(
+        artist_id=other.id, title="Not Mine", duration=100, audio_file_url="https://example.com/x.mp3",
+        price=100, release_date=date(2026, 1, 1), is_public=True
+    )
+    db.add(track)
+    db.commit()
+    return track
+
+
+def test_export_sales_csv(db, test_artist, test_listener, test_track):
+    other_track = _other_artist_track(db)
+    for index, (track_id, purchased_at) in enumerate([
+        (test_track.id, datetime(2026, 10, 2, 9)),
+        (test_track.id, datetime(2026, 9, 30, 23)),
+        (other_track.id, datetime(2026, 10, 1, 12)),
+    ]):
+        db.add(Purchase(
+            user_id=test_listener.id, track_id=track_id, amount=100 + index, purchase_date=purchased_at,
+            payment_method=PaymentMethod.CREDIT_CARD, transaction_id=f"tx-{index}", status=PurchaseStatus.COMPLETED
+        ))
+    db.commit()
+
+    media_type, content = export_service.export_sales(db, test_artist.id)
+    rows = _read_csv(content)
+    assert media_type.startswith("text/csv")
+    # 他のアーティストの楽曲は含まず、購入日時順
+    assert [row["transaction_id"] for row in rows] == ["tx-1", "tx-0"]
+    assert rows[0]["track_title"] == test_track.title
+    assert rows[0]["status"] == "completed"
+    assert rows[0]["payment_method"] == "CREDIT_CARD"
+    assert "user_id" not in rows[0]
+
+    _, content = export_service.export_sales(db, test_artist.id, start_date=date(2026, 10, 1))
+    assert [row["transaction_id"] for row in _read_csv(content)] == ["tx-0"]
+
+
+def test_export_plays_reads_in_batches_across_month_tables(db, test_artist, test_track, drop_month_tables, monkeypatch):
+    monkeypatch.setattr(export_service, "EXPORT_BATCH_ROWS", 3)
+    other_track = _other_artist_track(db)
+    played = [datetime(2026, 6, 1 + i, 12) for i in range(4)] + [datetime(2026, 10, 1 + i, 12) for i in range(4)]
+    for played_at in played:
+        db.add(PlayHistory(track_id=test_track.id, played_at=played_at, play_duration=30))
+    db.add(PlayHistory(track_id=other_track.id, played_at=datetime(2026, 10, 5), play_duration=30))
+    db.commit()
+    # 古い月を月別テーブルへ移しても出力に含まれる
+    assert rotate_hot_table(db, today=date(2026, 10, 17)) == 4
+
+    _, content = export_service.export_plays(db, test_artist.id)
+    rows = _read_csv(content)
+    assert [row["played_at"] for row in rows] == [value.isoformat() for value in played]
+    assert {row["track_id"] for row in rows} == {test_track.id}
+
+    _, content = export_service.export_plays(db, test_artist.id, start_date=date(2026, 10, 2), end_date=date(2026, 10, 3))
+    assert len(_read_csv(content)) == 2
+
+
+def test_export_plays_parquet(db, test_artist, test_track, monkeypatch):
+    monkeypatch.setattr(export_service, "EXPORT_BATCH_ROWS", 2)
+    played = [datetime(2026, 10, 1 + i, 12) for i in range(5)]
+    for played_at in played:
+        db.add(PlayHistory(track_id=test_track.id, played_at=played_at, play_duration=30))
+    db.commit()
+
+    media_type, content = export_service.export_plays(db, test_artist.id, export_format="PARQUET")
+    assert media_type == "application/vnd.apache.parquet"
+    parquet_file = pyarrow.parquet.ParquetFile(pyarrow.BufferReader(b"".join(content)))
+    # 読み込んだバッチごとに row group を書き出す
+    assert parquet_file.num_row_groups == 3
+    table = parquet_file.read()
+    assert table.column_names == [name for name, _ in export_service.PLAY_COLUMNS]
+    assert table.column("played_at").to_pylist() == played
+    assert table.column("track_title").to_pylist() == [test_track.title] * 5
+
+
+def test_export_rejects_unknown_format(db, test_artist):
+    with pytest.raises(HTTPException) as exc_info:
+        export_service.export_sales(db, test_artist.id, export_format="xlsx")
+    assert exc_info.value.status_code == 400
+
+
+def test_export_filename():
+    assert export_service.export_filename("sales", "csv") == "sales.csv"
+    assert export_service.export_filename("plays", "parquet", date(2026, 10, 1), date(2026, 10, 17)) == "plays_20261001_20261017.parquet"
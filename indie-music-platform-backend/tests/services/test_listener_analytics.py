@@ -0,0 +1,78 @@
+from datetime import date, datetime
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import insert
+
+from app.models.play_history import PlayHistory
+from app.models.track import Track
+from app.services import listener_analytics
+
+
+def _plays(db, track_id, durations, played_at=datetime(2026, 10, 10, 12)):
+    db.execute(insert(PlayHistory), [
+        {"track_id": track_id, "user_id": None, "play_duration": duration, "played_at": played_at.replace(minute=index % 60, second=index // 60)}
+        for index, duration in enumerate(durations)
+    ])
+    db.commit()
+
+
+def _short_track(db, artist_id):
+    track = Track(
+        artist_id=artist_id, title="Short", duration=4, audio_file_url="https://example.com/short.mp3",
+        price=100, release_date=date(2026, 1, 1), is_public=True
+    )
+    db.add(track)
+    db.commit()
+    return track
+
+
+def test_retention_curve_per_second(db, test_artist):
+    track = _short_track(db, test_artist.id)
+    # 0秒, 2秒, 4秒（最後まで）, 未設定（最後まで）, 楽曲より長い値（最後まで）
+    _plays(db, track.id, [0, 2, 4, None, 99])
+
+    result = listener_analytics.get_listener_retention(db, test_artist.id, track_id=track.id)
+
+    assert result["retention_by_second"] == [1.0, 0.8, 0.8, 0.6, 0.6]
+    assert result["summary"] == {"plays": 5, "completion_rate": 0.6, "average_listen_ratio": 0.7}
+    assert result["tracks"] == [{
+        "track_id": track.id, "title": "Short", "duration": 4, "plays": 5,
+        "completion_rate": 0.6, "average_listen_seconds": 2.8, "average_listen_ratio": 0.7
+    }]
+    retention = result["retention_by_percent"]
+    assert len(retention) == listener_analytics.PERCENT_BINS
+    assert retention[0] == 1.0 and retention[50] == 0.8 and retention[51] == 0.6 and retention[100] == 0.6
+
+
+def test_retention_summarises_all_tracks(db, test_artist, test_track):
+    short = _short_track(db, test_artist.id)
+    _plays(db, short.id, [4, 4])
+    _plays(db, test_track.id, [0, test_track.duration // 2, None, None])
+    # 期間外の再生は含まない
+    _plays(db, test_track.id, [0], played_at=datetime(2026, 9, 1, 12))
+
+    result = listener_analytics.get_listener_retention(
+        db, test_artist.id, start_date=date(2026, 10, 1), end_date=date(2026, 10, 31)
+    )
+
+    assert "retention_by_second" not in result
+    assert result["summary"]["plays"] == 6
+    assert result["summary"]["completion_rate"] == round(4 / 6, 4)
+    by_track = {item["track_id"]: item for item in result["tracks"]}
+    assert [item["track_id"] for item in result["tracks"]] == [test_track.id, short.id]
+    assert by_track[short.id]["completion_rate"] == 1.0
+    assert by_track[test_track.id]["completion_rate"] == 0.5
+    assert result["retention_by_percent"][1] == round(5 / 6, 4)
+
+
+def test_retention_without_plays(db, test_artist, test_track):
+    result = listener_analytics.get_listener_retention(db, test_artist.id, track_id=test_track.id)
+    assert result["summary"] == {"plays": 0, "completion_rate": 0.0, "average_listen_ratio": 0.0}
+    assert result["retention_by_second"] == [0.0] * (test_track.duration + 1)
+
+
+def test_retention_unknown_track(db, test_artist):
+    with pytest.raises(HTTPException) as exc_info:
+        listener_analytics.get_listener_retention(db, test_artist.id, track_id="missing")
+    assert exc_info.value.status_code == 404
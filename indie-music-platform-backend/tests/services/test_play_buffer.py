@@ -0,0 +1,90 @@
+from app.models.play_history import PlayHistory
+from app.models.track_listing import TrackListing
+from app.services import play_counter
+from app.services.play_buffer import PlayEventBuffer
+
+
+def test_events_are_buffered_until_flush(db, test_track, test_listener):
+    """
+    フラッシュまで書き込まず、フラッシュ時に一括INSERTと楽曲ごとの集計加算を行うこと
+    """
+    buffer = PlayEventBuffer(max_events=100, flush_interval_ms=60_000)
+    for duration in (10, 20, 30):
+        buffer.add(db, test_track.id, test_listener.id, duration)
+
+    assert buffer.pending_count() == 3
+    assert db.query(PlayHistory).count() == 0
+
+    assert buffer.flush() == 3
+    assert buffer.pending_count() == 0
+    db.expire_all()
+    assert sorted(p.play_duration for p in db.query(PlayHistory).all()) == [10, 20, 30]
+    assert play_counter.total_play_counts(db, [test_track]) == {test_track.id: 3}
+
+    play_counter.fold_counters(db)
+    db.expire_all()
+    assert test_track.play_count == 3
+    assert db.get(TrackListing, test_track.id).play_count == 3
+
+
+def test_buffer_flushes_when_full_and_on_stop(db, test_track):
+    buffer = PlayEventBuffer(max_events=2, flush_interval_ms=60_000)
+    buffer.add(db, test_track.id)
+    buffer.add(db, test_track.id)
+    assert buffer.pending_count() == 0
+    assert db.query(PlayHistory).count() == 2
+
+    buffer.start()
+    buffer.add(db, test_track.id)
+    assert buffer.stop() == 1
+    assert db.query(PlayHistory).count() == 3
+
+
+def test_disabled_buffer_writes_immediately(db, test_track):
+    buffer = PlayEventBuffer(max_events=500, flush_interval_ms=0)
+    buffer.add(db, test_track.id, duration=5)
+    assert buffer.pending_count() == 0
+    assert play_counter.pending_plays(db, [test_track.id]) == {test_track.id: 1}
+
+
+def test_flush_drops_only_events_for_deleted_tracks(db, test_artist, test_track, test_listener):
+    """
+    削除済み楽曲への再生で一括書き込みが失敗しても、他の再生は破棄せずに書き込むこと
+    """
+    from datetime import date
+    from sqlalchemy import text
+    from app.models.track import Track
+
+    deleted = Track(
+        title="Deleted Track",
+        artist_id=test_artist.id,
+        audio_file_url="https://example.com/deleted.mp3",
+        duration=120,
+        price=0,
+        release_date=date.today(),
+        is_public=True,
+    )
+    db.add(deleted)
+    db.commit()
+    deleted_id = deleted.id
+
+    buffer = PlayEventBuffer(max_events=100, flush_interval_ms=60_000)
+    buffer.add(db, test_track.id, test_listener.id, 30)
+    buffer.add(db, deleted_id, test_listener.id, 30)
+    buffer.add(db, test_track.id, None, 60)
+
+    # 取り込みから書き込みまでの間に楽曲が削除された状態
+    db.execute(text("PRAGMA foreign_keys=ON"))
+    try:
+        db.delete(deleted)
+        db.commit()
+
+        assert buffer.flush() == 0
+        assert buffer.pending_count() == 2
+        assert buffer.flush() == 2
+    finally:
+        db.execute(text("PRAGMA foreign_keys=OFF"))
+
+    db.expire_all()
+    assert sorted(p.play_duration for p in db.query(PlayHistory).all()) == [30, 60]
+    assert play_counter.total_play_counts(db, [test_track]) == {test_track.id: 2}
@@ -0,0 +1,50 @@
+from app.models.play_counter import TrackPlayCounter
+from app.models.track_listing import TrackListing
+from app.services import play_counter, track_service
+
+
+def test_increment_spreads_over_slots(db, test_track, monkeypatch):
+    """
+    加算はランダムな slot に分散し、合計が再生回数になること
+    """
+    slots = iter([0, 1, 1, 2])
+    monkeypatch.setattr(play_counter.random, "randrange", lambda n: next(slots))
+    for count in (1, 2, 3, 4):
+        play_counter.increment(db, {test_track.id: count})
+    db.commit()
+
+    rows = db.query(TrackPlayCounter.slot, TrackPlayCounter.plays)\
+        .filter(TrackPlayCounter.track_id == test_track.id).order_by(TrackPlayCounter.slot).all()
+    assert [tuple(row) for row in rows] == [(0, 1), (1, 5), (2, 4)]
+    assert play_counter.pending_plays(db, [test_track.id]) == {test_track.id: 10}
+    assert play_counter.pending_plays(db, []) == {}
+
+
+def test_fold_moves_counts_without_touching_updated_at(db, test_track):
+    """
+    畳み込みで Track と一覧用テーブルに反映され、楽曲の更新日時は変わらないこと
+    """
+    updated_at = test_track.updated_at
+    play_counter.increment(db, {test_track.id: 7})
+    db.commit()
+
+    assert play_counter.fold_counters(db) == 1
+    db.expire_all()
+    assert test_track.play_count == 7
+    assert test_track.updated_at == updated_at
+    assert db.get(TrackListing, test_track.id).play_count == 7
+    assert db.query(TrackPlayCounter).count() == 0
+    assert play_counter.fold_counters(db) == 0
+
+
+def test_track_detail_includes_pending_plays(db, test_track):
+    """
+    楽曲詳細（キャッシュ済みを含む）と一括取得は未畳み込みの再生回数を加えて返すこと
+    """
+    assert track_service.get_track_detail(db, test_track.id)["play_count"] == 0
+
+    play_counter.increment(db, {test_track.id: 4})
+    db.commit()
+    assert track_service.get_track_detail(db, test_track.id)["play_count"] == 4
+    batch = track_service.get_tracks_batch(db, [test_track.id])
+    assert batch["tracks"][0]["play_count"] == 4
@@ -0,0 +1,104 @@
+from datetime import date, datetime
+
+import pyarrow.parquet
+import pytest
+from sqlalchemy import inspect, insert, text
+
+from app.core.config import settings
+from app.models.play_history import PlayHistory
+from app.services import play_partitions
+from app.services.play_buffer import write_play_events
+
+TODAY = date(2026, 10, 17)
+
+
+@pytest.fixture
+def partition_settings(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PLAY_HISTORY_HOT_MONTHS", 1)
+    monkeypatch.setattr(settings, "PLAY_HISTORY_RETENTION_MONTHS", 3)
+    monkeypatch.setattr(settings, "PLAY_ARCHIVE_DIR", str(tmp_path))
+    yield tmp_path
+    # 月別テーブルはメタデータにないため drop_all では削除されない
+    for _, name in play_partitions.list_partitions(db):
+        db.execute(text(f'DROP TABLE "{name}"'))
+    db.commit()
+
+
+def _event(track_id, played_at, duration=30):
+    return {"track_id": track_id, "user_id": None, "play_duration": duration, "played_at": played_at}
+
+
+def test_rotation_moves_old_months_out_of_hot_table(db, test_track, partition_settings):
+    """
+    直近の月より古い行が月別テーブルへ移り、playhistory には直近の行だけが残ること
+    """
+    write_play_events(db, [
+        _event(test_track.id, datetime(2026, 8, 31, 23, 59)),
+        _event(test_track.id, datetime(2026, 9, 1, 0, 0)),
+        _event(test_track.id, datetime(2026, 9, 15, 12, 0)),
+        _event(test_track.id, datetime(2026, 10, 1, 8, 0)),
+    ])
+
+    assert play_partitions.rotate_hot_table(db, TODAY) == 3
+    assert db.query(PlayHistory).count() == 1
+    assert play_partitions.list_partitions(db) == [
+        (date(2026, 8, 1), "playhistory_202608"),
+        (date(2026, 9, 1), "playhistory_202609"),
+    ]
+    assert db.execute(text("SELECT count(*) FROM playhistory_202609")).scalar() == 2
+    assert play_partitions.rotate_hot_table(db, TODAY) == 0
+
+    # 月別テーブルも playhistory と同じ主キーと、期間指定の読み取り用のインデックスを持つ
+    inspector = inspect(db.connection())
+    assert inspector.get_pk_constraint("playhistory_202609")["constrained_columns"] == ["id", "played_at"]
+    assert {
+        index["name"]: index["column_names"] for index in inspector.get_indexes("playhistory_202609")
+    } == {
+        "ix_playhistory_202609_track_played": ["track_id", "played_at"],
+        "ix_playhistory_202609_user_played": ["user_id", "played_at"],
+    }
+
+
+def test_rotation_adds_indexes_to_existing_month_table(db, test_track, partition_settings):
+    """
+    インデックスのない既存の月別テーブルへ移すときにインデックスが追加されること
+    """
+    db.execute(text('CREATE TABLE "playhistory_202608" AS SELECT * FROM playhistory WHERE 0'))
+    db.commit()
+    write_play_events(db, [_event(test_track.id, datetime(2026, 8, 31, 23, 59))])
+
+    assert play_partitions.rotate_hot_table(db, TODAY) == 1
+    indexes = inspect(db.connection()).get_indexes("playhistory_202608")
+    assert sorted(index["name"] for index in indexes) == [
+        "ix_playhistory_202608_track_played", "ix_playhistory_202608_user_played"
+    ]
+
+
+def test_archive_requires_rollup_coverage(db, test_track, partition_settings):
+    """
+    保存期間を過ぎた月のうち、集計が再生を含む月だけが Parquet へ書き出されて削除されること
+    """
+    write_play_events(db, [
+        _event(test_track.id, datetime(2026, 5, 3, 10, 0), 40),
+        _event(test_track.id, datetime(2026, 5, 20, 10, 0), None),
+    ])
+    # 集計を経由しない再生（集計に含まれない）
+    db.execute(insert(PlayHistory), [_event(test_track.id, datetime(2026, 6, 2, 10, 0))])
+    db.commit()
+
+    archived = play_partitions.archive_expired_partitions(db, TODAY)
+
+    assert archived == [play_partitions.archive_path("playhistory_202605")]
+    assert [name for _, name in play_partitions.list_partitions(db)] == ["playhistory_202606"]
+    assert archived[0].endswith("playhistory_202605.parquet")
+    table = pyarrow.parquet.read_table(archived[0])
+    assert table.column_names == list(play_partitions.ARCHIVE_COLUMNS)
+    assert sorted(table.column("play_duration").to_pylist(), key=lambda value: value or 0) == [None, 40]
+    assert table.column("track_id").to_pylist() == [test_track.id, test_track.id]
+    assert sorted(table.column("played_at").to_pylist()) == [datetime(2026, 5, 3, 10, 0), datetime(2026, 5, 20, 10, 0)]
+    assert not list(partition_settings.glob("*.tmp"))
+
+
+def test_add_months_wraps_years():
+    assert play_partitions.add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+    assert play_partitions.add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
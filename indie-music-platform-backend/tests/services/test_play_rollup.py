@@ -0,0 +1,84 @@
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import insert, text
+
+from app.core.config import settings
+from app.models.play_daily import PlayDaily
+from app.models.play_history import PlayHistory
+from app.services import artist_service, play_partitions
+from app.services.play_buffer import write_play_events
+from app.services.play_rollup import sync_rollups
+
+
+def _event(track_id, played_at, duration=None):
+    return {"track_id": track_id, "user_id": None, "play_duration": duration, "played_at": played_at}
+
+
+def test_rollups_are_updated_incrementally(db, test_track):
+    """
+    再生イベントの書き込みごとに (楽曲, 日付) の再生数と再生秒数が加算されること
+    """
+    day = datetime(2026, 10, 1, 12, 0)
+    write_play_events(db, [_event(test_track.id, day, 30), _event(test_track.id, day, None)])
+    write_play_events(db, [
+        _event(test_track.id, day + timedelta(hours=11), 45),
+        _event(test_track.id, day + timedelta(days=1), 10),
+    ])
+
+    rows = db.query(PlayDaily.day, PlayDaily.plays, PlayDaily.total_duration)\
+        .filter(PlayDaily.track_id == test_track.id).order_by(PlayDaily.day).all()
+    assert [tuple(row) for row in rows] == [(date(2026, 10, 1), 3, 75), (date(2026, 10, 2), 1, 10)]
+
+
+def test_artist_stats_read_rollups(db, test_artist, test_track):
+    """
+    アーティスト統計の期間集計が日ごとの集計から計算されること
+    """
+    day = datetime(2026, 10, 1, 9, 0)
+    write_play_events(db, [
+        _event(test_track.id, day, 60),
+        _event(test_track.id, day, 60),
+        _event(test_track.id, day + timedelta(days=2), 30),
+        _event(test_track.id, day + timedelta(days=40), 30),
+    ])
+
+    stats = artist_service.get_artist_stats(db, test_artist.id, date(2026, 10, 1), date(2026, 10, 31))
+    assert stats["summary"]["total_plays_all_time"] == 4
+    assert stats["summary"]["total_plays_period"] == 3
+    assert stats["summary"]["total_play_seconds_period"] == 150
+    assert stats["top_tracks"] == [{"track_id": test_track.id, "title": test_track.title, "play_count": 3}]
+    assert stats["daily_plays"] == [
+        {"date": "2026-10-01", "play_count": 2},
+        {"date": "2026-10-03", "play_count": 1},
+    ]
+
+
+def test_sync_rollups_backfills_missing_days(db, test_track, monkeypatch):
+    """
+    集計のない日の再生履歴（月別テーブルへ移した月を含む）が補完され、
+    集計済みの日は変更されないこと（繰り返し実行しても同じ）
+    """
+    monkeypatch.setattr(settings, "PLAY_HISTORY_HOT_MONTHS", 1)
+    # 集計を経由しない既存の再生
+    db.execute(insert(PlayHistory), [
+        _event(test_track.id, datetime(2026, 8, 5, 10, 0), 20),
+        _event(test_track.id, datetime(2026, 10, 1, 9, 0), 30),
+        _event(test_track.id, datetime(2026, 10, 1, 23, 0), None),
+    ])
+    db.commit()
+    # 集計済みの日
+    write_play_events(db, [_event(test_track.id, datetime(2026, 10, 2, 12, 0), 10)])
+    play_partitions.rotate_hot_table(db, date(2026, 10, 17))
+    try:
+        assert sync_rollups(db) == 2
+        assert sync_rollups(db) == 0
+    finally:
+        for _, name in play_partitions.list_partitions(db):
+            db.execute(text(f'DROP TABLE "{name}"'))
+        db.commit()
+
+    rows = db.query(PlayDaily.day, PlayDaily.plays, PlayDaily.total_duration)\
+        .filter(PlayDaily.track_id == test_track.id).order_by(PlayDaily.day).all()
+    assert [tuple(row) for row in rows] == [
+        (date(2026, 8, 5), 1, 20), (date(2026, 10, 1), 2, 30), (date(2026, 10, 2), 1, 10)
+    ]
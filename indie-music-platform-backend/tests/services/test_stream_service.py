@@ -0,0 +1,216 @@
+import pytest
+from datetime import timezone
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.models.play_history import PlayHistory
+from app.models.track_listing import TrackListing
+from app.services import play_counter, stream_service
+from app.services.play_buffer import play_buffer
+
+
+@pytest.fixture
+def presign_calls(monkeypatch):
+    """boto3 の署名処理の呼び出しを記録するスタブ"""
+    calls = []
+
+    def fake_presign(object_name, expiration=3600):
+        calls.append((object_name, expiration))
+        return f"https://signed.example.com/{object_name}?n={len(calls)}"
+
+    monkeypatch.setattr(stream_service.storage, "generate_presigned_url", fake_presign)
+    return calls
+
+
+def test_signed_url_reused_within_expiry_bucket(presign_calls):
+    """
+    同じ区切り内では署名済みURLを再利用し、失効日時は区切りの終わり + TTL になること
+    """
+    bucket = settings.STREAM_URL_BUCKET_SECONDS
+    start = 1_700_000_000 // bucket * bucket
+
+    url1, expires1 = stream_service.get_signed_media_url("tracks/a.mp3", now=start + 1)
+    url2, expires2 = stream_service.get_signed_media_url("tracks/a.mp3", now=start + bucket - 1)
+    assert url1 == url2 and expires1 == expires2
+    assert len(presign_calls) == 1
+    assert expires1.tzinfo == timezone.utc
+    assert expires1.timestamp() == start + bucket + settings.STREAM_URL_TTL_SECONDS
+
+    url3, expires3 = stream_service.get_signed_media_url("tracks/a.mp3", now=start + bucket)
+    assert url3 != url1 and expires3.timestamp() == expires1.timestamp() + bucket
+    assert len(presign_calls) == 2
+
+
+def test_get_stream_url_and_record_play(db, test_track, test_listener, presign_calls):
+    """
+    公開楽曲のURLを返し、再生記録で再生回数（一覧用テーブルを含む）が加算されること
+    """
+    result = stream_service.get_stream_url(db, test_track.id, test_listener.id)
+    assert result["url"].startswith("https://signed.example.com/audio.mp3")
+    stream_service.get_stream_url(db, test_track.id, None)
+    assert len(presign_calls) == 1
+
+    stream_service.record_play(db, test_track.id, test_listener.id, duration=95)
+    stream_service.record_play(db, test_track.id, None, duration=30)
+    play_buffer.flush()
+    play_counter.fold_counters(db)
+
+    db.refresh(test_track)
+    assert test_track.play_count == 2
+    listing = db.query(TrackListing).filter(TrackListing.track_id == test_track.id).one()
+    assert listing.play_count == 2
+    assert db.query(PlayHistory).filter(PlayHistory.track_id == test_track.id).count() == 2
+
+
+def test_private_track_stream_requires_owner(db, test_artist, test_listener, test_track, presign_calls):
+    test_track.is_public = False
+    db.commit()
+
+    with pytest.raises(HTTPException) as exc:
+        stream_service.get_stream_url(db, test_track.id, test_listener.id)
+    assert exc.value.status_code == 403
+    assert stream_service.get_stream_url(db, test_track.id, test_artist.id)["url"]
+
+    with pytest.raises(HTTPException) as exc:
+        stream_service.get_stream_url(db, "missing", test_artist.id)
+    assert exc.value.status_code == 404
+
+
+def test_hmac_signer_skips_boto3(db, test_track, monkeypatch, presign_calls):
+    """
+    HMAC署名方式では boto3 を呼ばず、検証可能なURLを発行すること
+    """
+    from urllib.parse import parse_qs, urlparse
+    from app.utils import media_token
+
+    monkeypatch.setattr(settings, "MEDIA_URL_SIGNER", "hmac")
+    monkeypatch.setattr(settings, "MEDIA_URL_SIGNING_KEY", "test-signing-key")
+
+    result = stream_service.get_stream_url(db, test_track.id)
+    params = parse_qs(urlparse(result["url"]).query)
+    assert presign_calls == []
+    assert int(params["expires"][0]) == int(result["expires_at"].timestamp())
+    assert media_token.verify("audio.mp3", int(params["expires"][0]), params["sig"][0])
+
+
+def test_s3_signer_expiration_matches_expires_at(monkeypatch, presign_calls):
+    """
+    boto3 に渡す有効秒数が失効時刻までの残り時間になること
+    """
+    monkeypatch.setattr(stream_service.storage.time, "time", lambda: 1_000.0)
+    stream_service.storage.sign_media_url("tracks/a.mp3", 4_600)
+    assert presign_calls == [("tracks/a.mp3", 3_600)]
+
+
+def test_record_plays_batch_reports_per_item_results(db, test_artist, test_listener, test_track):
+    """
+    一括記録がイベントごとに受付・拒否を判定し、受け付けたものだけを書き込むこと
+    """
+    from datetime import datetime, timedelta
+    from app.schemas.stream import PlayEvent
+
+    now = datetime.utcnow()
+    events = [
+        PlayEvent(track_id=test_track.id, duration=60, played_at=now - timedelta(hours=3)),
+        PlayEvent(track_id="missing", duration=60),
+        PlayEvent(track_id=test_track.id, duration=-1),
+        PlayEvent(track_id=test_track.id, duration=60, played_at=now + timedelta(hours=1)),
+        PlayEvent(track_id=test_track.id, duration=60, played_at=now - timedelta(days=365)),
+        PlayEvent(track_id=test_track.id, duration=test_track.duration + 60),
+        PlayEvent(track_id=test_track.id, duration=30),
+    ]
+    result = stream_service.record_plays_batch(db, events, test_listener.id)
+
+    assert (result["accepted"], result["rejected"]) == (2, 5)
+    assert [r["reason"] for r in result["results"]] == [
+        None, "track_not_found", "invalid_duration", "future_timestamp", "too_old", "invalid_duration", None
+    ]
+    assert play_counter.total_play_counts(db, [test_track]) == {test_track.id: 2}
+    played = sorted(p.played_at for p in db.query(PlayHistory).all())
+    assert abs((played[0] - (now - timedelta(hours=3))).total_seconds()) < 1
+
+    with pytest.raises(HTTPException) as exc:
+        stream_service.record_plays_batch(
+            db, [PlayEvent(track_id=test_track.id, duration=1)] * (stream_service.MAX_PLAY_BATCH + 1)
+        )
+    assert exc.value.status_code == 400
+
+
+def test_repeated_play_is_rejected_before_db_work(db, test_track, test_listener, monkeypatch):
+    """
+    同じ再生者・楽曲の繰り返し再生がDBを読む前に 429 で拒否されること
+    """
+    stream_service.record_play(db, test_track.id, test_listener.id, duration=30)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("DBを読まないこと")
+
+    monkeypatch.setattr(stream_service, "_get_streamable_track", fail)
+    with pytest.raises(HTTPException) as exc:
+        stream_service.record_play(db, test_track.id, test_listener.id, duration=30)
+    assert exc.value.status_code == 429
+
+    # 未ログインでもクライアントIPごとに判定する
+    monkeypatch.undo()
+    stream_service.record_play(db, test_track.id, None, duration=30, client_id="203.0.113.1")
+    with pytest.raises(HTTPException):
+        stream_service.record_play(db, test_track.id, None, duration=30, client_id="203.0.113.1")
+    stream_service.record_play(db, test_track.id, None, duration=30, client_id="203.0.113.2")
+
+
+def test_batch_rejects_duplicates(db, test_track, test_listener):
+    """
+    一括記録で同じ再生日時の再送と、日時なしの繰り返しが duplicate になること
+    """
+    from datetime import datetime, timedelta
+    from app.schemas.stream import PlayEvent
+
+    played_at = datetime.utcnow() - timedelta(hours=1)
+    events = [
+        PlayEvent(track_id=test_track.id, duration=30, played_at=played_at),
+        PlayEvent(track_id=test_track.id, duration=30, played_at=played_at + timedelta(minutes=5)),
+        PlayEvent(track_id=test_track.id, duration=30),
+        PlayEvent(track_id=test_track.id, duration=30),
+    ]
+    result = stream_service.record_plays_batch(db, events, test_listener.id)
+    assert [r["reason"] for r in result["results"]] == [None, None, None, "duplicate"]
+
+    resent = stream_service.record_plays_batch(db, events[:2], test_listener.id)
+    assert resent["accepted"] == 0
+    assert {r["reason"] for r in resent["results"]} == {"duplicate"}
+
+
+def test_batch_rejects_staggered_timestamps(db, test_track, test_listener):
+    """
+    再生日時を1秒ずつずらしたイベントは楽曲の長さ（180秒）未満の間隔のため重複になり、
+    日時をずらして再送しても楽曲の長さごとの区切りに1件しか受け付けないこと
+    """
+    from datetime import datetime, timedelta
+    from app.schemas.stream import PlayEvent
+
+    start = datetime.utcnow() - timedelta(hours=2)
+    events = [
+        PlayEvent(track_id=test_track.id, duration=180, played_at=start + timedelta(seconds=i))
+        for i in range(stream_service.MAX_PLAY_BATCH)
+    ]
+    result = stream_service.record_plays_batch(db, events, test_listener.id)
+    # 500秒の範囲に楽曲の長さ以上離れた再生は最大3件
+    assert result["accepted"] <= 3
+    assert {r["reason"] for r in result["results"] if not r["accepted"]} == {"duplicate"}
+
+    shifted = [
+        PlayEvent(track_id=test_track.id, duration=180, played_at=event.played_at + timedelta(milliseconds=500))
+        for event in events
+    ]
+    resent = stream_service.record_plays_batch(db, shifted, test_listener.id)
+    # 受け付けるのは再生日時の範囲にかかる区切り（最大4つ）ごとに1件まで
+    assert result["accepted"] + resent["accepted"] <= 4
+    assert db.query(PlayHistory).count() == result["accepted"] + resent["accepted"]
+
+    # 楽曲の長さ以上離れた再生（繰り返し再生）は受け付ける
+    later = start + timedelta(hours=1)
+    looped = [
+        PlayEvent(track_id=test_track.id, duration=180, played_at=later + timedelta(seconds=180 * i))
+        for i in range(3)
+    ]
+    assert stream_service.record_plays_batch(db, looped, test_listener.id)["accepted"] == 3
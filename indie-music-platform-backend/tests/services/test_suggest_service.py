@@ -0,0 +1,86 @@
+import pytest
+from types import SimpleNamespace
+from datetime import date
+from app.services import track_service
+from app.services.suggest_service import SuggestIndex, MAX_SUGGESTIONS
+from app.schemas.track import TrackCreate
+
+
+def _track(track_id, title, play_count, artist_id="artist-1", is_public=True):
+    return SimpleNamespace(
+        id=track_id, title=title, play_count=play_count,
+        artist_id=artist_id, is_public=is_public
+    )
+
+
+@pytest.fixture
+def index():
+    idx = SuggestIndex()
+    idx.loaded = True
+    return idx
+
+
+def test_suggest_ranks_by_play_count(index):
+    index.upsert_track(_track("t1", "Midnight Reflections", 10), "Moonlight Echo")
+    index.upsert_track(_track("t2", "Midnight City", 50), "Moonlight Echo")
+    index.upsert_track(_track("t3", "Morning Dew", 5, artist_id="artist-2"), "Acoustic Garden")
+
+    tracks = [s["id"] for s in index.suggest("mid") if s["type"] == "track"]
+    assert tracks == ["t2", "t1"]
+
+    # アーティストは公開楽曲の再生回数合計でランキング
+    results = index.suggest("mo")
+    assert [(s["type"], s["text"]) for s in results][:2] == [
+        ("artist", "Moonlight Echo"), ("track", "Morning Dew")
+    ]
+    assert results[0]["play_count"] == 60
+
+    # 単語の先頭からも一致する
+    assert [s["id"] for s in index.suggest("refl")] == ["t1"]
+    assert index.suggest("xyz") == []
+
+
+def test_suggest_incremental_updates(index):
+    index.upsert_track(_track("t1", "Alpha", 10), "Artist")
+    index.upsert_track(_track("t2", "Alpine", 20), "Artist")
+    assert [s["id"] for s in index.suggest("al")] == ["t2", "t1"]
+
+    index.add_plays("t1", 15)
+    assert [s["id"] for s in index.suggest("al")] == ["t1", "t2"]
+
+    # タイトル変更・非公開化・削除
+    index.upsert_track(_track("t1", "Beta", 25), "Artist")
+    assert [s["id"] for s in index.suggest("al")] == ["t2"]
+    index.upsert_track(_track("t2", "Alpine", 20, is_public=False), "Artist")
+    assert index.suggest("al") == []
+    index.remove_track("t1")
+    assert index.suggest("artist") == []
+
+
+def test_suggest_cache_recomputes_after_score_drop(index):
+    for i in range(MAX_SUGGESTIONS + 2):
+        index.upsert_track(_track(f"t{i}", f"Song {i}", 100 + i), "Artist")
+    top = [s["id"] for s in index.suggest("song")]
+    assert len(top) == MAX_SUGGESTIONS and top[0] == f"t{MAX_SUGGESTIONS + 1}"
+
+    index.upsert_track(_track(f"t{MAX_SUGGESTIONS + 1}", f"Song {MAX_SUGGESTIONS + 1}", 0), "Artist")
+    top = [s["id"] for s in index.suggest("song")]
+    assert f"t{MAX_SUGGESTIONS + 1}" not in top
+    assert "t1" in top
+
+
+def test_suggest_japanese_normalization(index):
+    index.upsert_track(_track("t1", "エレクトロニカ", 1), "アーティスト")
+    assert [s["id"] for s in index.suggest("えれく")] == ["t1"]
+    assert [s["id"] for s in index.suggest("ｴﾚｸ")] == ["t1"]
+
+
+def test_suggest_endpoint(client, db, test_artist):
+    track_service.create_track(db, TrackCreate(
+        title="Suggest Me", audio_file_url="https://example.com/s.mp3",
+        duration=100, price=100, release_date=date(2024, 1, 1)
+    ), test_artist.id)
+
+    response = client.get("/api/v1/tracks/suggest", params={"q": "sugg"})
+    assert response.status_code == 200
+    assert [s["text"] for s in response.json()] == ["Suggest Me"]
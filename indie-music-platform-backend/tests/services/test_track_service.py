@@ -71,3 +71,238 @@ def test_delete_track(db, test_track):
     # 削除されたことを確認
     with pytest.raises(Exception):
         track_service.get_track(db, test_track.id)
+
+
+def _create_public_tracks(db, artist_id, count):
+    tracks = []
+    for i in range(count):
+        track = track_service.create_track(db, TrackCreate(
+            title=f"Cursor Track {i:02d}",
+            genre="Rock",
+            audio_file_url=f"https://example.com/cursor_{i}.mp3",
+            duration=120,
+            price=100,
+            release_date=date(2024, 1, 1 + i % 28),
+            is_public=True
+        ), artist_id)
+        track.play_count = i % 3  # 同値のソートキーを意図的に作る
+        tracks.append(track)
+    db.commit()
+    return tracks
+
+
+@pytest.mark.parametrize("sort_by", ["created_at", "play_count", "title", "release_date"])
+def test_get_tracks_cursor_pagination(db, test_artist, sort_by):
+    """
+    カーソルページネーションで全件を重複・欠落なく辿れること
+    """
+    created = _create_public_tracks(db, test_artist.id, 7)
+
+    seen = []
+    cursor = None
+    for _ in range(10):
+        page, cursor = track_service.get_tracks_page(
+            db, limit=3, sort_by=sort_by, cursor=cursor
+        )
+        seen.extend(track["id"] for track in page)
+        if cursor is None:
+            break
+
+    assert len(seen) == len(set(seen))
+    assert set(seen) == {track.id for track in created}
+
+    offset_ids = [track["id"] for track in track_service.get_tracks(db, limit=100, sort_by=sort_by)]
+    assert seen == offset_ids
+
+
+def test_get_tracks_cursor_sort_mismatch(db, test_artist):
+    """
+    別のソート条件で発行されたカーソルは400エラー
+    """
+    from fastapi import HTTPException
+    _create_public_tracks(db, test_artist.id, 3)
+    _, cursor = track_service.get_tracks_page(db, limit=2, sort_by="title")
+
+    with pytest.raises(HTTPException) as exc_info:
+        track_service.get_tracks_page(db, limit=2, sort_by="play_count", cursor=cursor)
+    assert exc_info.value.status_code == 400
+
+
+def test_artist_and_search_tracks_cursor(db, test_artist):
+    """
+    アーティスト楽曲一覧・検索もカーソルで続きを取得できること
+    """
+    created = _create_public_tracks(db, test_artist.id, 5)
+
+    first, cursor = track_service.get_artist_tracks_page(db, test_artist.id, limit=3)
+    rest, last_cursor = track_service.get_artist_tracks_page(db, test_artist.id, limit=3, cursor=cursor)
+    assert last_cursor is None
+    assert {t["id"] for t in first + rest} == {t.id for t in created}
+
+    first, cursor = track_service.search_tracks_page(db, "Cursor", limit=4)
+    rest, _ = track_service.search_tracks_page(db, "Cursor", limit=4, cursor=cursor)
+    assert len(first) == 4 and len(rest) == 1
+    assert {t["id"] for t in first + rest} == {t.id for t in created}
+
+
+def test_search_tracks_full_text(db, test_artist):
+    """
+    全文検索がタイトル・アーティスト名・ジャンル・説明文を対象に関連度順で返すこと
+    """
+    title_hit = track_service.create_track(db, TrackCreate(
+        title="Midnight Reflections", description="quiet piano", genre="Ambient",
+        audio_file_url="https://example.com/a.mp3", duration=100, price=100,
+        release_date=date(2024, 1, 1)
+    ), test_artist.id)
+    description_hit = track_service.create_track(db, TrackCreate(
+        title="Dawn", description="written at midnight", genre="Folk",
+        audio_file_url="https://example.com/b.mp3", duration=100, price=100,
+        release_date=date(2024, 1, 2)
+    ), test_artist.id)
+
+    results = track_service.search_tracks(db, "midnight")
+    assert [t["id"] for t in results] == [title_hit.id, description_hit.id]
+
+    assert [t["id"] for t in track_service.search_tracks(db, "piano")] == [title_hit.id]
+    assert len(track_service.search_tracks(db, "Test Artist")) == 2
+    assert track_service.search_tracks(db, "   ") == []
+
+    # 更新・削除がインデックスに反映されること
+    track_service.update_track(db, description_hit.id, TrackUpdate(description="sunrise"))
+    assert [t["id"] for t in track_service.search_tracks(db, "midnight")] == [title_hit.id]
+
+    track_service.delete_track(db, title_hit.id)
+    assert track_service.search_tracks(db, "midnight") == []
+
+    genre_filtered = track_service.get_tracks(db, search="sunrise", genre="Folk")
+    assert [t["id"] for t in genre_filtered] == [description_hit.id]
+
+
+def test_search_tracks_japanese(db, test_artist):
+    """
+    日本語の部分一致・かな/カナ・全角/半角の違いを吸収して検索できること
+    """
+    electronic = track_service.create_track(db, TrackCreate(
+        title="夜明けのシンセサイザー", genre="エレクトロニック",
+        audio_file_url="https://example.com/a.mp3", duration=100, price=100,
+        release_date=date(2024, 1, 1)
+    ), test_artist.id)
+    folk = track_service.create_track(db, TrackCreate(
+        title="青空の下で", genre="フォーク",
+        audio_file_url="https://example.com/b.mp3", duration=100, price=100,
+        release_date=date(2024, 1, 2)
+    ), test_artist.id)
+
+    def ids(query):
+        return [t["id"] for t in track_service.search_tracks(db, query)]
+
+    assert ids("エレクトロ") == [electronic.id]
+    assert ids("ｴﾚｸﾄﾛﾆｯｸ") == [electronic.id]       # 半角カナ
+    assert ids("ふぉーく") == [folk.id]                # ひらがな
+    assert ids("シンセ") == [electronic.id]            # 語中の部分一致
+    assert ids("空の下") == [folk.id]
+    assert ids("空") == [folk.id]                      # 1文字
+    assert ids("下で") == [folk.id]                    # 末尾の部分一致
+    assert ids("クトロエレ") == []                     # 順序が異なる文字列は一致しない
+
+
+def test_catalog_cache_invalidated_by_writes(db, test_artist):
+    """
+    一覧・アーティスト楽曲・詳細のキャッシュが楽曲の変更で無効化されること
+    """
+    from app.core.cache import catalog_cache
+    track = _create_public_tracks(db, test_artist.id, 1)[0]
+
+    assert [t["title"] for t in track_service.get_tracks(db)] == ["Cursor Track 00"]
+    assert track_service.get_track_detail(db, track.id)["title"] == "Cursor Track 00"
+    assert len(track_service.get_artist_tracks(db, test_artist.id)) == 1
+    hits = catalog_cache.stats()["hits"]
+    track_service.get_tracks(db)
+    track_service.get_track_detail(db, track.id)
+    assert catalog_cache.stats()["hits"] == hits + 2
+
+    track_service.update_track(db, track.id, TrackUpdate(title="Renamed"))
+    assert [t["title"] for t in track_service.get_tracks(db)] == ["Renamed"]
+    assert track_service.get_track_detail(db, track.id)["title"] == "Renamed"
+    assert track_service.get_artist_tracks(db, test_artist.id)[0]["title"] == "Renamed"
+
+    track_service.delete_track(db, track.id)
+    assert track_service.get_tracks(db) == []
+    assert track_service.get_artist_tracks(db, test_artist.id) == []
+
+
+def test_track_listing_projection_follows_writes(db, test_artist, test_track):
+    """
+    一覧用の非正規化テーブルが楽曲・アーティストの変更に追従すること
+    """
+    from app.models.track_listing import TrackListing
+    from app.services import auth_service
+    from app.schemas.user import UserUpdate
+
+    listing = db.query(TrackListing).filter(TrackListing.track_id == test_track.id).one()
+    assert listing.title == test_track.title
+    assert listing.artist_name == test_artist.display_name
+
+    track_service.update_track(db, test_track.id, TrackUpdate(genre="Jazz", is_public=False))
+    db.refresh(listing)
+    assert listing.genre == "Jazz" and listing.is_public is False
+    assert track_service.get_tracks(db) == []
+
+    track_service.update_track(db, test_track.id, TrackUpdate(is_public=True))
+    auth_service.update_user(db, test_artist.id, UserUpdate(display_name="New Name"))
+    assert [t["artist_name"] for t in track_service.get_tracks(db)] == ["New Name"]
+    assert [t["artist_name"] for t in track_service.get_tracks(db, search="New Name")] == ["New Name"]
+
+    track_service.delete_track(db, test_track.id)
+    assert db.query(TrackListing).count() == 0
+
+
+def test_get_tracks_batch_preserves_order_and_reports_missing(db, test_artist):
+    """
+    一括取得が指定順を保ち、重複を除き、存在しないIDを報告すること
+    """
+    from fastapi import HTTPException
+
+    ids = [track.id for track in _create_public_tracks(db, test_artist.id, 3)]
+    # 1件目はキャッシュ済み、残りは IN クエリで取得される
+    track_service.get_track_detail(db, ids[0])
+
+    result = track_service.get_tracks_batch(db, [ids[2], "missing", ids[0], ids[2], ids[1]])
+    assert [t["id"] for t in result["tracks"]] == [ids[2], ids[0], ids[1]]
+    assert result["tracks"][0]["artist"]["display_name"] == test_artist.display_name
+    assert result["missing_ids"] == ["missing"]
+
+    with pytest.raises(HTTPException) as exc:
+        track_service.get_tracks_batch(db, [str(i) for i in range(track_service.MAX_BATCH_TRACKS + 1)])
+    assert exc.value.status_code == 400
+
+
+def test_iter_tracks_matches_paged_listing(db, test_artist):
+    """
+    ストリーミング用のイテレーターが小さいバッチでもページ取得と同じ順序・内容を返すこと
+    """
+    _create_public_tracks(db, test_artist.id, 7)
+    expected, _ = track_service.get_tracks_page(db, limit=100, sort_by="play_count")
+    streamed = list(track_service.iter_tracks(db, sort_by="play_count", batch_size=2))
+    assert streamed == expected
+
+
+def test_track_etag_changes_with_pending_plays(db, test_track):
+    """
+    未畳み込みの再生が加算されると、詳細の再生回数とともにETagが変わること
+    """
+    from app.services import play_counter
+
+    etag = track_service.get_track_etag(db, test_track.id)
+    assert track_service.get_track_etag(db, test_track.id) == etag
+
+    play_counter.increment(db, {test_track.id: 2})
+    db.commit()
+    pending_etag = track_service.get_track_etag(db, test_track.id)
+    assert pending_etag != etag
+    assert track_service.get_track_detail(db, test_track.id)["play_count"] == (test_track.play_count or 0) + 2
+
+    play_counter.increment(db, {test_track.id: 1})
+    db.commit()
+    assert track_service.get_track_etag(db, test_track.id) not in (etag, pending_etag)
+    assert track_service.get_track_etag(db, "missing") is None
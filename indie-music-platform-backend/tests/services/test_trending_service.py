@@ -0,0 +1,102 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.models.play_daily import PlayDaily
+from app.models.track import Track
+from app.services import track_service
+from app.services.play_buffer import write_play_events
+from app.services.trending_service import TrendingIndex, _TopK, trending_index
+
+NOW = datetime(2026, 10, 17, 12, 0)
+
+
+def _add_track(db, artist_id, title, genre):
+    track = Track(
+        artist_id=artist_id,
+        title=title,
+        duration=180,
+        audio_file_url="https://example.com/a.mp3",
+        price=100,
+        genre=genre,
+        release_date=date(2026, 1, 1),
+        is_public=True,
+    )
+    db.add(track)
+    db.commit()
+    return track
+
+
+def _plays(track, played_at, count=1):
+    return [{"track_id": track.id, "user_id": None, "play_duration": 30, "played_at": played_at}] * count
+
+
+def test_top_k_keeps_highest_increasing_scores():
+    top = _TopK(2)
+    for track_id, score in [("a", 1.0), ("b", 2.0), ("c", 3.0), ("a", 5.0), ("b", 2.5), ("d", 0.5)]:
+        top.offer(track_id, score)
+    assert top.top(10) == [("a", 5.0), ("c", 3.0)]
+    top.offer("c", 6.0)
+    top.offer("b", 4.0)
+    assert top.top(10) == [("c", 6.0), ("a", 5.0)]
+
+
+def test_recent_plays_outrank_older_plays(db, test_artist):
+    """
+    半減期を過ぎた再生は半分の重みになり、直近の再生が上位になること
+    """
+    old = _add_track(db, test_artist.id, "Old Hit", "rock")
+    new = _add_track(db, test_artist.id, "New Hit", "pop")
+    index = TrendingIndex(half_life_hours=24, top_k=10)
+    index.load(db, now=NOW)
+
+    index.add_events(_plays(old, NOW - timedelta(hours=48), count=3))
+    index.add_events(_plays(new, NOW, count=1))
+
+    ranked = index.top(now=NOW)
+    assert [track_id for track_id, _ in ranked] == [new.id, old.id]
+    assert ranked[0][1] == pytest.approx(1.0)
+    assert ranked[1][1] == pytest.approx(0.75)
+    assert [track_id for track_id, _ in index.top("rock", now=NOW)] == [old.id]
+    # 時間が経っても順位は変わらず、スコアだけが減衰する
+    assert index.top(now=NOW + timedelta(hours=24))[0][1] == pytest.approx(0.5)
+
+
+def test_genre_change_and_removal(db, test_artist):
+    a = _add_track(db, test_artist.id, "A", "rock")
+    b = _add_track(db, test_artist.id, "B", "rock")
+    index = TrendingIndex(half_life_hours=24, top_k=1)
+    index.load(db, now=NOW)
+    index.add_events(_plays(a, NOW, count=2) + _plays(b, NOW))
+    assert [track_id for track_id, _ in index.top("rock", now=NOW)] == [a.id]
+
+    # 上位から削除された場合は残りの楽曲から再構築
+    index.remove_track(a.id)
+    assert [track_id for track_id, _ in index.top("rock", now=NOW)] == [b.id]
+
+    b.genre = "jazz"
+    index.upsert_track(b)
+    assert index.top("rock", now=NOW) == []
+    assert [track_id for track_id, _ in index.top("jazz", now=NOW)] == [b.id]
+
+
+def test_load_seeds_scores_from_daily_rollups(db, test_artist):
+    track = _add_track(db, test_artist.id, "Seeded", "pop")
+    db.add(PlayDaily(track_id=track.id, day=NOW.date(), plays=4, total_duration=0))
+    db.add(PlayDaily(track_id=track.id, day=(NOW - timedelta(days=30)).date(), plays=100, total_duration=0))
+    db.commit()
+
+    index = TrendingIndex(half_life_hours=24, top_k=10)
+    index.load(db, now=NOW)
+    assert index.top(now=NOW) == [(track.id, pytest.approx(4.0))]
+
+
+def test_get_trending_tracks_follows_play_events(db, test_artist):
+    hit = _add_track(db, test_artist.id, "Hit", "pop")
+    _add_track(db, test_artist.id, "Quiet", "pop")
+    trending_index.load(db)
+
+    write_play_events(db, _plays(hit, datetime.utcnow(), count=2))
+    result = track_service.get_trending_tracks(db, genre="pop", limit=5)
+    assert [item["id"] for item in result] == [hit.id]
+    assert result[0]["title"] == "Hit" and result[0]["trending_score"] > 1.9
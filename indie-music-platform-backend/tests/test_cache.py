@@ -0,0 +1,50 @@
+import time
+from app.core.cache import VersionedCache, MISS
+
+
+def test_versioned_cache_hit_and_invalidation():
+    cache = VersionedCache(max_entries=10, ttl_seconds=60)
+    calls = []
+
+    def load():
+        calls.append(1)
+        return len(calls)
+
+    assert cache.get_or_load("k", ("catalog",), load) == 1
+    assert cache.get_or_load("k", ("catalog",), load) == 1
+
+    cache.bump("other")
+    assert cache.get_or_load("k", ("catalog",), load) == 1
+
+    cache.bump("catalog")
+    assert cache.get_or_load("k", ("catalog",), load) == 2
+
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 2
+    assert stats["invalidations"] == 1
+
+
+def test_versioned_cache_lru_and_ttl():
+    cache = VersionedCache(max_entries=2, ttl_seconds=0.05)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # aを最近使用に
+    cache.set("c", 3)
+    assert cache.get("b") is MISS
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+    time.sleep(0.06)
+    assert cache.get("a") is MISS
+
+
+def test_versioned_cache_bump_during_load_is_not_cached():
+    cache = VersionedCache(max_entries=10, ttl_seconds=60)
+
+    def load_while_written():
+        cache.bump("catalog")  # 読み込み中の書き込み
+        return "stale"
+
+    assert cache.get_or_load("k", ("catalog",), load_while_written) == "stale"
+    assert cache.get("k") is MISS
@@ -0,0 +1,55 @@
+from app.core.dedup import BloomFilter, SlidingWindowFilter, _digest
+
+
+class FakeClock:
+    def __init__(self, now=1_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_repeats_within_window_are_rejected():
+    clock = FakeClock()
+    dedup = SlidingWindowFilter(window_seconds=40, capacity=1_000, slices=4, clock=clock)
+
+    assert dedup.check_and_add(("user:1", "track-a")) is False
+    assert dedup.check_and_add(("user:1", "track-a")) is True
+    assert dedup.check_and_add(("user:2", "track-a")) is False
+    assert dedup.check_and_add(("user:1", "track-b")) is False
+
+    # ウィンドウ内はどの世代に記録されていても重複
+    clock.now += 39
+    assert dedup.check_and_add(("user:1", "track-a")) is True
+    assert dedup.stats()["rejected"] == 2
+
+
+def test_keys_expire_after_window_and_memory_is_bounded():
+    clock = FakeClock()
+    dedup = SlidingWindowFilter(window_seconds=40, capacity=1_000, slices=4, clock=clock)
+    dedup.check_and_add("key")
+
+    for _ in range(20):
+        clock.now += 10
+        for i in range(100):
+            dedup.check_and_add(("other", i, clock.now))
+
+    stats = dedup.stats()
+    assert stats["generations"] == 5
+    assert stats["memory_bytes"] == 5 * BloomFilter.for_capacity(1_000, 0.001).size_bytes
+    assert dedup.check_and_add("key") is False
+
+
+def test_disabled_filter_accepts_everything():
+    dedup = SlidingWindowFilter(window_seconds=0)
+    assert dedup.check_and_add("key") is False
+    assert dedup.check_and_add("key") is False
+
+
+def test_bloom_filter_false_positive_rate():
+    bloom = BloomFilter.for_capacity(2_000, 0.01)
+    for i in range(2_000):
+        bloom.add(_digest(("seen", i)))
+    assert all(bloom.contains(_digest(("seen", i))) for i in range(2_000))
+    false_positives = sum(bloom.contains(_digest(("unseen", i))) for i in range(10_000))
+    assert false_positives < 300
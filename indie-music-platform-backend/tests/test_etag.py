@@ -0,0 +1,24 @@
+from starlette.requests import Request
+
+from app.utils.etag import etag_matches, make_etag
+
+
+def _request(if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "headers": headers})
+
+
+def test_make_etag_is_stable_and_quoted():
+    etag = make_etag("track", "t1", 3)
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag == make_etag("track", "t1", 3)
+    assert etag != make_etag("track", "t1", 4)
+
+
+def test_etag_matches_if_none_match_forms():
+    etag = make_etag("catalog", 1)
+    assert not etag_matches(_request(), etag)
+    assert etag_matches(_request(etag), etag)
+    assert etag_matches(_request(f'"other", W/{etag}'), etag)
+    assert etag_matches(_request("*"), etag)
+    assert not etag_matches(_request('"other"'), etag)
@@ -0,0 +1,18 @@
+import json
+from datetime import date
+from decimal import Decimal
+
+from app.utils.json_stream import iter_json_array
+
+
+def test_iter_json_array_chunks_concatenate_to_valid_json():
+    items = [{"id": str(i), "release_date": date(2024, 1, 1), "price": Decimal("1.50")} for i in range(50)]
+    chunks = list(iter_json_array(iter(items), chunk_size=256))
+    assert len(chunks) > 1
+    assert json.loads(b"".join(chunks)) == [
+        {"id": str(i), "release_date": "2024-01-01", "price": 1.5} for i in range(50)
+    ]
+
+
+def test_iter_json_array_empty():
+    assert b"".join(iter_json_array([])) == b"[]"
@@ -0,0 +1,33 @@
+import pytest
+from urllib.parse import parse_qs, urlparse
+
+from app.core.config import settings
+from app.utils import media_token
+
+
+@pytest.fixture(autouse=True)
+def signing_key(monkeypatch):
+    monkeypatch.setattr(settings, "MEDIA_URL_SIGNING_KEY", "test-signing-key")
+    monkeypatch.setattr(settings, "MEDIA_BASE_URL", "https://media.example.com/")
+
+
+def test_signed_url_round_trip():
+    url = media_token.build_signed_url("tracks/曲 1.mp3", 2_000_000_000)
+    parsed = urlparse(url)
+    assert parsed.netloc == "media.example.com"
+    params = parse_qs(parsed.query)
+    assert params["expires"] == ["2000000000"]
+    assert media_token.verify("tracks/曲 1.mp3", 2_000_000_000, params["sig"][0], now=1_999_999_999)
+
+
+def test_verify_rejects_expired_or_tampered_tokens():
+    signature = media_token.sign("tracks/a.mp3", 1000)
+    assert not media_token.verify("tracks/a.mp3", 1000, signature, now=1001)
+    assert not media_token.verify("tracks/b.mp3", 1000, signature, now=999)
+    assert not media_token.verify("tracks/a.mp3", 1001, signature, now=999)
+
+
+def test_missing_signing_key_is_an_error(monkeypatch):
+    monkeypatch.setattr(settings, "MEDIA_URL_SIGNING_KEY", "")
+    with pytest.raises(RuntimeError):
+        media_token.sign("tracks/a.mp3", 1000)
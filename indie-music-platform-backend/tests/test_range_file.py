@@ -0,0 +1,25 @@
+import pytest
+
+from app.utils.range_file import RangeNotSatisfiable, parse_byte_range
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("bytes=0-99", (0, 99)),
+    ("bytes=100-", (100, 999)),
+    ("bytes=900-5000", (900, 999)),
+    ("bytes=-100", (900, 1000 - 1)),
+    ("bytes=-5000", (0, 999)),
+    ("bytes=0-1,5-6", None),  # 複数範囲は全体を返す
+    ("items=0-1", None),
+    ("bytes=abc", None),
+    ("bytes=5-1", None),
+])
+def test_parse_byte_range(header, expected):
+    assert parse_byte_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=-0"])
+def test_parse_byte_range_not_satisfiable(header):
+    with pytest.raises(RangeNotSatisfiable):
+        parse_byte_range(header, 1000)
@@ -0,0 +1,19 @@
+from app.utils.search_tokenizer import normalize, tokenize, query_groups
+
+
+def test_normalize_folds_width_and_kana():
+    assert normalize("ｴﾚｸﾄﾛ") == "エレクトロ"
+    assert normalize("ＡＢＣ１２３") == "abc123"
+    assert normalize("ふぉーく") == "フォーク"
+
+
+def test_tokenize_bigrams_japanese_and_keeps_words():
+    assert tokenize("フォーク Rock") == ["フォ", "ォー", "ーク", "ク", "rock"]
+    assert tokenize("R&B") == ["r", "b"]
+    assert tokenize("") == []
+
+
+def test_query_groups():
+    assert query_groups("エレクトロ pop") == [["エレ", "レク", "クト", "トロ"], ["pop"]]
+    assert query_groups("空") == [["空"]]
+    assert query_groups("!!! ") == []
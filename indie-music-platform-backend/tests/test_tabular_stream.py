@@ -0,0 +1,41 @@
+import csv
+import io
+from datetime import datetime
+
+import pyarrow
+import pyarrow.parquet
+
+from app.models.purchase import PurchaseStatus
+from app.utils.tabular_stream import iter_csv, iter_parquet
+
+COLUMNS = [("id", "string"), ("at", "timestamp"), ("count", "int"), ("status", "string")]
+
+
+def _batches(rows, size):
+    return [rows[i:i + size] for i in range(0, len(rows), size)]
+
+
+def test_iter_csv_chunks_concatenate_to_valid_csv():
+    rows = [(f"id-{i}", datetime(2026, 10, 1, 12, i % 60), i, PurchaseStatus.COMPLETED) for i in range(200)]
+    chunks = list(iter_csv(COLUMNS, iter(_batches(rows, 30)), chunk_size=512))
+    assert len(chunks) > 1
+
+    parsed = list(csv.reader(io.StringIO(b"".join(chunks).decode("utf-8"))))
+    assert parsed[0] == ["id", "at", "count", "status"]
+    assert parsed[1] == ["id-0", "2026-10-01T12:00:00", "0", "completed"]
+    assert len(parsed) == 201
+
+
+def test_iter_csv_empty_writes_header_only():
+    assert b"".join(iter_csv(COLUMNS, [])) == b"id,at,count,status\n"
+
+
+def test_iter_parquet_writes_row_group_per_batch():
+    rows = [(f"id-{i}", datetime(2026, 10, 1, 12), i, PurchaseStatus.REFUNDED) for i in range(25)]
+    data = b"".join(iter_parquet(COLUMNS, iter(_batches(rows, 10))))
+
+    parquet_file = pyarrow.parquet.ParquetFile(pyarrow.BufferReader(data))
+    assert parquet_file.num_row_groups == 3
+    table = parquet_file.read()
+    assert table.column("count").to_pylist() == list(range(25))
+    assert set(table.column("status").to_pylist()) == {"refunded"}